@@ -0,0 +1,423 @@
+"""
+ダッシュボードの集計処理（Streamlit に依存しない）
+- 読み込み: 月別ファイル（列指向の Parquet + 本文ファイル）・全期間の集計表・キーワード索引・n-gram 索引
+- 索引は月別ファイルごと、集計表は全期間で 1 つの成果物として months/ に保存する。
+  precompute.py で事前に作っておけば、ダッシュボードは読んでつなぐだけになる
+  （まだない分はその場で作って保存するので、次からは読むだけ）
+- 行数の多い期間のキーワード索引はつながず、集計のたびに月別ファイルの索引を 1 つずつ読む（StreamingKeywordIndex）
+- 絞り込み・キーワード Top30・ヒートマップ・ランキング・推移・最新の発言は app.py・ベンチマークで同じ関数を使う
+"""
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dataset import MONTH_DIR, read_months, read_stamped_parquet, select_months, write_stamped_parquet
+from heavy_hitters import SpaceSaving
+from keyword_index import KeywordIndex, count_pool, create_heatmap_data
+from ngram_index import NgramIndex
+from query_engine import ROLLUP_SOURCE_COLUMNS, QueryEngine, RollupCube, rollup_rows
+from text_store import TEXT_COLUMNS, TEXT_SUFFIX, TextStore
+
+# 成果物の版（集計表の列などを変えたら上げる。索引の保存形式の版は各索引のモジュールが持つ）
+ARTIFACT_VERSION = 2
+# 月別ファイル <月>/<元データ名>.parquet ごとの索引
+KEYWORD_SUFFIX = ".keywords.npz"
+NGRAM_SUFFIX = ".ngram.npz"
+# 全期間の集計表
+ROLLUP_FILE = "rollup.parquet"
+# ダッシュボードが月別ファイルから読む列（row_id は常に読む。ほかの列は読まない）
+# - 絞り込み: date・house・committee・party。メトリクス・ランキング・推移（キーワード指定時）: ROLLUP_SOURCE_COLUMNS
+# - 最新の発言・使用例: date・house・committee・speaker・party。本文の取り出し: TEXT_COLUMNS
+DASHBOARD_COLUMNS = [*ROLLUP_SOURCE_COLUMNS, *TEXT_COLUMNS]
+
+# 推移の集計単位（細かい順）と、1 区間のおおよその日数・pandas の期間の指定
+TIMELINE_GRANULARITIES = ["day", "week", "month", "session"]
+TIMELINE_BUCKET_DAYS = {"day": 1, "week": 7, "month": 30}
+TIMELINE_PERIODS = {"week": "W-SUN", "month": "M"}
+
+
+# =========================
+# 読み込み（成果物）
+# =========================
+def month_files(catalog: dict, months) -> list[str]:
+    """指定した月の月別ファイル名（MONTH_DIR からの相対パス）"""
+    return [name for month in months for name in catalog["months"][month]["files"]]
+
+
+def _artifact_path(month_dir: Path, name: str, suffix: str) -> Path:
+    return month_dir / f"{name.removesuffix('.parquet')}{suffix}"
+
+
+def _file_texts(month_dir: Path, name: str):
+    """月別ファイル 1 つの発言テキスト（行位置はファイル内の並び）"""
+    path = month_dir / name
+    if not set(TEXT_COLUMNS) <= set(pq.read_schema(path).names):
+        # 本文のない元データ
+        return pd.Series([None] * pq.read_metadata(path).num_rows, dtype=object)
+    return TextStore(month_dir, pq.read_table(path, columns=TEXT_COLUMNS).to_pandas())
+
+
+def _load_or_build(path: Path, read, build, rebuild: bool):
+    """保存済みの成果物を読む。なければ（rebuild なら常に）作って保存する"""
+    artifact = None if rebuild else read(path)
+    if artifact is None:
+        artifact = build()
+        try:
+            artifact.write(path)
+        except OSError:
+            # 書き込めない環境でも表示は続ける
+            pass
+    return artifact
+
+
+def file_keyword_index(month_dir: Path, name: str, workers: int = 1, rebuild: bool = False,
+                       pool=None) -> KeywordIndex:
+    """月別ファイル 1 つのキーワード索引（行位置はファイル内の並び）。pool は作るときに使い回すプロセスプール"""
+    return _load_or_build(_artifact_path(month_dir, name, KEYWORD_SUFFIX), KeywordIndex.read,
+                          lambda: KeywordIndex.build(_file_texts(month_dir, name), workers=workers, pool=pool), rebuild)
+
+
+def file_ngram_index(month_dir: Path, name: str, rebuild: bool = False) -> NgramIndex:
+    """月別ファイル 1 つの n-gram 索引（行位置はファイル内の並び）"""
+    return _load_or_build(_artifact_path(month_dir, name, NGRAM_SUFFIX), NgramIndex.read,
+                          lambda: NgramIndex.build(_file_texts(month_dir, name)), rebuild)
+
+
+def _file_positions(texts: TextStore, names: list[str]) -> list[np.ndarray]:
+    """月別ファイルの各行が、読み込んだデータの何行目か（本文ファイルで見分ける）
+
+    本文のないファイルは索引に要素がないので、行位置は空でよい。
+    """
+    order = np.argsort(texts.file_codes, kind="stable")
+    # 先頭は本文ファイルのない行（コード -1）
+    groups = np.split(order, np.searchsorted(texts.file_codes[order], np.arange(len(texts.files))))[1:]
+    by_file = dict(zip(texts.files, groups))
+    empty = np.empty(0, dtype=np.int64)
+    return [by_file.get(f"{name.removesuffix('.parquet')}{TEXT_SUFFIX}", empty) for name in names]
+
+
+def load_query_engine(data_dir: Path, frame: pd.DataFrame) -> QueryEngine:
+    """read_months で読んだデータのフィルタ用索引（本文は月別の本文ファイルから取り出す）"""
+    return QueryEngine(frame, TextStore(data_dir / MONTH_DIR, frame))
+
+
+def load_keyword_index(data_dir: Path, catalog: dict, months, engine: QueryEngine,
+                       workers: int = 1) -> KeywordIndex:
+    """指定した月のキーワード索引（月別ファイルごとの索引をつなぐ）
+
+    engine は同じ月を load_query_engine で読み込んだもの（行位置はその並び）。
+    まだない索引を作るときは、プロセスプールを 1 つだけ起動して全ファイルで使い回す。
+    """
+    month_dir = data_dir / MONTH_DIR
+    names = month_files(catalog, months)
+    with count_pool(workers) as pool:
+        indexes = [file_keyword_index(month_dir, name, workers, pool=pool) for name in names]
+    parts = zip(indexes, _file_positions(engine.speech, names))
+    return KeywordIndex.concat(list(parts), len(engine.speech))
+
+
+def load_ngram_index(data_dir: Path, catalog: dict, months, engine: QueryEngine) -> NgramIndex:
+    """指定した月の n-gram 索引（月別ファイルごとの索引をつなぐ）"""
+    month_dir = data_dir / MONTH_DIR
+    names = month_files(catalog, months)
+    parts = zip([file_ngram_index(month_dir, name) for name in names], _file_positions(engine.speech, names))
+    return NgramIndex.concat(list(parts), len(engine.speech))
+
+
+class StreamingKeywordIndex:
+    """月別ファイルごとの索引を 1 つずつ読んで集計するキーワード索引（全期間の索引をつないで持たない）
+
+    KeywordIndex と同じく top_terms / group_term_matrix で使える。top_terms は選択行が exact_rows 以下なら
+    正確に（同数の順も KeywordIndex と同じ）、超えたら Space-Saving（capacity 語）で近似する。
+    どちらも error 列（count の多めの見積もり分の上限。正確なら 0）を付ける。
+    """
+
+    def __init__(self, month_dir: Path, names: list[str], positions: list[np.ndarray], n_rows: int,
+                 capacity: int = 50_000, exact_rows: int = 200_000, workers: int = 1):
+        self.month_dir = month_dir
+        self.names = names
+        self.positions = positions
+        self.n_rows = n_rows
+        self.capacity = capacity
+        self.exact_rows = exact_rows
+        self.workers = workers
+
+    def _parts(self, positions: np.ndarray):
+        """選択行を含む月別ファイルごとに (索引, ファイル内の選択行, ファイルの各行の行位置)"""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[positions] = True
+        # まだない索引を作るときは 1 つのプロセスプールを使い回す
+        with count_pool(self.workers) as pool:
+            for name, file_positions in zip(self.names, self.positions):
+                local = np.flatnonzero(mask[file_positions])
+                if len(local):
+                    yield file_keyword_index(self.month_dir, name, self.workers, pool=pool), local, file_positions
+
+    def top_terms(self, positions: np.ndarray, n: int = 30) -> pd.DataFrame:
+        """指定行の頻出キーワード上位 n 件（term, count, error）"""
+        exact = len(positions) <= self.exact_rows
+        counter = None if exact else SpaceSaving(self.capacity)
+        frames = []
+        for index, local, file_positions in self._parts(positions):
+            sel = index._select(local)
+            cols = index.cols[sel]
+            totals = np.bincount(cols, weights=index.counts[sel], minlength=len(index.vocab)).astype(np.int64)
+            present = np.flatnonzero(totals)
+            terms = np.asarray(index.vocab, dtype=object)[present]
+            if counter is not None:
+                counter.update(pd.Series(totals[present], index=terms))
+                continue
+            # 初出順は (全体の行位置, 行内の順番) で比べる
+            rows = index.rows[sel]
+            order_in_row = sel - np.searchsorted(index.rows, rows)
+            first_seen = np.full(len(index.vocab), np.iinfo(np.int64).max, dtype=np.int64)
+            np.minimum.at(first_seen, cols, file_positions[rows].astype(np.int64) * 2**20 + order_in_row)
+            frames.append(pd.DataFrame({"term": terms, "count": totals[present], "first_seen": first_seen[present]}))
+
+        if counter is not None:
+            return counter.top(n)[["term", "count", "error"]]
+        if not frames:
+            return pd.DataFrame({"term": pd.Series(dtype=object), "count": pd.Series(dtype="int64"),
+                                 "error": pd.Series(dtype="int64")})
+        merged = (
+            pd.concat(frames, ignore_index=True)
+            .groupby("term", sort=False)
+            .agg(count=("count", "sum"), first_seen=("first_seen", "min"))
+            .sort_values(["count", "first_seen"], ascending=[False, True])
+            .head(n)
+        )
+        return pd.DataFrame({"term": merged.index.to_numpy(dtype=object), "count": merged["count"].to_numpy(),
+                             "error": np.zeros(len(merged), dtype=np.int64)})
+
+    def group_term_matrix(self, positions: np.ndarray, groups: pd.Series, terms: list[str]) -> pd.DataFrame:
+        """グループ（政党など）×指定キーワードの出現回数（正確。ファイルごとの集計を足し合わせる）"""
+        codes, uniques = pd.factorize(groups, sort=True)
+        row_group = np.full(self.n_rows, -1, dtype=np.int64)
+        row_group[positions] = codes
+        k = len(terms)
+        matrix = np.zeros(len(uniques) * k, dtype=np.int64)
+        found = np.zeros(k, dtype=bool)
+        for index, local, file_positions in self._parts(positions):
+            term_ids = [(j, index.term_ids[t]) for j, t in enumerate(terms) if t in index.term_ids]
+            lookup = np.full(len(index.vocab), -1, dtype=np.int64)
+            for j, term_id in term_ids:
+                lookup[term_id] = j
+                found[j] = True
+            sel = index._select(local)
+            term_code = lookup[index.cols[sel]]
+            group_code = row_group[file_positions[index.rows[sel]]]
+            keep = (term_code >= 0) & (group_code >= 0)
+            matrix += np.bincount(group_code[keep] * k + term_code[keep], weights=index.counts[sel][keep],
+                                  minlength=len(uniques) * k).astype(np.int64)
+        return pd.DataFrame(
+            matrix.reshape(len(uniques), k)[:, found],
+            index=pd.Index(uniques, name=groups.name),
+            columns=pd.Index([t for t, f in zip(terms, found) if f], name="term"),
+        )
+
+
+def load_streaming_keyword_index(data_dir: Path, catalog: dict, months, engine: QueryEngine,
+                                 capacity: int = 50_000, exact_rows: int = 200_000,
+                                 workers: int = 1) -> StreamingKeywordIndex:
+    """指定した月のキーワード索引（月別ファイルの索引は集計のたびに 1 つずつ読む）"""
+    names = month_files(catalog, months)
+    return StreamingKeywordIndex(data_dir / MONTH_DIR, names, _file_positions(engine.speech, names),
+                                 len(engine.speech), capacity=capacity, exact_rows=exact_rows, workers=workers)
+
+
+def load_rollup_cube(data_dir: Path, catalog: dict, rebuild: bool = False) -> RollupCube:
+    """全期間の集計表（保存済みで元データが変わっていなければ読むだけ）"""
+    path = data_dir / MONTH_DIR / ROLLUP_FILE
+    stamp = {"version": ARTIFACT_VERSION, "sources": catalog["sources"]}
+    cube = None if rebuild else read_stamped_parquet(path, stamp)
+    if cube is not None:
+        return RollupCube(cube)
+    rollup_cube = RollupCube.build(read_months(data_dir, catalog, select_months(catalog),
+                                               columns=ROLLUP_SOURCE_COLUMNS))
+    try:
+        write_stamped_parquet(rollup_cube.cube, path, stamp)
+    except (OSError, pa.ArrowException):
+        pass
+    return rollup_cube
+
+
+def build_file_artifacts(month_dir: Path, name: str, rebuild: bool = False) -> dict:
+    """月別ファイル 1 つの索引をそろえる（precompute.py から別プロセスで呼ぶ）"""
+    start = time.perf_counter()
+    keyword_index = file_keyword_index(month_dir, name, rebuild=rebuild)
+    ngram_index = file_ngram_index(month_dir, name, rebuild=rebuild)
+    return {"file": name, "rows": keyword_index.n_rows, "terms": len(keyword_index.vocab),
+            "ngrams": len(ngram_index.keys), "seconds": time.perf_counter() - start}
+
+
+# =========================
+# 絞り込み・集計
+# =========================
+def parse_keywords(text: str) -> list[str]:
+    """キーワード入力（スペース区切り）→ 検索語のリスト"""
+    return [k.strip() for k in text.split() if k.strip()]
+
+
+def filter_rows(engine: QueryEngine, date_range=None, houses=None, committees=None,
+                keywords: list[str] | None = None, ngram_index: NgramIndex | None = None) -> np.ndarray:
+    """条件に合う行位置。keywords があれば ngram_index でいずれかを含む（大文字小文字を区別しない）発言に絞る"""
+    rows = engine.select(date_range=date_range, houses=houses, committees=committees)
+    if keywords:
+        rows = ngram_index.search(engine.speech, keywords, positions=rows, case=False)
+    return rows
+
+
+def stats_frame(filtered_df: pd.DataFrame, cube: RollupCube, date_range=None, houses=None, committees=None,
+                keywords: list[str] | None = None) -> pd.DataFrame:
+    """発言数・文字数の集計元（キーワード未指定なら集計表、指定時はヒットした発言行）"""
+    if keywords:
+        return rollup_rows(filtered_df)
+    return cube.frame(cube.select(date_range=date_range, houses=houses, committees=committees))
+
+
+def keyword_ranking(index: "KeywordIndex | StreamingKeywordIndex", filtered_df: pd.DataFrame, n: int = 30) -> pd.DataFrame:
+    """フィルタ後の発言の頻出キーワード（term, count）"""
+    return index.top_terms(filtered_df.index.to_numpy(), n=n)
+
+
+def heatmap(filtered_df: pd.DataFrame, top_keywords: pd.DataFrame, index: "KeywordIndex | StreamingKeywordIndex",
+            top_n: int = 15) -> pd.DataFrame:
+    """政党×主要キーワードの出現回数（party, term, count）"""
+    return create_heatmap_data(filtered_df, top_keywords, index, top_n=top_n)
+
+
+def keyword_examples(engine: QueryEngine, ngram_index: NgramIndex, filtered_df: pd.DataFrame, term: str,
+                     n: int = 3, max_chars: int = 150) -> pd.DataFrame:
+    """キーワードを含む最近の発言 n 件（speech 列に本文の抜粋を付ける）"""
+    rows = ngram_index.search(engine.speech, [term], positions=filtered_df.index.to_numpy(), case=True)
+    examples = filtered_df.loc[engine.latest(rows, n)].copy()
+    texts = engine.texts(examples.index)
+    examples["speech"] = [text[:max_chars] + "..." if len(text) > max_chars else text
+                          for text in (str(t) for t in texts)]
+    return examples
+
+
+def speaker_ranking(stats_df: pd.DataFrame, n: int = 20) -> pd.DataFrame:
+    """議員別の発言文字数 上位 n 人
+
+    発言者×政党のコードの組ごとに bincount で合計し、上位 n 組だけを並べる（同数は発言者・政党の名前順）。
+    """
+    speaker, party = pd.Categorical(stats_df["speaker"]), pd.Categorical(stats_df["party"])
+    n_parties = len(party.categories)
+    valid = (speaker.codes >= 0) & (party.codes >= 0)
+    keys = speaker.codes[valid].astype(np.int64) * n_parties + party.codes[valid]
+    size = len(speaker.categories) * n_parties
+    totals = np.bincount(keys, weights=stats_df["char_count"].to_numpy()[valid], minlength=size).astype(np.int64)
+    present = np.flatnonzero(np.bincount(keys, minlength=size))
+    # 上位 n 組の合計以上の組だけを残してから並べる
+    if len(present) > n > 0:
+        threshold = np.partition(totals[present], len(present) - n)[len(present) - n]
+        present = present[totals[present] >= threshold]
+    top = present[np.lexsort((present, -totals[present]))[:n]]
+    return pd.DataFrame({
+        "speaker": pd.Categorical.from_codes(top // n_parties, dtype=speaker.dtype),
+        "party": pd.Categorical.from_codes(top % n_parties, dtype=party.dtype),
+        "char_count": totals[top],
+    })
+
+
+def party_ranking(stats_df: pd.DataFrame) -> pd.DataFrame:
+    """政党別の発言数・文字数（発言数の多い順）"""
+    return (
+        stats_df.groupby("party", as_index=False, observed=True)
+        .agg({"speech_count": "sum", "char_count": "sum"})
+        .sort_values("speech_count", ascending=False)
+    )
+
+
+def has_sessions(stats_df: pd.DataFrame) -> bool:
+    """国会の回次が分かる発言があるか（古い取得データにはない）"""
+    return "session" in stats_df.columns and bool(stats_df["session"].notna().any())
+
+
+def timeline_granularity(stats_df: pd.DataFrame, max_points: int) -> str:
+    """期間の長さから、点の数が max_points 以下になる最も細かい集計単位を選ぶ"""
+    dates = stats_df["date"].dropna()
+    days = (dates.max() - dates.min()).days + 1 if len(dates) else 0
+    for granularity in TIMELINE_GRANULARITIES[:-1]:
+        if -(-days // TIMELINE_BUCKET_DAYS[granularity]) <= max_points:
+            return granularity
+    # 月でも多すぎるときは会期ごと（回次がなければ月ごとにして limit_points でまとめる）
+    return "session" if has_sessions(stats_df) else "month"
+
+
+def timeline(stats_df: pd.DataFrame, granularity: str = "day", max_points: int | None = None) -> pd.DataFrame:
+    """集計単位ごとの発言数・文字数（date は各区間の最初の日、end は最後の日）
+
+    granularity: day / week / month / session（国会の会期。回次の分からない発言は除く）。
+    max_points を超えるときは隣り合う区間をまとめて max_points 以下にする。
+    """
+    dated = stats_df[stats_df["date"].notna()]
+    if granularity == "session":
+        dated = dated[dated["session"].notna()]
+        keys = dated["session"]
+    elif granularity == "day":
+        keys = dated["date"]
+    else:
+        keys = dated["date"].dt.to_period(TIMELINE_PERIODS[granularity]).dt.start_time
+    buckets = (
+        dated.assign(end=dated["date"])
+        .groupby(keys.rename("bucket"))
+        .agg(date=("date", "min"), end=("end", "max"), speech_count=("speech_count", "sum"),
+             char_count=("char_count", "sum"))
+    )
+    if granularity == "session":
+        buckets["session"] = buckets.index.astype("int64")
+    buckets = buckets.sort_values("date").reset_index(drop=True)
+    if max_points is not None:
+        buckets = limit_points(buckets, max_points)
+    return buckets
+
+
+def limit_points(buckets: pd.DataFrame, max_points: int) -> pd.DataFrame:
+    """隣り合う区間をまとめて max_points 行以下にする（件数は合計、期間は最初と最後）"""
+    if len(buckets) <= max_points:
+        return buckets
+    groups = np.arange(len(buckets)) * max_points // len(buckets)
+    agg = {"date": "min", "end": "max", "speech_count": "sum", "char_count": "sum"}
+    if "session" in buckets.columns:
+        agg["session"] = "first"
+    return buckets.groupby(groups).agg(agg).reset_index(drop=True)
+
+
+def limit_heatmap(heatmap_data: pd.DataFrame, max_terms: int, max_cells: int) -> pd.DataFrame:
+    """ヒートマップのセル（政党×キーワード）を max_cells 以下にする
+
+    キーワードは合計の多い max_terms 語まで、政党は合計の多い順に セル数 ÷ 語数 まで残す。
+    """
+    term_totals = heatmap_data.groupby("term")["count"].sum().sort_values(ascending=False)
+    terms = term_totals.index[:max(1, min(max_terms, max_cells))]
+    data = heatmap_data[heatmap_data["term"].isin(terms)]
+    party_totals = data.groupby("party")["count"].sum().sort_values(ascending=False)
+    parties = party_totals.index[:max(1, max_cells // len(terms))] if len(terms) else party_totals.index
+    return data[data["party"].isin(parties)]
+
+
+def latest_speeches(filtered_df: pd.DataFrame, engine: QueryEngine, n: int = 20,
+                    max_chars: int = 200) -> pd.DataFrame:
+    """新しい順に n 件（本文は max_chars 文字で切り詰め、index は全期間での通し番号）
+
+    読み込み時に作った日付順の順位から n 件だけを選ぶ（フィルタ後の行全体は並べ替えない）。
+    """
+    latest = filtered_df.loc[engine.latest(filtered_df.index, n), ["date", "house", "committee", "speaker", "party"]]
+    # テキストは表示する行だけ取り出す
+    latest["speech"] = engine.texts(latest.index)
+    latest["speech"] = (
+        latest["speech"]
+        .fillna("")
+        .astype(str)
+        .apply(lambda x: (x[:max_chars] + "...") if len(x) > max_chars else x)
+    )
+    latest["date"] = latest["date"].dt.strftime("%Y-%m-%d")
+    # 読み込んだ月の中での位置ではなく全期間での通し番号
+    latest.index = filtered_df["row_id"].loc[latest.index].to_numpy()
+    return latest
@@ -1,11 +1,17 @@
-import json
+import os
+import uuid
 import pandas as pd
 import streamlit as st
 import altair as alt
 from pathlib import Path
-import re
-import collections
-import itertools
+
+import analytics
+from dataset import catalog_bounds, dataset_version, month_catalog, read_months, select_months
+from keyword_index import KeywordIndex
+from ngram_index import NgramIndex
+from profiling import Profiler
+from query_engine import QueryEngine, RollupCube
+from result_cache import ResultCache, filter_key
 
 # ページ設定
 st.set_page_config(
@@ -84,115 +90,42 @@ alt.themes.register('jp_fix', lambda: {
 })
 alt.themes.enable('jp_fix')
 
-# メインタイトル
-st.markdown("""
-<div class="main-header">
-    <h1>🏛️ 国会ダッシュボード</h1>
-    <p>国会会議録から議論の全体像を可視化(現在25/1/23~8/5のみ対応)</p>
-</div>
-""", unsafe_allow_html=True)
-
 DATA_DIR = Path(__file__).parent / "data"
-
-@st.cache_data
-def load_data():
-    """データ読み込み関数"""
+# キーワード索引を作るプロセス数（既定の 1 なら並列化しない。重い索引づくりは precompute.py で前もって行う）
+KEYWORD_WORKERS = int(os.environ.get("KOKKAI_KEYWORD_WORKERS", 1))
+# 読み込んだ行数がこれを超えたら、キーワード索引を全期間分つながず月別ファイルごとに集計する（メモリは 1 ファイル分）。
+# 絞り込み後の行が KEYWORD_EXACT_ROWS を超えると Top30 は近似（Space-Saving、語数の上限 KEYWORD_CAPACITY）になる
+KEYWORD_STREAMING_ROWS = int(os.environ.get("KOKKAI_KEYWORD_STREAMING_ROWS", 1_000_000))
+KEYWORD_EXACT_ROWS = int(os.environ.get("KOKKAI_KEYWORD_EXACT_ROWS", 200_000))
+KEYWORD_CAPACITY = int(os.environ.get("KOKKAI_KEYWORD_CAPACITY", 50_000))
+# 設定するとセクションごとの計測結果をこのファイルに JSON Lines で追記する（セッションをまたいだ集計用）
+PROFILE_LOG = os.environ.get("KOKKAI_PROFILE_LOG")
+# グラフ 1 つあたりの上限（推移の点の数・ヒートマップのセル数）。ブラウザに送るデータの大きさを期間によらず抑える
+MAX_CHART_POINTS = int(os.environ.get("KOKKAI_MAX_CHART_POINTS", 400))
+MAX_HEATMAP_CELLS = int(os.environ.get("KOKKAI_MAX_HEATMAP_CELLS", 600))
+# 推移の集計単位（表示名）
+TIMELINE_LABELS = {"day": "日", "week": "週", "month": "月", "session": "会期"}
+# 絞り込み条件ごとの集計結果キャッシュ（全セッション共有）の上限
+RESULT_CACHE_ENTRIES = 256
+RESULT_CACHE_MB = 256
+
+@st.cache_resource(max_entries=1, show_spinner="月別ファイルを準備中...")
+def load_catalog(version: tuple) -> dict:
+    """月別ファイルの一覧（version は dataset_version。差分が追加されると変わり、追加分だけ月別に分ける）"""
     try:
-        speeches = pd.read_csv(DATA_DIR / "speeches_sample.csv")
-        
-        # データクレンジング
-        speeches["date"] = pd.to_datetime(speeches["date"], errors="coerce")
-        
-        # 文字数計算
-        if "speech" in speeches.columns:
-            speeches["char_count"] = speeches["speech"].fillna("").astype(str).apply(len)
-        else:
-            speeches["char_count"] = 0
-        
-        # 欠損列の補完
-        required_columns = ["speechURL", "meetingURL", "issueID", "billID", 
-                          "speakerGroup", "nameOfHouse", "nameOfMeeting"]
-        for col in required_columns:
-            if col not in speeches.columns:
-                speeches[col] = None
-        
-        # 表記統一
-        speeches["party"] = speeches["speakerGroup"].fillna("政党不明")
-        speeches["house"] = speeches["nameOfHouse"].fillna("院不明")
-        speeches["committee"] = speeches["nameOfMeeting"].fillna("委員会不明")
-        speeches["speaker"] = speeches["speaker"].fillna("発言者不明")
-        
-        return speeches
+        return month_catalog(DATA_DIR)
     
     except FileNotFoundError:
         st.error("❌ データファイルが見つかりません。data/speeches_sample.csv を確認してください。")
-        return pd.DataFrame()
+        return {}
     except Exception as e:
         st.error(f"❌ データ読み込みエラー: {str(e)}")
-        return pd.DataFrame()
+        return {}
 
-def extract_keywords(text: str, min_length: int = 2, max_length: int = 6) -> list[str]:
-    """キーワード抽出関数（改良版）"""
-    if not isinstance(text, str) or not text.strip():
-        return []
-    
-    # 漢字とカタカナの抽出（長さ制限付き）
-    kanji_pattern = rf'[\u4E00-\u9FFF]{{{min_length},{max_length}}}'
-    kata_pattern = rf'[ァ-ヴー]{{{min_length + 1},}}'
-    
-    kanji_terms = re.findall(kanji_pattern, text)
-    kata_terms = re.findall(kata_pattern, text)
-    
-    # ストップワード（拡張版）
-    stop_words = {
-        '委員会', '本会議', '政府', '総理', '大臣', '答弁', '質疑', '報告', '資料', 
-        '法律', '制度', '今回', '我が国', '国会', '議員', '先生', '委員', '議論',
-        '問題', '課題', '対応', '検討', '実施', '推進', '確認', '説明', '質問'
-    }
-    
-    # フィルタリング
-    all_terms = kanji_terms + kata_terms
-    filtered_terms = [term for term in all_terms if term not in stop_words]
-    
-    return filtered_terms
-
-def create_heatmap_data(df: pd.DataFrame, top_terms: pd.DataFrame, top_n: int = 15) -> pd.DataFrame:
-    """ヒートマップ用データ作成"""
-    if len(top_terms) == 0:
-        return pd.DataFrame()
-    
-    focus_terms = set(top_terms['term'].head(top_n))
-    
-    # 政党×キーワードの出現回数を集計
-    heatmap_rows = []
-    for party, group in df.groupby('party'):
-        party_terms = []
-        for speech in group['speech'].fillna(''):
-            party_terms.extend([term for term in extract_keywords(speech) if term in focus_terms])
-        
-        term_counts = collections.Counter(party_terms)
-        for term, count in term_counts.items():
-            heatmap_rows.append({'party': party, 'term': term, 'count': count})
-    
-    if not heatmap_rows:
-        return pd.DataFrame()
-    
-    heat_df = pd.DataFrame(heatmap_rows)
-    
-    # 順序を決定（頻度順）
-    term_order = (heat_df.groupby('term')['count'].sum()
-                 .sort_values(ascending=False).index.tolist())
-    party_order = (heat_df.groupby('party')['count'].sum()
-                  .sort_values(ascending=False).index.tolist())
-    
-    # 全組み合わせのマトリックス作成（0埋め）
-    complete_data = []
-    for party in party_order:
-        for term in term_order:
-            count = heat_df[(heat_df['party'] == party) & (heat_df['term'] == term)]['count'].sum()
-            complete_data.append({'party': party, 'term': term, 'count': count})
-    
-    return pd.DataFrame(complete_data)
+@st.cache_data(max_entries=3)
+def load_data(version: tuple, months: tuple):
+    """データ読み込み関数（選択期間に掛かる月のファイルの、各セクションが使う列だけを読む。発言本文は含まない）"""
+    return read_months(DATA_DIR, load_catalog(version), months, columns=analytics.DASHBOARD_COLUMNS)
 
 def truncate_labels(labels: list, max_length: int = 8) -> list:
     """ラベルを指定文字数で切り詰める"""
@@ -216,12 +149,62 @@ def create_readable_chart(data: pd.DataFrame, chart_type: str = "bar", **kwargs)
     
     return alt.Chart(data)
 
-# データ読み込み
-speeches = load_data()
+@st.cache_resource
+def get_result_cache() -> ResultCache:
+    """キーワード Top30・ヒートマップ・ランキング・推移の結果（同じ絞り込み条件なら全セッションで使い回す）"""
+    return ResultCache(max_entries=RESULT_CACHE_ENTRIES, max_bytes=RESULT_CACHE_MB * 1024 * 1024)
+
+# 索引・集計表は precompute.py で作っておいた成果物を読む（まだない分はここで作って保存する）
+@st.cache_resource(max_entries=3, show_spinner="キーワード索引を読み込み中...")
+def load_keyword_index(version: tuple, months: tuple) -> "KeywordIndex | analytics.StreamingKeywordIndex":
+    """発言×キーワード索引（月別ファイルごとの索引をつなぐ。行数が多い期間はつながずに集計のたびに読む）"""
+    engine = load_query_engine(version, months)
+    if len(engine.meta) > KEYWORD_STREAMING_ROWS:
+        return analytics.load_streaming_keyword_index(DATA_DIR, load_catalog(version), months, engine,
+                                                      capacity=KEYWORD_CAPACITY, exact_rows=KEYWORD_EXACT_ROWS,
+                                                      workers=KEYWORD_WORKERS)
+    return analytics.load_keyword_index(DATA_DIR, load_catalog(version), months, load_query_engine(version, months),
+                                        workers=KEYWORD_WORKERS)
+
+@st.cache_resource(max_entries=3, show_spinner="検索索引を読み込み中...")
+def load_ngram_index(version: tuple, months: tuple) -> NgramIndex:
+    """発言テキストの n-gram 転置索引（部分一致検索用）"""
+    return analytics.load_ngram_index(DATA_DIR, load_catalog(version), months, load_query_engine(version, months))
+
+@st.cache_resource(max_entries=3, show_spinner="フィルタ用索引を作成中...")
+def load_query_engine(version: tuple, months: tuple) -> QueryEngine:
+    """フィルタ用索引（日付の並び順・カテゴリコード）と本文ファイル（メモリマップ）"""
+    return analytics.load_query_engine(DATA_DIR, load_data(version, months))
+
+@st.cache_resource(max_entries=1, show_spinner="集計表を読み込み中...")
+def load_rollup_cube(version: tuple) -> RollupCube:
+    """日付×院×委員会×政党×発言者の集計表（全期間）"""
+    return analytics.load_rollup_cube(DATA_DIR, load_catalog(version))
+
+# セクションごとの処理時間（メモリはデバッグ情報を表示するときだけ計測）
+profiler = Profiler(measure_memory=st.session_state.get("show_debug_info", False))
+
+# データ読み込み（ここでは月別ファイルの一覧だけ。発言は期間が決まってから読む）
+data_version = dataset_version(DATA_DIR)
+result_cache = get_result_cache()
+result_cache.use_version(data_version)
+catalog = load_catalog(data_version)
+date_min, date_max = catalog_bounds(catalog) if catalog else (None, None)
 
-if speeches.empty:
+# メインタイトル
+coverage = f"（収録期間: {date_min:%Y/%m/%d}〜{date_max:%Y/%m/%d}）" if date_min else ""
+st.markdown(f"""
+<div class="main-header">
+    <h1>🏛️ 国会ダッシュボード</h1>
+    <p>国会会議録から議論の全体像を可視化{coverage}</p>
+</div>
+""", unsafe_allow_html=True)
+
+if not catalog.get("rows"):
     st.stop()
 
+rollup_cube = load_rollup_cube(data_version)
+
 # =========================
 # サイドバー：フィルタ設定
 # =========================
@@ -229,9 +212,7 @@ with st.sidebar:
     st.header("🔍 フィルタ設定")
     
     # 日付フィルタ
-    if not speeches["date"].isna().all():
-        date_min = speeches["date"].min().date()
-        date_max = speeches["date"].max().date()
+    if date_min is not None:
         date_range = st.date_input(
             "📅 期間選択", 
             value=(date_min, date_max),
@@ -243,7 +224,7 @@ with st.sidebar:
         date_range = None
     
     # 院フィルタ
-    available_houses = sorted([h for h in speeches["house"].unique() if h and h != "院不明"])
+    available_houses = sorted([h for h in rollup_cube.cube["house"].unique() if h and h != "院不明"])
     if available_houses:
         houses = st.multiselect(
             "🏛️ 院選択", 
@@ -254,7 +235,7 @@ with st.sidebar:
         houses = []
     
     # 委員会フィルタ
-    available_committees = sorted([c for c in speeches["committee"].unique() 
+    available_committees = sorted([c for c in rollup_cube.cube["committee"].unique() 
                                  if c and c != "委員会不明"])[:20]  # 表示を20個に制限
     if available_committees:
         committees = st.multiselect(
@@ -275,41 +256,74 @@ with st.sidebar:
     
     st.markdown("---")
     st.markdown("### 📊 表示設定")
-    show_debug_info = st.checkbox("デバッグ情報を表示", value=False)
+    show_debug_info = st.checkbox("デバッグ情報を表示", value=False, key="show_debug_info")
     
     # グラフ表示オプション
     st.markdown("### 🎨 グラフオプション")
     chart_height = st.slider("チャート高さ", min_value=300, max_value=800, value=500, step=50)
     use_horizontal_layout = st.checkbox("長いラベルは横棒グラフで表示", value=True)
     max_items_display = st.slider("最大表示項目数", min_value=10, max_value=50, value=20, step=5)
+    # 会期は国会の回次が分かるデータのときだけ選べる
+    timeline_options = ["auto", "day", "week", "month"] + (["session"] if analytics.has_sessions(rollup_cube.cube) else [])
+    timeline_unit = st.selectbox(
+        "推移の集計単位",
+        options=timeline_options,
+        format_func=lambda unit: "自動（期間の長さで選ぶ）" if unit == "auto" else TIMELINE_LABELS[unit],
+    )
 
 # =========================
 # データフィルタリング
 # =========================
-filtered_df = speeches.copy()
-
-# 日付フィルタ適用
+# 範囲を選んでいる途中（開始日だけの 1 要素）は、前回の完全な範囲のままにする（全期間を読み込まない）
 if date_range and len(date_range) == 2:
-    filtered_df = filtered_df[
-        (filtered_df["date"] >= pd.to_datetime(date_range[0])) & 
-        (filtered_df["date"] <= pd.to_datetime(date_range[1]))
-    ]
-
-# 院フィルタ適用
-if houses:
-    filtered_df = filtered_df[filtered_df["house"].isin(houses)]
-
-# 委員会フィルタ適用
-if committees:
-    filtered_df = filtered_df[filtered_df["committee"].isin(committees)]
-
-# キーワードフィルタ適用
-if keyword_input.strip():
-    keywords = [k.strip() for k in keyword_input.split() if k.strip()]
-    pattern = "|".join(map(re.escape, keywords))
-    filtered_df = filtered_df[
-        filtered_df["speech"].fillna("").str.contains(pattern, regex=True, case=False)
-    ]
+    st.session_state["last_date_range"] = tuple(date_range)
+selected_dates = st.session_state.get("last_date_range") if date_range else None
+
+# 選択期間に掛かる月のファイルだけを読み込む（索引も月の組ごとに作る）
+months = select_months(catalog, selected_dates)
+query_engine = load_query_engine(data_version, months)
+profiler.lap("load", rows=len(query_engine.meta))
+
+# 日付・院・委員会・キーワードフィルタ適用（行位置の配列で絞り込む）
+keywords = analytics.parse_keywords(keyword_input)
+filtered_rows = analytics.filter_rows(
+    query_engine,
+    date_range=selected_dates,
+    houses=houses,
+    committees=committees,
+    keywords=keywords,
+    ngram_index=load_ngram_index(data_version, months) if keywords else None,
+)
+
+# 以降の集計はテキストを含まない列だけを使う（index は元の行位置）
+filtered_df = query_engine.frame(filtered_rows)
+# 集計結果キャッシュのキー
+view_key = filter_key(selected_dates, houses, committees, keywords)
+
+# 発言数・文字数の集計元（キーワード未指定なら集計表、指定時はヒットした発言行）
+stats_df = analytics.stats_frame(
+    filtered_df,
+    rollup_cube,
+    date_range=selected_dates,
+    houses=houses,
+    committees=committees,
+    keywords=keywords,
+)
+profiler.lap("filter", rows=len(query_engine.meta))
+
+
+def finish_profiling():
+    """最大 RSS の計測を手放し、ログの設定があれば計測結果を追記する"""
+    profiler.close()
+    if PROFILE_LOG:
+        profiler.write_log(
+            PROFILE_LOG,
+            session=st.session_state.setdefault("profile_session", uuid.uuid4().hex[:12]),
+            date_range=selected_dates,
+            months=len(months),
+            keyword=keyword_input.strip(),
+            filtered_rows=len(filtered_df),
+        )
 
 # =========================
 # メトリクス表示
@@ -317,25 +331,25 @@ if keyword_input.strip():
 col1, col2, col3, col4 = st.columns(4)
 
 with col1:
-    st.metric("📝 総発言数", f"{len(filtered_df):,}件")
+    st.metric("📝 総発言数", f"{stats_df['row_count'].sum():,}件")
 
 with col2:
-    if not filtered_df.empty:
-        unique_speakers = filtered_df["speaker"].nunique()
+    if not stats_df.empty:
+        unique_speakers = stats_df["speaker"].nunique()
         st.metric("👥 発言者数", f"{unique_speakers:,}人")
     else:
         st.metric("👥 発言者数", "0人")
 
 with col3:
-    if not filtered_df.empty:
-        total_chars = filtered_df["char_count"].sum()
+    if not stats_df.empty:
+        total_chars = stats_df["char_count"].sum()
         st.metric("📊 総文字数", f"{total_chars:,}文字")
     else:
         st.metric("📊 総文字数", "0文字")
 
 with col4:
-    if not filtered_df.empty:
-        unique_parties = filtered_df["party"].nunique()
+    if not stats_df.empty:
+        unique_parties = stats_df["party"].nunique()
         st.metric("🏢 政党数", f"{unique_parties:,}")
     else:
         st.metric("🏢 政党数", "0")
@@ -343,6 +357,7 @@ with col4:
 # データが空の場合の処理
 if filtered_df.empty:
     st.warning("⚠️ 選択された条件に該当するデータがありません。フィルタ条件を見直してください。")
+    finish_profiling()
     st.stop()
 
 st.markdown("---")
@@ -352,18 +367,11 @@ st.markdown("---")
 # =========================
 st.header("🔤 議論されているキーワード")
 
-# キーワード抽出
+# キーワード抽出（索引からフィルタ後の行を集計）
 with st.spinner("キーワードを分析中..."):
-    all_keywords = []
-    for speech in filtered_df['speech'].fillna(''):
-        all_keywords.extend(extract_keywords(speech))
-    
-    # 頻出キーワードTop30
-    keyword_counter = collections.Counter(all_keywords)
-    top_keywords = pd.DataFrame(
-        keyword_counter.most_common(30), 
-        columns=['term', 'count']
-    )
+    # 頻出キーワードTop30（キャッシュにあれば索引も読まない）
+    top_keywords = result_cache.get("keywords", view_key, lambda: analytics.keyword_ranking(
+        load_keyword_index(data_version, months), filtered_df, n=30))
 
 if len(top_keywords) > 0:
     # 2列レイアウト
@@ -371,7 +379,7 @@ if len(top_keywords) > 0:
     
     with col1:
         st.subheader("📈 頻出キーワード Top30")
-        keyword_chart = alt.Chart(top_keywords.head(20)).mark_bar().encode(
+        keyword_chart = alt.Chart(top_keywords[['term', 'count']].head(20)).mark_bar().encode(
             x=alt.X('count:Q', title='出現回数'),
             y=alt.Y('term:N', sort='-x', title='キーワード'),
             color=alt.Color('count:Q', scale=alt.Scale(scheme='blues')),
@@ -380,6 +388,8 @@ if len(top_keywords) > 0:
             height=500
         )
         st.altair_chart(keyword_chart, use_container_width=True)
+        if "error" in top_keywords and top_keywords["error"].max() > 0:
+            st.caption(f"対象の発言が多いため出現回数は近似値です（多めの見積もり分は最大 {top_keywords['error'].max():,} 回）")
     
     with col2:
         st.subheader("🎯 キーワード詳細")
@@ -391,28 +401,24 @@ if len(top_keywords) > 0:
             )
             
             # 選択されたキーワードの使用例
-            examples = filtered_df[
-                filtered_df['speech'].fillna('').str.contains(
-                    re.escape(selected_term), regex=True
-                )
-            ].sort_values('date', ascending=False)
+            examples = analytics.keyword_examples(
+                query_engine, load_ngram_index(data_version, months), filtered_df, selected_term, n=3
+            )
             
             st.markdown(f"**キーワード「{selected_term}」の使用例:**")
-            for idx, row in examples.head(3).iterrows():
+            for idx, row in examples.iterrows():
                 # 発言の一部を抜粋
-                speech_text = str(row['speech'])
-                if len(speech_text) > 150:
-                    speech_text = speech_text[:150] + "..."
-                
                 st.markdown(f"""
                 **{row['speaker']}** ({row['party']}) - {row['date'].strftime('%Y-%m-%d')}  
-                "{speech_text}"
+                "{row['speech']}"
                 """)
+    profiler.lap("keywords", rows=len(filtered_df))
     
     # ヒートマップ（政党×キーワード）
     st.subheader("🔥 政党×主要キーワード ヒートマップ")
     
-    heatmap_data = create_heatmap_data(filtered_df, top_keywords, top_n=15)
+    heatmap_data = result_cache.get("heatmap", view_key, lambda: analytics.heatmap(
+        filtered_df, top_keywords, load_keyword_index(data_version, months), top_n=15))
     
     if len(heatmap_data) > 0:
         if show_debug_info:
@@ -422,6 +428,13 @@ if len(top_keywords) > 0:
                 st.write(f"政党数: {heatmap_data['party'].nunique()}")
                 st.dataframe(heatmap_data.head(10))
         
+        # セル数が多い場合は上位のキーワード（20個まで）・政党だけを表示
+        n_cells = heatmap_data['term'].nunique() * heatmap_data['party'].nunique()
+        heatmap_data = analytics.limit_heatmap(heatmap_data, max_terms=20, max_cells=MAX_HEATMAP_CELLS)
+        if heatmap_data['term'].nunique() * heatmap_data['party'].nunique() < n_cells:
+            st.info(f"⚠️ 項目数が多いため、上位{heatmap_data['term'].nunique()}キーワード × "
+                    f"{heatmap_data['party'].nunique()}政党のみ表示しています")
+        
         # キーワードと政党の順序を決定
         term_order = (heatmap_data.groupby('term')['count'].sum()
                      .sort_values(ascending=False).index.tolist())
@@ -432,12 +445,6 @@ if len(top_keywords) > 0:
         max_term_length = max([len(term) for term in term_order]) if term_order else 0
         max_party_length = max([len(party) for party in party_order]) if party_order else 0
         
-        # キーワード数が多い場合は表示数を制限
-        if len(term_order) > 20:
-            term_order = term_order[:20]
-            heatmap_data = heatmap_data[heatmap_data['term'].isin(term_order)]
-            st.info("⚠️ キーワード数が多いため、上位20個のみ表示しています")
-        
         heatmap_chart = alt.Chart(heatmap_data).mark_rect(stroke='white', strokeWidth=1).encode(
             x=alt.X('term:O', 
                    title='キーワード',
@@ -477,9 +484,11 @@ if len(top_keywords) > 0:
         st.altair_chart(heatmap_chart, use_container_width=True)
     else:
         st.info("ℹ️ ヒートマップ用のデータが不足しています。")
+    profiler.lap("heatmap", rows=len(filtered_df))
 
 else:
     st.info("ℹ️ キーワードが抽出できませんでした。データの内容やフィルタ条件を確認してください。")
+    profiler.lap("keywords", rows=len(filtered_df))
 
 st.markdown("---")
 
@@ -492,13 +501,9 @@ col1, col2 = st.columns(2)
 
 with col1:
     st.subheader("👤 議員別発言量 Top20")
-    if not filtered_df.empty:
-        speaker_ranking = (
-            filtered_df.groupby(["speaker", "party"], as_index=False)["char_count"]
-            .sum()
-            .sort_values("char_count", ascending=False)
-            .head(20)
-        )
+    if not stats_df.empty:
+        speaker_ranking = result_cache.get("speaker_ranking", view_key,
+                                           lambda: analytics.speaker_ranking(stats_df, n=20))
         
         speaker_chart = alt.Chart(speaker_ranking).mark_bar().encode(
             x=alt.X("char_count:Q", title="発言文字数"),
@@ -513,16 +518,8 @@ with col1:
 
 with col2:
     st.subheader("🏢 政党別発言数")
-    if not filtered_df.empty:
-        party_stats = (
-            filtered_df.groupby("party", as_index=False)
-            .agg({
-                "speech": "count",
-                "char_count": "sum"
-            })
-            .rename(columns={"speech": "speech_count"})
-            .sort_values("speech_count", ascending=False)
-        )
+    if not stats_df.empty:
+        party_stats = result_cache.get("party_ranking", view_key, lambda: analytics.party_ranking(stats_df))
         
         # 政党名が長い場合は横棒グラフに変更
         if len(party_stats) > 8 or party_stats['party'].str.len().max() > 6:
@@ -546,27 +543,34 @@ with col2:
     else:
         st.info("データがありません")
 
-# 時系列分析
-st.subheader("📈 発言数の推移（日別）")
-if not filtered_df.empty and not filtered_df["date"].isna().all():
-    daily_stats = (
-        filtered_df.groupby("date", as_index=False)
-        .agg({
-            "speech": "count",
-            "char_count": "sum"
-        })
-        .rename(columns={"speech": "speech_count"})
+profiler.lap("rankings", rows=len(stats_df))
+
+# 時系列分析（期間が長いときは週・月・会期ごとにまとめ、点の数を MAX_CHART_POINTS 以下にする）
+has_dates = not stats_df.empty and not stats_df["date"].isna().all()
+granularity = timeline_unit
+if granularity == "auto":
+    granularity = analytics.timeline_granularity(stats_df, MAX_CHART_POINTS) if has_dates else "day"
+st.subheader(f"📈 発言数の推移（{TIMELINE_LABELS[granularity]}別）")
+if has_dates:
+    timeline_stats = result_cache.get(
+        f"timeline:{granularity}:{MAX_CHART_POINTS}", view_key,
+        lambda: analytics.timeline(stats_df, granularity, max_points=MAX_CHART_POINTS),
     )
     
-    timeline_chart = alt.Chart(daily_stats).mark_line(point=True).encode(
+    tooltip = [alt.Tooltip("date:T", title="開始日"), alt.Tooltip("end:T", title="終了日"),
+               alt.Tooltip("speech_count:Q", title="発言数"), alt.Tooltip("char_count:Q", title="文字数")]
+    if granularity == "session":
+        tooltip.insert(0, alt.Tooltip("session:Q", title="回次"))
+    timeline_chart = alt.Chart(timeline_stats).mark_line(point=True).encode(
         x=alt.X("date:T", title="日付"),
         y=alt.Y("speech_count:Q", title="発言数"),
-        tooltip=["date:T", "speech_count:Q", "char_count:Q"]
+        tooltip=tooltip
     ).properties(height=300)
     
     st.altair_chart(timeline_chart, use_container_width=True)
 else:
     st.info("ℹ️ 日付データが不足しているため時系列分析をスキップします")
+profiler.lap("timeline", rows=len(stats_df))
 
 st.markdown("---")
 
@@ -576,23 +580,8 @@ st.markdown("---")
 st.header("📰 最新の発言")
 
 if not filtered_df.empty:
-    latest_speeches = (
-        filtered_df.sort_values("date", ascending=False)
-        .head(20)
-        [["date", "house", "committee", "speaker", "party", "speech"]]
-        .copy()
-    )
-    
-    # 発言を適切な長さに切り詰め
-    latest_speeches["speech"] = (
-        latest_speeches["speech"]
-        .fillna("")
-        .astype(str)
-        .apply(lambda x: (x[:200] + "...") if len(x) > 200 else x)
-    )
-    
-    # 日付を読みやすい形式に変換
-    latest_speeches["date"] = latest_speeches["date"].dt.strftime("%Y-%m-%d")
+    # 新しい順に 20 件（行番号は読み込んだ月の中での位置ではなく全期間での通し番号）
+    latest_speeches = analytics.latest_speeches(filtered_df, query_engine, n=20)
     
     st.dataframe(
         latest_speeches, 
@@ -608,6 +597,33 @@ if not filtered_df.empty:
     )
 else:
     st.info("表示する発言がありません")
+profiler.lap("latest", rows=len(filtered_df))
+
+# =========================
+# デバッグ情報（セクションごとの処理時間・メモリ）
+# =========================
+if show_debug_info:
+    with st.expander("⏱️ 処理時間・メモリ（セクション別）", expanded=True):
+        st.dataframe(
+            profiler.frame(),
+            use_container_width=True,
+            column_config={
+                "section": "セクション",
+                "seconds": st.column_config.NumberColumn("経過時間（秒）", format="%.3f"),
+                "rows": "処理行数",
+                "peak_mb": st.column_config.NumberColumn("区間内の最大 RSS の増分（MB・プロセス全体）", format="%.1f"),
+                "retained_mb": st.column_config.NumberColumn("RSS の増分（MB）", format="%.1f"),
+            }
+        )
+        st.caption("メモリはプロセスの RSS（同時に開いている他のセッションの分も含む）。最大 RSS は Linux でだけ、同時に計測している他のセッションがないときに計測します（計測中の他のセッションがあれば空欄）。デバッグ情報を有効にした次の再表示から計測します。")
+        cache_stats = result_cache.stats()
+        st.caption(
+            f"集計結果キャッシュ（全セッション共有）: {cache_stats['entries']}件 "
+            f"{cache_stats['bytes'] / 2**20:.1f}MB / 上限 {RESULT_CACHE_ENTRIES}件・{RESULT_CACHE_MB}MB、"
+            f"ヒット {cache_stats['hits']:,}・ミス {cache_stats['misses']:,}（ヒット率 {cache_stats['hit_rate']:.0%}）、"
+            f"追い出し {cache_stats['evictions']:,}"
+        )
+finish_profiling()
 
 # =========================
 # フッター
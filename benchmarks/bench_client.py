@@ -0,0 +1,93 @@
+"""
+API クライアント（kokkai_api.ApiClient）のベンチマーク（ローカルの FakeApi を相手にする）
+- 接続の使い回し: ページごとに requests.get する旧実装と比べ、時間とサーバーが受けた接続数を出す
+- 再試行: 一定割合で 503 / 429 を返すサーバーから fetch で全件を取り、件数・再試行の回数・最後の間隔を出す
+  （旧実装は最初のエラーで止まる）
+
+    python benchmarks/bench_client.py
+    python benchmarks/bench_client.py --pages 300 --error-rate 0.2 --latency 0.01
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import requests
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kokkai_api import PAGE_SIZE, UA, ApiClient, FetchStats, fetch  # noqa: E402
+from tests.support.fake_api import FakeApi  # noqa: E402
+
+
+def legacy_pages(base_url: str, pages: int) -> int:
+    """旧実装（接続を使い回さない・再試行しない）。取得できたページ数を返す"""
+    done = 0
+    for i in range(pages):
+        params = {"recordPacking": "json", "maximumRecords": PAGE_SIZE, "startRecord": 1 + i * PAGE_SIZE}
+        try:
+            r = requests.get(f"{base_url}/speech", params=params, headers={"User-Agent": UA}, timeout=60)
+            r.raise_for_status()
+        except requests.RequestException:
+            break
+        r.json()
+        done += 1
+    return done
+
+
+def client_pages(client: ApiClient, pages: int) -> int:
+    for i in range(pages):
+        client.get("speech", {"recordPacking": "json", "maximumRecords": PAGE_SIZE, "startRecord": 1 + i * PAGE_SIZE})
+    return pages
+
+
+def measure(server: FakeApi, func):
+    server.connections = server.requests = server.errors = 0
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--speeches", type=int, default=3000)
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--latency", type=float, default=0.0, help="サーバーの応答までの秒数")
+    parser.add_argument("--rate", type=float, default=200.0, help="クライアントの秒間リクエスト数の上限")
+    parser.add_argument("--workers", type=int, default=2)
+    args = parser.parse_args()
+
+    server = FakeApi(n_speeches=args.speeches, latency=args.latency).start()
+    try:
+        print(f"{'method':<26} {'time[s]':>8} {'pages':>6} {'requests':>9} {'connections':>12}")
+        seconds, done = measure(server, lambda: legacy_pages(server.base_url, args.pages))
+        print(f"{'requests.get (legacy)':<26} {seconds:>8.2f} {done:>6} {server.requests:>9} {server.connections:>12}")
+        client = ApiClient(server.base_url, rate=args.rate, adaptive=False)
+        seconds, done = measure(server, lambda: client_pages(client, args.pages))
+        print(f"{'ApiClient (session)':<26} {seconds:>8.2f} {done:>6} {server.requests:>9} {server.connections:>12}")
+        client.close()
+
+        server.error_rate = args.error_rate
+        print(f"\nerror_rate={args.error_rate}")
+        seconds, done = measure(server, lambda: legacy_pages(server.base_url, args.pages))
+        print(f"{'requests.get (legacy)':<26} {seconds:>8.2f} pages={done} (止まったまで) errors={server.errors}")
+        for retry_after in (None, 0.05):
+            server.retry_after = retry_after
+            stats = FetchStats()
+            client = ApiClient(server.base_url, rate=args.rate, stats=stats, pool_size=args.workers, backoff=0.02)
+            seconds, (df, *_) = measure(server, lambda: fetch(
+                "2025-01-01", "2025-12-31", ["両院"], [], "", "なし（全文対象）", True,
+                workers=args.workers, client=client))
+            summary = stats.summary()
+            status = "429+Retry-After" if retry_after else "503"
+            print(f"{f'fetch + ApiClient ({status})':<26} {seconds:>8.2f} rows={len(df):,}/{len(server.records):,} "
+                  f"errors={server.errors} retries={summary['retries']} connections={server.connections} "
+                  f"rate={client.limiter.rate:.1f}/{args.rate:.0f} p95={summary['latency_ms']['p95']}ms")
+            client.close()
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
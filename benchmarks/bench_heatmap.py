@@ -0,0 +1,51 @@
+"""
+政党×キーワード ヒートマップ作成のベンチマーク
+- 旧実装（政党ごとの再抽出 + 二重ループの 0 埋め）と索引からの一括集計を比較する
+- 行数を倍々に増やし、処理時間と結果の一致を確認する
+
+    python benchmarks/bench_heatmap.py --sizes 2000 4000 8000 16000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from keyword_index import KeywordIndex, create_heatmap_data  # noqa: E402
+from tests.support.corpus import make_speeches  # noqa: E402
+from tests.support.legacy import legacy_heatmap_data  # noqa: E402
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[2000, 4000, 8000, 16000])
+    parser.add_argument("--top-n", type=int, default=15)
+    parser.add_argument("--skip-legacy", action="store_true", help="旧実装の計測を省略")
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'legacy[s]':>10} {'index[s]':>10} {'build[s]':>10} {'index/row[us]':>14} {'identical':>9}")
+    for n_rows in args.sizes:
+        df = make_speeches(n_rows)
+        index, build_sec = timed(KeywordIndex.build, df["speech"])
+        top_terms = index.top_terms(df.index.to_numpy(), n=30)
+
+        result, index_sec = timed(create_heatmap_data, df, top_terms, index, top_n=args.top_n)
+        if args.skip_legacy:
+            legacy_sec, identical = float("nan"), "-"
+        else:
+            expected, legacy_sec = timed(legacy_heatmap_data, df, top_terms, top_n=args.top_n)
+            identical = "yes" if result.equals(expected) else "NO"
+
+        print(f"{n_rows:>9,} {legacy_sec:>10.3f} {index_sec:>10.4f} {build_sec:>10.3f} "
+              f"{index_sec / n_rows * 1e6:>14.3f} {identical:>9}")
+
+
+if __name__ == "__main__":
+    main()
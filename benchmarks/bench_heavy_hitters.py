@@ -0,0 +1,82 @@
+"""
+頻出キーワードの近似集計（heavy_hitters.SpaceSaving）のベンチマーク
+- 旧実装（全発言の語を 1 つのリストに集めて Counter で数える）と、語のジェネレータを Space-Saving で数える方法を比較する
+- 時間・メモリの最大使用量（tracemalloc）・上位 n 語の正解率（recall）・回数の誤差（真の回数との差の最大）を出す
+- 語の見積もりが範囲（count - error 以上 count 以下）に入っていることも確認する
+
+    python benchmarks/bench_heavy_hitters.py
+    python benchmarks/bench_heavy_hitters.py --rows 200000 --capacities 1000 10000 50000
+"""
+import argparse
+import collections
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from heavy_hitters import SpaceSaving  # noqa: E402
+from keyword_index import get_tokenizer  # noqa: E402
+from tests.support.corpus import make_speeches  # noqa: E402
+
+
+def tokens(speeches):
+    """発言ごとに語を出すジェネレータ（全体のリストは作らない）"""
+    tokenizer = get_tokenizer()
+    for text in speeches:
+        yield from tokenizer.tokenize(text)
+
+
+def legacy_counts(speeches) -> collections.Counter:
+    all_keywords = []
+    for text in speeches:
+        all_keywords.extend(get_tokenizer().tokenize(text))
+    return collections.Counter(all_keywords)
+
+
+def measure(func):
+    """時間（tracemalloc なし）とメモリの最大使用量（tracemalloc あり、もう一度実行）"""
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return seconds, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--capacities", type=int, nargs="+", default=[1_000, 10_000, 50_000])
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--top", type=int, default=30)
+    args = parser.parse_args()
+
+    speeches = make_speeches(args.rows)["speech"].tolist()
+    legacy_sec, legacy_peak, truth = measure(lambda: legacy_counts(speeches))
+    # 同数の語はどれが上位に入ってもよいので、n 番目の真の回数以上なら正解とする
+    nth = truth.most_common(args.top)[-1][1]
+    print(f"rows={args.rows:,} tokens={sum(truth.values()):,} terms={len(truth):,}")
+    print(f"{'method':<22} {'time[s]':>8} {'peak[MB]':>9} {'recall':>7} {'max_error':>10} {'guaranteed':>10} {'bounded':>8}")
+    print(f"{'Counter(list)':<22} {legacy_sec:>8.2f} {legacy_peak / 2**20:>9.1f} {1:>7.2f} {0:>10} {args.top:>10} {'yes':>8}")
+
+    for capacity in args.capacities:
+        def run():
+            counter = SpaceSaving(capacity)
+            counter.consume(tokens(speeches), batch_size=args.batch_size)
+            return counter
+
+        seconds, peak, counter = measure(run)
+        top = counter.top(args.top)
+        actual = top["term"].map(truth).to_numpy()
+        recall = (actual >= nth).mean()
+        bounded = ((top["count"] - top["error"] <= actual) & (actual <= top["count"])).all()
+        print(f"{f'SpaceSaving({capacity:,})':<22} {seconds:>8.2f} {peak / 2**20:>9.1f} {recall:>7.2f} "
+              f"{int((top['count'] - actual).max()):>10} {int(top['guaranteed'].sum()):>10} {'yes' if bounded else 'NO':>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+"""
+キーワード索引（KeywordIndex.build）の作成時間のベンチマーク
+- 1 プロセスと複数プロセスで作成し、結果（語彙・行・語 ID・回数）が一致することも確認する
+
+    python benchmarks/bench_keywords.py --rows 200000 --workers 1 2 4 8
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from keyword_index import KeywordIndex  # noqa: E402
+from tests.support.corpus import make_speeches  # noqa: E402
+
+
+def same_index(a: KeywordIndex, b: KeywordIndex) -> bool:
+    return (a.vocab == b.vocab and a.n_rows == b.n_rows
+            and all(np.array_equal(getattr(a, name), getattr(b, name)) for name in ("rows", "cols", "counts")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    df = make_speeches(args.rows)
+    print(f"rows={args.rows:,} cpus={os.cpu_count()}")
+    print(f"{'workers':>7} {'build[s]':>9} {'speedup':>8} {'identical':>9}")
+    baseline, serial_time = None, None
+    for workers in sorted(set(args.workers)):
+        start = time.perf_counter()
+        index = KeywordIndex.build(df["speech"], chunk_size=args.chunk_size, workers=workers)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = KeywordIndex.build(df["speech"], chunk_size=args.chunk_size) if workers != 1 else index
+            serial_time = elapsed if workers == 1 else None
+        speedup = f"{serial_time / elapsed:.2f}x" if serial_time else "-"
+        print(f"{workers:>7} {elapsed:>9.2f} {speedup:>8} {'yes' if same_index(index, baseline) else 'NO':>9}")
+
+
+if __name__ == "__main__":
+    main()
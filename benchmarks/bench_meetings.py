@@ -0,0 +1,87 @@
+"""
+会議単位の取得（kokkai_api.harvest_meetings）のベンチマーク
+- speech エンドポイントで全発言を取る方法（fetch）と比べ、リクエスト数・受信バイト数・時間と、取れた発言が同じかを出す
+- 既定はローカルの FakeApi を相手にする。--fixtures を指定すると応答を JSON ファイルに記録し、
+  もう一度実行すると記録から再生する（ネットワークに出ない）。--base-url で本物の API から記録もできる
+- --replay は記録だけで動かす（サーバーを起動せず、記録にない応答があれば CacheMiss で止まる）。
+  記録のない方法（speech/ がなければ speech エンドポイント）は飛ばす。
+  benchmarks/fixtures/meetings は FakeApi（--speeches 1000）から 2025-01〜03 の会議単位の取得を記録したもの
+  （合成データ。tests/test_meetings.py でも使う）
+
+    python benchmarks/bench_meetings.py
+    python benchmarks/bench_meetings.py --fixtures benchmarks/fixtures/meetings --replay --from 2025-01-01 --until 2025-03-31
+    python benchmarks/bench_meetings.py --speeches 20000 --latency 0.05
+    python benchmarks/bench_meetings.py --fixtures benchmarks/fixtures/meetings --base-url https://kokkai.ndl.go.jp/api \
+        --from 2025-06-01 --until 2025-06-07 --rate 0.5
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kokkai_api import API_BASE, ApiClient, FetchStats, fetch, harvest_meetings  # noqa: E402
+from response_cache import FixtureCache  # noqa: E402
+from tests.support.fake_api import FakeApi  # noqa: E402
+
+
+def run(method: str, base_url: str, args, fixtures: Path | None):
+    stats = FetchStats()
+    cache = None
+    if fixtures is not None:
+        # 記録があれば再生し、なければ取得して記録する
+        cache = FixtureCache(fixtures / method, offline=args.replay)
+    client = ApiClient(base_url, rate=args.rate, cache=cache, stats=stats, pool_size=args.workers)
+    start = time.perf_counter()
+    if method == "speech":
+        df = fetch(args.date_from, args.date_until, ["両院"], [], "", "なし（全文対象）", True,
+                   workers=args.workers, client=client)[0]
+    else:
+        df = harvest_meetings(args.date_from, args.date_until, workers=args.workers, client=client)[0]
+    seconds = time.perf_counter() - start
+    client.close()
+    return seconds, df, stats.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--speeches", type=int, default=10_000, help="FakeApi の発言数")
+    parser.add_argument("--latency", type=float, default=0.02, help="FakeApi の応答までの秒数")
+    parser.add_argument("--base-url", default=None, help="API の URL（既定: FakeApi を起動する）")
+    parser.add_argument("--fixtures", type=Path, default=None, help="応答を記録・再生するディレクトリ")
+    parser.add_argument("--replay", action="store_true", help="--fixtures の記録だけで再生する（サーバーを起動しない）")
+    parser.add_argument("--from", dest="date_from", default="2025-01-01")
+    parser.add_argument("--until", dest="date_until", default="2025-12-31")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rate", type=float, default=100.0)
+    args = parser.parse_args()
+    if args.replay and args.fixtures is None:
+        parser.error("--replay には --fixtures が必要です")
+
+    server = None
+    base_url = args.base_url
+    if args.replay:
+        # 接続先の URL はキーに含まれないので、どこにも接続しない
+        base_url = base_url or API_BASE
+    elif base_url is None:
+        server = FakeApi(n_speeches=args.speeches, latency=args.latency).start()
+        base_url = server.base_url
+    try:
+        print(f"{'method':<10} {'time[s]':>8} {'requests':>9} {'cached':>7} {'bytes[MB]':>10} {'rows':>8} {'same':>5}")
+        expected = None
+        for method in ("speech", "meeting"):
+            if args.replay and not (args.fixtures / method).is_dir():
+                continue
+            seconds, df, summary = run(method, base_url, args, args.fixtures)
+            ids = set(df["speech_id"]) if len(df) else set()
+            expected = ids if expected is None else expected
+            print(f"{method:<10} {seconds:>8.2f} {summary['requests']:>9} {summary['cached']:>7} "
+                  f"{summary['bytes'] / 2**20:>10.1f} {len(df):>8,} {'yes' if ids == expected else 'NO':>5}")
+    finally:
+        if server is not None:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+キーワード検索（部分一致）のベンチマーク
+- str.contains による全件走査と n-gram 転置索引による検索を比較する
+- 月別ファイルごとの索引を concat でまとめる時間も測る。まとめた索引が全体から作った索引と違うか、
+  まとめる時間が全件走査 --max-scans 回分を超えたら終了コード 1（読み込むたびに払う時間なので、走査より遅いと索引の意味がない）
+
+    python benchmarks/bench_ngram.py --rows 100000 --terms 税制 消費税 インフレ
+    python benchmarks/bench_ngram.py --rows 200000 --parts 24
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ngram_index import NgramIndex  # noqa: E402
+from tests.support.corpus import make_speeches  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--n", type=int, default=2, help="n-gram の文字数")
+    parser.add_argument("--terms", nargs="+", default=["税制", "消費税", "サプライチェーン", "防衛予算", "エネルギー 賃金"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--parts", type=int, default=12, help="concat する部分索引の数（月別ファイルの数）")
+    parser.add_argument("--max-scans", type=float, default=5.0, help="concat の時間の上限（全件走査の回数）")
+    args = parser.parse_args()
+
+    df = make_speeches(args.rows)
+    start = time.perf_counter()
+    index = NgramIndex.build(df["speech"], n=args.n)
+    print(f"rows={args.rows:,} build={time.perf_counter() - start:.2f}s "
+          f"grams={len(index.keys):,} postings={len(index.postings):,}")
+
+    print(f"{'query':<20} {'hits':>9} {'scan[ms]':>10} {'index[ms]':>10} {'identical':>9}")
+    for query in args.terms:
+        keywords = query.split()
+        pattern = "|".join(map(re.escape, keywords))
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            expected = np.flatnonzero(df["speech"].fillna("").str.contains(pattern, regex=True, case=False).to_numpy())
+        scan_ms = (time.perf_counter() - start) / args.repeat * 1e3
+
+        start = time.perf_counter()
+        for _ in range(args.repeat):
+            result = index.search(df["speech"], keywords, case=False)
+        index_ms = (time.perf_counter() - start) / args.repeat * 1e3
+
+        identical = "yes" if np.array_equal(result, expected) else "NO"
+        print(f"{query:<20} {len(result):>9,} {scan_ms:>10.1f} {index_ms:>10.2f} {identical:>9}")
+
+    # 月別ファイルごとの索引をまとめる（analytics.load_ngram_index と同じ）
+    parts = [(NgramIndex.build(df["speech"].iloc[rows].reset_index(drop=True), n=args.n), rows)
+             for rows in np.array_split(np.arange(len(df)), args.parts)]
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        merged = NgramIndex.concat(parts, len(df))
+    concat_ms = (time.perf_counter() - start) / args.repeat * 1e3
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        df["speech"].fillna("").str.contains("税制", regex=False)
+    scan_ms = (time.perf_counter() - start) / args.repeat * 1e3
+    identical = all(np.array_equal(getattr(merged, name), getattr(index, name)) for name in ("keys", "indptr", "postings"))
+    ok = identical and concat_ms <= scan_ms * args.max_scans
+    print(f"\nconcat parts={args.parts} postings={len(merged.postings):,} concat[ms]={concat_ms:.1f} "
+          f"scan[ms]={scan_ms:.1f} ({concat_ms / scan_ms:.1f} scans) identical={'yes' if identical else 'NO'} "
+          f"{'ok' if ok else 'SLOW' if identical else 'NG'}")
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+OR 検索の計画（kokkai_api.plan_union）のベンチマーク（ローカルの FakeApi を相手にする）
+- 語ごとに全ページを取る旧方式（plan=False）と、院・委員会ごとに安い取り方を選ぶ方式を比べる
+- リクエスト数・受信バイト数・時間と、取得した発言（speechID の集合）が一致することを確認する
+  （表記ゆれを含めた一致のテストは tests/test_fetch.py）
+
+    python benchmarks/bench_planner.py
+    python benchmarks/bench_planner.py --speeches 20000 --latency 0.05 --terms "予算 税制" "エネルギー デジタル インフレ"
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from kokkai_api import ApiClient, FetchStats, fetch  # noqa: E402
+from tests.support.fake_api import FakeApi  # noqa: E402
+
+
+def run(server: FakeApi, kw: str, houses: list[str], plan: bool, workers: int, rate: float):
+    stats = FetchStats()
+    client = ApiClient(server.base_url, rate=rate, stats=stats, pool_size=workers, adaptive=False)
+    start = time.perf_counter()
+    df = fetch("2025-01-01", "2025-12-31", houses, [], kw, "OR（いずれか含む）", True, workers=workers,
+               client=client, plan=plan)[0]
+    seconds = time.perf_counter() - start
+    client.close()
+    return seconds, df, stats.summary()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--speeches", type=int, default=10_000)
+    parser.add_argument("--terms", nargs="+", default=["税制 予算", "エネルギー デジタル インフレ", "サプライチェーン 防衛"],
+                        help="OR 検索する語（空白区切り）。複数指定すると組ごとに測る")
+    parser.add_argument("--houses", nargs="+", default=["両院"])
+    parser.add_argument("--latency", type=float, default=0.02, help="サーバーの応答までの秒数")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--rate", type=float, default=100.0)
+    args = parser.parse_args()
+
+    server = FakeApi(n_speeches=args.speeches, latency=args.latency).start()
+    try:
+        print(f"{'terms':<28} {'method':<8} {'time[s]':>8} {'requests':>9} {'bytes[MB]':>10} {'rows':>7} "
+              f"{'saved(req/MB)':>14} {'unfiltered':>10} {'same':>5}")
+        for kw in args.terms:
+            results = {}
+            for method, plan in (("per-term", False), ("planned", True)):
+                seconds, df, summary = run(server, kw, args.houses, plan, args.workers, args.rate)
+                results[method] = set(df["speech_id"])
+                report = summary["plan"]
+                saved = (f"{report['requests_saved']}/{(report['bytes_saved'] or 0) / 2**20:.1f}" if report else "")
+                windows = f"{report['unfiltered_windows']}/{report['windows']}" if report else ""
+                same = "yes" if results[method] == results["per-term"] else "NO"
+                print(f"{kw:<28} {method:<8} {seconds:>8.2f} {summary['requests']:>9} {summary['bytes'] / 2**20:>10.1f} "
+                      f"{len(df):>7,} {saved:>14} {windows:>10} {same:>5}")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+キーワード抽出（extract_keywords）のベンチマーク
+- 旧実装（呼び出しごとにパターン文字列・ストップワードを作り、漢字とカタカナで 2 回 findall）と
+  Tokenizer（コンパイル済みパターン 1 回の走査）を比較する
+- 取り出す語が旧実装と一致することは tests/test_keyword_index.py で確認する
+
+    python benchmarks/bench_tokenizer.py --rows 50000
+"""
+import argparse
+import collections
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from keyword_index import Tokenizer, extract_keywords  # noqa: E402
+from tests.support.corpus import make_speeches  # noqa: E402
+from tests.support.legacy import legacy_extract_keywords  # noqa: E402
+
+
+def per_speech_us(func, texts, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in texts:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best / len(texts) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    texts = make_speeches(args.rows)["speech"].tolist()
+
+    tokenizer = Tokenizer()
+    legacy_vocab: dict[str, int] = {}
+    vocab: dict[str, int] = {}
+
+    def legacy_count(text):
+        # 索引作成での旧来の集計（語の Counter → 語 ID）
+        return [(legacy_vocab.setdefault(term, len(legacy_vocab)), count)
+                for term, count in collections.Counter(legacy_extract_keywords(text)).items()]
+
+    def count(text):
+        return list(collections.Counter(tokenizer.term_ids(text, vocab)).items())
+
+    timings = {}
+    print(f"rows={args.rows:,}")
+    print(f"{'method':<28} {'us/speech':>10} {'speedup':>8}")
+    for name, func, baseline in [
+        ("legacy extract_keywords", legacy_extract_keywords, legacy_extract_keywords),
+        ("extract_keywords", extract_keywords, legacy_extract_keywords),
+        ("Tokenizer.tokenize", tokenizer.tokenize, legacy_extract_keywords),
+        ("legacy count (Counter+ids)", legacy_count, legacy_count),
+        ("Tokenizer.term_ids count", count, legacy_count),
+    ]:
+        elapsed = timings[func] = per_speech_us(func, texts, args.repeat)
+        print(f"{name:<28} {elapsed:>10.2f} {timings[baseline] / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
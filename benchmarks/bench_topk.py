@@ -0,0 +1,131 @@
+"""
+上位 k 件の取り出し（最新の発言・使用例・議員別ランキング・キーワード Top30）のベンチマーク
+- 旧実装（フィルタ後の行・集計結果を全部並べ替えてから先頭を取る）と、読み込み時の日付順の順位・部分選択を比較する
+- 既定は 100 万行。本文は使わないので、メタデータと発言×キーワード索引は乱数で直接作る
+- 絞り込みの割合（全件・10%・1%）ごとに時間と結果の一致（最新の発言は日付の並び）を確認する
+
+    python benchmarks/bench_topk.py
+    python benchmarks/bench_topk.py --rows 2000000 --fractions 1 0.1
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from analytics import speaker_ranking  # noqa: E402
+from keyword_index import KeywordIndex  # noqa: E402
+from query_engine import QueryEngine, rollup_rows  # noqa: E402
+from tests.support.corpus import RECORD_COMMITTEES, RECORD_PARTIES, RECORD_PARTY_WEIGHTS, _zipf_weights  # noqa: E402
+
+
+def make_meta(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """本文のない発言メタデータ（日付は平日、発言者は Zipf 分布）"""
+    rng = np.random.default_rng(seed)
+    days = pd.bdate_range("2016-01-04", "2025-08-05")
+    n_speakers = 800
+    speakers = rng.choice(n_speakers, n_rows, p=_zipf_weights(n_speakers))
+    speaker_party = rng.choice(len(RECORD_PARTIES), n_speakers, p=RECORD_PARTY_WEIGHTS)
+    return pd.DataFrame({
+        "date": days[rng.integers(0, len(days), n_rows)],
+        "house": pd.Categorical(rng.choice(["衆議院", "参議院"], n_rows)),
+        "committee": pd.Categorical(np.asarray(RECORD_COMMITTEES)[rng.integers(0, len(RECORD_COMMITTEES), n_rows)]),
+        "party": pd.Categorical(np.asarray(RECORD_PARTIES)[speaker_party[speakers]]),
+        "speaker": pd.Categorical([f"議員{i:03d}" for i in range(n_speakers)])[speakers],
+        "session": pd.array(np.full(n_rows, 200), dtype="Int64"),
+        "has_speech": np.ones(n_rows, dtype=bool),
+        "char_count": rng.integers(20, 2000, n_rows),
+        "speech": None,
+    })
+
+
+def make_index(n_rows: int, terms_per_row: int = 20, vocab_size: int = 200_000, seed: int = 0) -> KeywordIndex:
+    """発言×キーワード索引（語は Zipf 分布）"""
+    rng = np.random.default_rng(seed)
+    rows = np.repeat(np.arange(n_rows, dtype=np.int32), terms_per_row)
+    cols = rng.choice(vocab_size, len(rows), p=_zipf_weights(vocab_size, a=1.05)).astype(np.int32)
+    return KeywordIndex(vocab=[f"語{i}" for i in range(vocab_size)], rows=rows, cols=cols,
+                        counts=rng.integers(1, 4, len(rows)).astype(np.int32), n_rows=n_rows)
+
+
+def legacy_top_terms(index: KeywordIndex, positions: np.ndarray, n: int = 30) -> pd.DataFrame:
+    """旧実装（選択範囲の要素を np.unique で並べ替えて初出位置を求める）"""
+    sel = index._select(positions)
+    cols = index.cols[sel]
+    totals = np.bincount(cols, weights=index.counts[sel], minlength=len(index.vocab))
+    present, first_seen = np.unique(cols, return_index=True)
+    order = np.lexsort((first_seen, -totals[present]))[:n]
+    return pd.DataFrame({
+        'term': [index.vocab[i] for i in present[order]],
+        'count': totals[present[order]].astype(np.int64),
+    })
+
+
+def legacy_speaker_ranking(stats_df: pd.DataFrame, n: int = 20) -> pd.DataFrame:
+    return (
+        stats_df.groupby(["speaker", "party"], as_index=False, observed=True)["char_count"]
+        .sum()
+        .sort_values("char_count", ascending=False)
+        .head(n)
+    )
+
+
+def best_of(func, repeat: int):
+    seconds, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--fractions", type=float, nargs="+", default=[1.0, 0.1, 0.01], help="絞り込み後に残る行の割合")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    meta = make_meta(args.rows, args.seed)
+    engine = QueryEngine(meta, texts=pd.Series([None] * args.rows, dtype=object))
+    index = make_index(args.rows, seed=args.seed)
+    rng = np.random.default_rng(args.seed)
+
+    print(f"{'rows':>9} {'selected':>9} {'section':<16} {'legacy[ms]':>11} {'top-k[ms]':>10} {'speedup':>8} {'identical':>9}")
+    for fraction in args.fractions:
+        rows = np.sort(rng.choice(args.rows, int(args.rows * fraction), replace=False))
+        filtered_df = engine.frame(rows)
+        # 使用例はキーワードを含む行（選択範囲の 3 割とする）
+        matches = np.sort(rng.choice(rows, len(rows) * 3 // 10, replace=False))
+        stats_df = rollup_rows(filtered_df)
+
+        cases = [
+            ("latest(20)",
+             lambda: filtered_df.sort_values("date", ascending=False).head(20)["date"].to_numpy(),
+             lambda: filtered_df.loc[engine.latest(filtered_df.index, 20), "date"].to_numpy()),
+            ("examples(3)",
+             lambda: filtered_df.loc[matches].sort_values("date", ascending=False).head(3)["date"].to_numpy(),
+             lambda: filtered_df.loc[engine.latest(matches, 3), "date"].to_numpy()),
+            ("speaker(20)",
+             lambda: legacy_speaker_ranking(stats_df)["char_count"].to_numpy(),
+             lambda: speaker_ranking(stats_df)["char_count"].to_numpy()),
+            ("keyword_top30",
+             lambda: legacy_top_terms(index, rows),
+             lambda: index.top_terms(rows, n=30)),
+        ]
+        for section, legacy, topk in cases:
+            legacy_sec, expected = best_of(legacy, args.repeat)
+            topk_sec, result = best_of(topk, args.repeat)
+            identical = result.equals(expected) if isinstance(result, pd.DataFrame) else np.array_equal(result, expected)
+            print(f"{args.rows:>9,} {len(rows):>9,} {section:<16} {legacy_sec * 1000:>11.1f} {topk_sec * 1000:>10.1f} "
+                  f"{legacy_sec / topk_sec:>7.1f}x {'yes' if identical else 'NO':>9}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+ダッシュボードの処理段階ごとのベンチマーク（Streamlit なしで実行）
+- make_records で合成した取得 CSV を一時ディレクトリの data/ に置き、app.py と同じ手順で各段階の時間を測る
+- 段階: load_data（初回の月別分割・2 回目以降の読み込み）、索引作成（成果物の作成・保存済みの成果物の読み込み）、
+  フィルタ、キーワード Top30、ヒートマップ（セル数の上限）、議員別・政党別ランキング、
+  推移（日別・期間から選んだ集計単位）、最新の発言
+- 集計は app.py と同じ analytics の関数を使う
+- 結果は JSON（既定: benchmarks/results/suite_<日時>.json）に書き、版ごとに比べられるようにする
+
+    python benchmarks/run_suite.py                         # 10k / 100k / 1M 行
+    python benchmarks/run_suite.py --sizes 10000 --repeat 5 --out results.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import analytics  # noqa: E402
+from dataset import BASE_CSV, month_catalog, read_months, select_months  # noqa: E402
+from query_engine import rollup_rows  # noqa: E402
+from tests.support.corpus import make_records  # noqa: E402
+
+
+def timed(func, repeat: int) -> tuple[list[float], object]:
+    """func を repeat 回実行した時間（秒）と最後の結果"""
+    seconds, result = [], None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        seconds.append(time.perf_counter() - start)
+    return seconds, result
+
+
+def run_size(n_rows: int, seed: int, repeat: int, keyword: str, workers: int, max_points: int = 400,
+             max_cells: int = 600) -> list[dict]:
+    """n_rows 行の合成データで各段階を測る"""
+    results = []
+
+    def record(stage, seconds, rows_in, rows_out=None):
+        results.append({
+            "rows": n_rows, "stage": stage, "rows_in": int(rows_in),
+            "rows_out": None if rows_out is None else int(rows_out),
+            "seconds": seconds, "best": min(seconds), "median": statistics.median(seconds),
+        })
+        print(f"{n_rows:>9,} {stage:<28} {min(seconds) * 1000:>10.1f} ms")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = Path(tmp)
+        make_records(n_rows, seed=seed).to_csv(data_dir / BASE_CSV, index=False)
+
+        # 読み込み（初回は CSV の解析と月別ファイルへの分割、2 回目以降は月別ファイルを読むだけ）
+        seconds, catalog = timed(lambda: month_catalog(data_dir), 1)
+        record("load_data.first_run", seconds, n_rows)
+        months = select_months(catalog)
+        seconds, frame = timed(lambda: read_months(data_dir, catalog, months, columns=analytics.DASHBOARD_COLUMNS), repeat)
+        record("load_data", seconds, n_rows, len(frame))
+
+        # 索引作成（app.py ではデータ読み込みごとに一度だけ）。初回は成果物を作って保存し、2 回目以降は読むだけ
+        seconds, engine = timed(lambda: analytics.load_query_engine(data_dir, frame), 1)
+        record("index.query_engine", seconds, n_rows)
+        for suffix, rebuild in [("", True), (".artifact", False)]:
+            seconds, cube = timed(lambda: analytics.load_rollup_cube(data_dir, catalog, rebuild=rebuild), 1)
+            record(f"index.rollup_cube{suffix}", seconds, n_rows, len(cube.cube))
+        seconds, keyword_index = timed(
+            lambda: analytics.load_keyword_index(data_dir, catalog, months, engine, workers=workers), 1)
+        record("index.keywords", seconds, n_rows, len(keyword_index.vocab))
+        seconds, keyword_index = timed(lambda: analytics.load_keyword_index(data_dir, catalog, months, engine), repeat)
+        record("index.keywords.artifact", seconds, n_rows, len(keyword_index.vocab))
+        seconds, ngram_index = timed(lambda: analytics.load_ngram_index(data_dir, catalog, months, engine), 1)
+        record("index.ngram", seconds, n_rows, len(ngram_index.keys))
+        seconds, ngram_index = timed(lambda: analytics.load_ngram_index(data_dir, catalog, months, engine), repeat)
+        record("index.ngram.artifact", seconds, n_rows, len(ngram_index.keys))
+
+        # フィルタ（既定表示: 全期間・両院・委員会の先頭 20 件、直近 1 か月、キーワード）
+        houses = sorted(h for h in cube.cube["house"].unique() if h and h != "院不明")
+        committees = sorted(c for c in cube.cube["committee"].unique() if c and c != "委員会不明")[:20]
+        date_max = frame["date"].max()
+        last_month = (date_max - pd.Timedelta(days=30), date_max)
+        date_range = (frame["date"].min(), date_max)
+        seconds, rows = timed(lambda: analytics.filter_rows(engine, date_range=date_range, houses=houses,
+                                                            committees=committees), repeat)
+        record("filter.default", seconds, n_rows, len(rows))
+        seconds, month_rows = timed(lambda: analytics.filter_rows(engine, date_range=last_month, houses=houses,
+                                                                  committees=committees), repeat)
+        record("filter.last_month", seconds, n_rows, len(month_rows))
+        seconds, keyword_rows = timed(
+            lambda: ngram_index.search(engine.speech, keyword.split(), positions=rows, case=False), repeat)
+        record("filter.keyword", seconds, len(rows), len(keyword_rows))
+        filtered_df = engine.frame(rows)
+        seconds, stats_df = timed(lambda: analytics.stats_frame(filtered_df, cube, date_range=date_range, houses=houses,
+                                                                committees=committees), repeat)
+        record("filter.rollup", seconds, len(cube.cube), len(stats_df))
+
+        # 各セクション（既定表示の条件で）
+        seconds, top_keywords = timed(lambda: analytics.keyword_ranking(keyword_index, filtered_df, n=30), repeat)
+        record("keyword_top30", seconds, len(filtered_df), len(top_keywords))
+        seconds, heatmap = timed(lambda: analytics.heatmap(filtered_df, top_keywords, keyword_index, top_n=15), repeat)
+        record("heatmap", seconds, len(filtered_df), len(heatmap))
+        seconds, cells = timed(lambda: analytics.limit_heatmap(heatmap, max_terms=20, max_cells=max_cells), repeat)
+        record("heatmap.limit", seconds, len(heatmap), len(cells))
+        seconds, ranking = timed(lambda: analytics.speaker_ranking(stats_df), repeat)
+        record("ranking.speaker", seconds, len(stats_df), len(ranking))
+        seconds, ranking = timed(lambda: analytics.party_ranking(stats_df), repeat)
+        record("ranking.party", seconds, len(stats_df), len(ranking))
+        seconds, timeline = timed(lambda: analytics.timeline(stats_df, "day"), repeat)
+        record("timeline.daily", seconds, len(stats_df), len(timeline))
+        granularity = analytics.timeline_granularity(stats_df, max_points)
+        seconds, timeline = timed(lambda: analytics.timeline(stats_df, granularity, max_points=max_points), repeat)
+        record(f"timeline.auto.{granularity}", seconds, len(stats_df), len(timeline))
+        seconds, latest = timed(lambda: analytics.latest_speeches(filtered_df, engine), repeat)
+        record("latest_speeches", seconds, len(filtered_df), len(latest))
+
+        # キーワード指定時は発言行から集計する
+        keyword_df = engine.frame(keyword_rows)
+        seconds, keyword_stats = timed(lambda: rollup_rows(keyword_df), repeat)
+        record("filter.keyword_rollup", seconds, len(keyword_df), len(keyword_stats))
+    return results
+
+
+def environment() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "pandas": pd.__version__,
+        "numpy": np.__version__,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--repeat", type=int, default=3, help="各段階の繰り返し回数（索引作成は 1 回）")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--keyword", default="税制 消費税", help="キーワードフィルタの検索語（スペース区切り）")
+    parser.add_argument("--workers", type=int, default=1, help="キーワード索引を作るプロセス数")
+    parser.add_argument("--max-points", type=int, default=400, help="推移の点の数の上限（app.py の MAX_CHART_POINTS）")
+    parser.add_argument("--max-cells", type=int, default=600, help="ヒートマップのセル数の上限（MAX_HEATMAP_CELLS）")
+    parser.add_argument("--out", type=Path, default=None)
+    args = parser.parse_args()
+
+    out = args.out or ROOT / "benchmarks" / "results" / f"suite_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    print(f"{'rows':>9} {'stage':<28} {'best':>13}")
+    results = []
+    for n_rows in args.sizes:
+        results.extend(run_size(n_rows, args.seed, args.repeat, args.keyword, args.workers, args.max_points,
+                                  args.max_cells))
+
+    out.parent.mkdir(parents=True, exist_ok=True)
+    report = {"environment": environment(), "params": {**vars(args), "out": str(out)}, "results": results}
+    out.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"saved: {out}")
+
+
+if __name__ == "__main__":
+    main()
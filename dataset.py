@@ -0,0 +1,342 @@
+"""
+発言データの読み込み
+- CSV は月別ファイルを作るときだけ解析し、月別ファイルに直接分ける（本文入りの整形済みコピーは持たない）
+- CSV のサイズ・更新時刻が変わったら月別ファイルを作り直す
+- party / house / committee / speaker など値の種類が少ない列はカテゴリ型で持つ
+- 差分同期（sync_kokkai.py）で追加した発言は partitions/ に日付範囲ごとのファイルで置き、
+  manifest.json に一覧を持つ。dataset_version が変わったら読み込み直す
+- ダッシュボードは元データを月ごとのファイル（months/YYYY-MM/）に分けて持ち、
+  選択期間に掛かる月のファイルの必要な列だけを読む
+- 月別ファイルには発言本文を入れず、本文は text_store のファイルに置いてオフセットだけを持つ
+- 月別ファイルを作り直すときは新しい作成先（months/build-*/）に作り、catalog.json の置き換えで切り替える
+  （読み込み中のほかのセッションは前の作成先をそのまま読める）
+"""
+import contextlib
+import json
+import os
+import shutil
+import tempfile
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from text_store import TEXT_SUFFIX, write_texts
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# 整形処理を変えたら上げる（古いキャッシュを使わないため）
+CACHE_VERSION = 4
+_META_KEY = b"kokkai_dashboard"
+
+BASE_CSV = "speeches_sample.csv"
+PARTITION_DIR = "partitions"
+MANIFEST = "manifest.json"
+MANIFEST_LOCK = "manifest.lock"
+MONTH_DIR = "months"
+CATALOG = "catalog.json"
+BUILD_PREFIX = "build-"
+LOCK_FILE = ".lock"
+# 日付のない発言の置き場所（期間を指定したときは読まない）
+UNDATED = "undated"
+
+REQUIRED_COLUMNS = ["speechURL", "meetingURL", "issueID", "billID",
+                    "speakerGroup", "nameOfHouse", "nameOfMeeting", "session"]
+CATEGORY_COLUMNS = ["party", "house", "committee", "speaker",
+                    "speakerGroup", "nameOfHouse", "nameOfMeeting"]
+
+
+def prepare_speeches(speeches: pd.DataFrame) -> pd.DataFrame:
+    """読み込んだ CSV をダッシュボード用に整形"""
+    # データクレンジング
+    speeches["date"] = pd.to_datetime(speeches["date"], errors="coerce")
+
+    # 文字数計算
+    if "speech" in speeches.columns:
+        speeches["char_count"] = speeches["speech"].fillna("").astype(str).str.len().astype("int64")
+        speeches["has_speech"] = speeches["speech"].notna()
+    else:
+        speeches["char_count"] = 0
+        speeches["has_speech"] = False
+
+    # 欠損列の補完
+    for col in REQUIRED_COLUMNS:
+        if col not in speeches.columns:
+            speeches[col] = None
+
+    # 表記統一
+    speeches["party"] = speeches["speakerGroup"].fillna("政党不明")
+    speeches["house"] = speeches["nameOfHouse"].fillna("院不明")
+    speeches["committee"] = speeches["nameOfMeeting"].fillna("委員会不明")
+    speeches["speaker"] = speeches["speaker"].fillna("発言者不明")
+    # 国会の回次（古い取得データにはない）
+    speeches["session"] = pd.to_numeric(speeches["session"], errors="coerce").astype("Int64")
+
+    # 繰り返しの多い列はカテゴリ型に（カテゴリは名前順）
+    for col in CATEGORY_COLUMNS:
+        speeches[col] = speeches[col].astype("category")
+
+    return speeches
+
+
+def _source_stamp(csv_path: Path) -> dict:
+    stat = csv_path.stat()
+    return {"version": CACHE_VERSION, "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def read_stamped_parquet(cache_path: Path, stamp: dict) -> pd.DataFrame | None:
+    """キャッシュの作成元が stamp と一致していれば読み込む"""
+    if not cache_path.exists():
+        return None
+    try:
+        metadata = pq.read_schema(cache_path).metadata or {}
+        if json.loads(metadata.get(_META_KEY, b"null")) != stamp:
+            return None
+        return pd.read_parquet(cache_path)
+    except (OSError, ValueError, pa.ArrowException):
+        return None
+
+
+def write_stamped_parquet(speeches: pd.DataFrame, cache_path: Path, stamp: dict) -> None:
+    """作成元の stamp をメタデータに付けて保存"""
+    table = pa.Table.from_pandas(speeches, preserve_index=False)
+    table = table.replace_schema_metadata({**(table.schema.metadata or {}), _META_KEY: json.dumps(stamp).encode()})
+    # 他のセッションが読みかけでも壊れないよう、一時ファイルに書いてから置き換える
+    _replace_with(cache_path, lambda tmp_path: pq.write_table(table, tmp_path))
+
+
+def read_speeches(csv_path: Path) -> pd.DataFrame:
+    """発言 CSV を読み込んで整形する"""
+    return prepare_speeches(pd.read_csv(csv_path))
+
+
+def read_manifest(data_dir: Path) -> dict:
+    """差分ファイルの一覧（なければ空）"""
+    path = data_dir / MANIFEST
+    if not path.exists():
+        return {"partitions": []}
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def dataset_version(data_dir: Path) -> tuple:
+    """元 CSV と manifest の更新時刻。値が変われば読み込み直す"""
+    stamps = []
+    for name in (BASE_CSV, MANIFEST):
+        path = data_dir / name
+        stamps.append(path.stat().st_mtime_ns if path.exists() else None)
+    return tuple(stamps)
+
+
+def append_partition(data_dir: Path, speeches: pd.DataFrame) -> dict | None:
+    """取得した発言（CSV と同じ列）を日付範囲のファイルとして追加し、manifest に登録
+
+    日付のない発言は範囲を決められないので入れない（残りがなければ何もせず None）。
+    ファイル名には uuid を付け、manifest の読み書きはロックして、同時に追加しても上書きしない。
+    """
+    dates = pd.to_datetime(speeches["date"], errors="coerce")
+    speeches = speeches[dates.notna().to_numpy()]
+    if speeches.empty:
+        return None
+    dates = dates.dropna()
+    min_date, max_date = dates.min().strftime("%Y-%m-%d"), dates.max().strftime("%Y-%m-%d")
+    name = f"{PARTITION_DIR}/speeches_{min_date}_{max_date}_{uuid.uuid4().hex}.parquet"
+    (data_dir / PARTITION_DIR).mkdir(parents=True, exist_ok=True)
+    speeches.to_parquet(data_dir / name, index=False)
+
+    entry = {"file": name, "min_date": min_date, "max_date": max_date, "rows": len(speeches),
+             "added_at": time.strftime("%Y-%m-%dT%H:%M:%S")}
+    with _locked(data_dir / MANIFEST_LOCK):
+        manifest = read_manifest(data_dir)
+        manifest["partitions"].append(entry)
+        _write_json(data_dir / MANIFEST, manifest)
+    return entry
+
+
+def _replace_with(path: Path, write) -> None:
+    """write(一時ファイル) で書いてから path と置き換える
+
+    一時ファイルは書くたびに別の名前にする（同じプロセスの複数セッションが同じファイルを作っても混ざらない）。
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def _write_json(path: Path, obj) -> None:
+    text = json.dumps(obj, ensure_ascii=False, indent=2)
+    _replace_with(path, lambda tmp_path: Path(tmp_path).write_text(text, encoding="utf-8"))
+
+
+def _sources(data_dir: Path) -> list[dict]:
+    """元 CSV と差分ファイル（読み込み順）"""
+    names = [BASE_CSV] if (data_dir / BASE_CSV).exists() else []
+    names += [p["file"] for p in read_manifest(data_dir)["partitions"]]
+    return [{"name": name, **_source_stamp(data_dir / name)} for name in names]
+
+
+def _read_source(data_dir: Path, name: str) -> pd.DataFrame:
+    if name == BASE_CSV:
+        return read_speeches(data_dir / name)
+    return prepare_speeches(pd.read_parquet(data_dir / name))
+
+
+@contextlib.contextmanager
+def _locked(path: Path):
+    """ほかのスレッド・プロセスと同時に月別ファイル・manifest を書かないようにする（fcntl がなければロックしない）"""
+    with open(path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        yield
+
+
+def _read_catalog(catalog_path: Path) -> dict | None:
+    return json.loads(catalog_path.read_text(encoding="utf-8")) if catalog_path.exists() else None
+
+
+def _sweep_builds(month_dir: Path, keep: set) -> None:
+    """keep 以外の作成先を消す（"" は以前の版の months/ 直下の月ディレクトリ）"""
+    for path in month_dir.iterdir():
+        if not path.is_dir() or path.name in keep:
+            continue
+        if "" in keep and not path.name.startswith(BUILD_PREFIX):
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def month_catalog(data_dir: Path) -> dict:
+    """月ごとのファイルの一覧。まだ分けていない元データ（追加された差分）だけを分けて追加する
+
+    months: {"YYYY-MM": {"files", "rows", "min_date", "max_date"}}。各ファイルには
+    読み込み順の通し番号 row_id を付けておき、読み込み後に元の並びに戻せるようにする。
+    発言本文は同じ名前の *.speech.bin に書き、ファイルには text_file / text_start / text_end を持つ。
+    files は MONTH_DIR からの相対パスで、作成先（build）のディレクトリを含む。
+    """
+    sources = _sources(data_dir)
+    if not sources:
+        raise FileNotFoundError(data_dir / BASE_CSV)
+
+    month_dir = data_dir / MONTH_DIR
+    catalog_path = month_dir / CATALOG
+    catalog = _read_catalog(catalog_path)
+    if catalog is not None and catalog["sources"] == sources:
+        return catalog
+
+    month_dir.mkdir(parents=True, exist_ok=True)
+    with _locked(month_dir / LOCK_FILE):
+        # ロックを待つ間にほかで作り終えていればそれを使う
+        catalog = _read_catalog(catalog_path)
+        previous = catalog
+        # 分割済みの元データが変わった・消えたときは新しい作成先に作り直す（末尾に追加されただけなら続きから）
+        rebuild = catalog is None or catalog["sources"] != sources[:len(catalog["sources"])]
+        if rebuild:
+            catalog = {"build": f"{BUILD_PREFIX}{time.time_ns()}", "sources": [], "rows": 0, "months": {}}
+        _split_sources(data_dir, sources, catalog, save=not rebuild)
+        if rebuild:
+            # 作り終えてから切り替え、その前の作成先までは残す（読み込み中のセッションのため）
+            _write_json(catalog_path, catalog)
+            _sweep_builds(month_dir, {catalog["build"], *([previous.get("build", "")] if previous else [])})
+            # 以前の版が元 CSV の隣に作った整形済み Parquet（本文入り）は使わないので消す
+            (data_dir / BASE_CSV).with_suffix(".parquet").unlink(missing_ok=True)
+    return catalog
+
+
+def _split_sources(data_dir: Path, sources: list[dict], catalog: dict, save: bool) -> None:
+    """まだ分けていない元データを catalog の作成先に分けて追加する。save なら元データ 1 つごとに catalog.json を保存"""
+    month_dir = data_dir / MONTH_DIR
+    # 以前の版の一覧には build がない（months/ 直下）
+    build = catalog.get("build", "")
+    for source in sources[len(catalog["sources"]):]:
+        speeches = _read_source(data_dir, source["name"])
+        speeches["row_id"] = np.arange(catalog["rows"], catalog["rows"] + len(speeches), dtype=np.int64)
+        months = speeches["date"].dt.strftime("%Y-%m").fillna(UNDATED)
+        for month, part in speeches.groupby(months, sort=True):
+            stem = "/".join(filter(None, [build, month, Path(source["name"]).stem]))
+            name = f"{stem}.parquet"
+            path = month_dir / name
+            path.parent.mkdir(parents=True, exist_ok=True)
+
+            # 本文は別ファイルに出し、オフセットだけを残す
+            if "speech" in part.columns:
+                starts, ends = write_texts(part["speech"], month_dir / f"{stem}{TEXT_SUFFIX}")
+                part = part.drop(columns="speech").assign(text_file=f"{stem}{TEXT_SUFFIX}",
+                                                          text_start=starts, text_end=ends)
+            _replace_with(path, lambda tmp_path: part.to_parquet(tmp_path, index=False))
+
+            entry = catalog["months"].setdefault(month, {"files": [], "rows": 0, "min_date": None, "max_date": None})
+            entry["files"].append(name)
+            entry["rows"] += len(part)
+            if month != UNDATED:
+                min_date, max_date = part["date"].min().strftime("%Y-%m-%d"), part["date"].max().strftime("%Y-%m-%d")
+                entry["min_date"] = min(filter(None, [entry["min_date"], min_date]))
+                entry["max_date"] = max(filter(None, [entry["max_date"], max_date]))
+        catalog["sources"].append(source)
+        catalog["rows"] += len(speeches)
+        if save:
+            # 元データ 1 つごとに保存（途中で止まっても次回はその続きから）
+            _write_json(month_dir / CATALOG, catalog)
+
+
+def catalog_bounds(catalog: dict) -> tuple:
+    """収録期間（最初と最後の日付）。日付のある発言がなければ (None, None)"""
+    dated = [m for month, m in catalog["months"].items() if month != UNDATED]
+    if not dated:
+        return None, None
+    return (pd.Timestamp(min(m["min_date"] for m in dated)).date(),
+            pd.Timestamp(max(m["max_date"] for m in dated)).date())
+
+
+def select_months(catalog: dict, date_range=None) -> tuple:
+    """期間に掛かる月。date_range が None なら日付のない発言も含めてすべて"""
+    months = sorted(catalog["months"])
+    if date_range is None:
+        return tuple(months)
+    start, end = (pd.Timestamp(d).strftime("%Y-%m") for d in date_range)
+    return tuple(m for m in months if m != UNDATED and start <= m <= end)
+
+
+def read_months(data_dir: Path, catalog: dict, months, columns: list | None = None,
+                date_range=None) -> pd.DataFrame:
+    """指定した月のファイルだけを読む（行は元の並び。本文は TextStore で取り出す）
+
+    row_id 列は全期間での通し番号（全体を読み込んだときの行位置）。
+
+    columns: 読む列（None ならすべて）。date_range: 期間外の行をファイル読み込み時に除く
+    """
+    paths = [data_dir / MONTH_DIR / name for month in months for name in catalog["months"][month]["files"]]
+    filters = None
+    if date_range is not None:
+        start, end = (pd.Timestamp(d) for d in date_range)
+        filters = [("date", ">=", start), ("date", "<=", end)]
+
+    def read_columns(schema):
+        # 古いファイルにない列は読まない（concat で欠損になる）
+        return schema.names if columns is None else [col for col in [*columns, "row_id"] if col in schema.names]
+
+    frames = []
+    for path in paths:
+        frames.append(pq.read_table(path, columns=read_columns(pq.read_schema(path)), filters=filters).to_pandas())
+    if not frames:
+        # 該当する月がなくても列構成はそろえる
+        first = next(name for m in catalog["months"].values() for name in m["files"])
+        schema = pq.read_schema(data_dir / MONTH_DIR / first)
+        frames.append(schema.empty_table().select(read_columns(schema)).to_pandas())
+
+    speeches = pd.concat(frames, ignore_index=True)
+    speeches = speeches.sort_values("row_id", kind="stable").reset_index(drop=True)
+    # ファイルごとにカテゴリが違うと object 型に戻るので付け直す（本文ファイル名もカテゴリで持つ）
+    for col in [*CATEGORY_COLUMNS, "text_file"]:
+        if col in speeches.columns:
+            speeches[col] = speeches[col].astype("category")
+    return speeches
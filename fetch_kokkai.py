@@ -5,44 +5,49 @@
 - meeting_list: トップ直下 `meetingRecord` を抽出
 - speech: トップ直下 `speechRecord` を抽出
 - CSV ダウンロードは UTF-8 (BOM 付き) で文字化け回避
+- CSV は実行ごとのファイルに順に書き出し、ダウンロード時にそのファイルを読む（CSV 全体の文字列をメモリに作らない）。
+  Streamlit はダウンロードするファイルをメモリに読むので、EXPORT_PART_MB ごとにファイルを分けてボタンを並べる。
+  保存ファイル名はダウンロード時の名前にだけ使う
+- 書き出し先は EXPORT_MAX_AGE より古いものを取得のたびに消す（閉じたセッションの分も残らない）
 """
+import shutil
+import time
+import uuid
 import streamlit as st
-import pandas as pd
-import requests, time, json
 from datetime import date
+from pathlib import Path
 
-SPEECH_URL = "https://kokkai.ndl.go.jp/api/speech"
-MEETING_LIST_URL = "https://kokkai.ndl.go.jp/api/meeting_list"
-UA = "kokkai-dashboard-gui-fetcher/1.0"
+import requests
+
+from kokkai_api import FetchStats, export_csv, fetch, harvest
+from response_cache import CacheMiss, ResponseCache, cache_key
+from speech_store import SpeechStore
+
+CACHE_PATH = Path(__file__).parent / ".cache" / "kokkai_responses.sqlite"
+HARVEST_DIR = Path(__file__).parent / ".cache" / "harvests"
+EXPORT_DIR = Path(__file__).parent / ".cache" / "exports"
+# 書き出した CSV を残しておく秒数（これより古い実行の分は次の取得時に消す）
+EXPORT_MAX_AGE = 24 * 3600
+# ダウンロード 1 回あたりの CSV の大きさの上限（MB）。超える分は別のファイル・ボタンに分ける
+EXPORT_PART_MB = 64
+
+
+def sweep_exports(max_age: float = EXPORT_MAX_AGE) -> None:
+    """EXPORT_DIR から max_age 秒より前に書いた実行の書き出し先を消す"""
+    if not EXPORT_DIR.exists():
+        return
+    cutoff = time.time() - max_age
+    for run_dir in EXPORT_DIR.iterdir():
+        try:
+            if run_dir.is_dir() and run_dir.stat().st_mtime < cutoff:
+                shutil.rmtree(run_dir, ignore_errors=True)
+        except OSError:
+            pass
 
 st.set_page_config(page_title="国会データ取得GUI", layout="wide")
 st.title("国会会議録 取得ツール（GUI）")
 st.caption("一次情報：国会会議録検索システム API")
 
-def build_params(date_from, date_until, house, committee, kw_terms, mode, start=1, maximum=100, include_keywords=True):
-    p = dict(recordPacking="json", maximumRecords=maximum, startRecord=start, from_=date_from, until=date_until)
-    p["from"] = p.pop("from_")
-    if committee:
-        p["nameOfMeeting"] = committee
-    if house and house != "両院":
-        p["nameOfHouse"] = house
-    if include_keywords and kw_terms:
-        if mode.startswith("AND"):
-            p["any"] = " ".join(kw_terms)
-        else:
-            p["any"] = kw_terms[0]  # OR の場合は語ごとにループ
-    return p
-
-def num_records(js):
-    if isinstance(js, dict) and "numberOfRecords" in js:
-        try: return int(js["numberOfRecords"])
-        except: return js["numberOfRecords"]
-    if isinstance(js, dict) and "records" in js and isinstance(js["records"], dict):
-        n = js["records"].get("numberOfRecords")
-        try: return int(n)
-        except: return n
-    return None
-
 with st.sidebar:
     st.header("検索条件")
     c1, c2 = st.columns(2)
@@ -53,116 +58,86 @@ with st.sidebar:
     kw = st.text_input("キーワード（スペース区切り）", value="消費税 税制 外国")
     endpoint = st.radio("エンドポイント", options=["speech（発言単位）","meeting_list（会議簡易）"], index=1)
     outname = st.text_input("保存ファイル名（CSV）", value="speeches_or_meetings.csv")
+    st.subheader("取得設定")
+    workers = st.slider("同時リクエスト数", min_value=1, max_value=4, value=1,
+                        help="API サーバーに負荷をかけないよう、少ない値で利用してください")
+    rate = st.number_input("1 秒あたりの最大リクエスト数", min_value=0.2, max_value=3.0, value=1.0, step=0.1)
+    use_cache = st.checkbox("取得済みのページを再利用（キャッシュ）", value=True)
+    cache_days = st.number_input("キャッシュの有効期限（日）", min_value=0.0, value=7.0, step=1.0, disabled=not use_cache)
+    cache_mb = st.number_input("キャッシュの上限（MB）", min_value=16, value=512, step=16, disabled=not use_cache)
+    offline = st.checkbox("オフライン（キャッシュのみで再生）", value=False, disabled=not use_cache)
+    plan = st.checkbox("OR 検索のリクエストを減らす（実験的）", value=False,
+                       help="speech の OR 検索で語の重なりが多いとき、語なしで取得して本文で絞ります。"
+                            "表記ゆれの扱いが API と異なる発言は取りこぼすことがあります")
+    resumable = st.checkbox("再開可能な取得（発言をローカルDBに保存）", value=False,
+                            help="speech のみ。中断しても同じ条件で再実行すると続きから取得します")
 
 st.divider()
 run = st.button("取得してCSVを作成")
 
-def fetch(date_from, date_until, houses, committees, kw, mode, all_committees, endpoint="speech"):
-    headers = {"User-Agent": UA, "Accept": "application/json"}
-    terms = [t for t in (kw or "").split() if t.strip()]
-    if mode.startswith("なし"):
-        terms = []
-    df_all = []
-    last_params = {}
-    last_url = ""
-    last_num = None
-    last_preview = ""
-
-    houses = houses or ["両院"]
-    committees = committees or [None]
-    if all_committees:
-        committees = [None]
-
-    for h in houses:
-        for cm in committees:
-            if endpoint.startswith("meeting"):
-                # meeting_list: any は使わない
-                start = 1
-                while True:
-                    p = build_params(str(date_from), str(date_until), h, cm, [], mode, start=start, maximum=100, include_keywords=False)
-                    r = requests.get(MEETING_LIST_URL, params=p, headers=headers, timeout=60)
-                    last_params = p; last_url = r.url
-                    r.raise_for_status()
-                    js = r.json()
-                    last_num = num_records(js)
-                    recs = js.get("meetingRecord") or []
-                    if not recs:
-                        last_preview = json.dumps(js, ensure_ascii=False)[:800]
-                        break
-                    rows = []
-                    for mt in recs:
-                        sp_recs = mt.get("speechRecord") or []
-                        url = sp_recs[0].get("speechURL") if isinstance(sp_recs, list) and len(sp_recs) else None
-                        rows.append({
-                            "date": mt.get("date"),
-                            "house": mt.get("nameOfHouse"),
-                            "meeting": mt.get("nameOfMeeting"),
-                            "issue": mt.get("issue"),
-                            "session": mt.get("session"),
-                            "url": url,
-                        })
-                    df_all.append(pd.DataFrame(rows))
-                    if len(recs) < 100:
-                        break
-                    start += len(recs)
-                    time.sleep(0.5)
-            else:
-                # speech: AND はまとめ / OR は語ごと
-                term_sets = [terms] if (terms and mode.startswith("AND")) else [[t] for t in terms] if terms else [[]]
-                for ts in term_sets:
-                    start = 1
-                    while True:
-                        p = build_params(str(date_from), str(date_until), h, cm, ts, "AND", start=start, maximum=100, include_keywords=True)
-                        r = requests.get(SPEECH_URL, params=p, headers=headers, timeout=60)
-                        last_params = p; last_url = r.url
-                        r.raise_for_status()
-                        js = r.json()
-                        last_num = num_records(js)
-                        recs = js.get("speechRecord") or []
-                        if not recs:
-                            last_preview = json.dumps(js, ensure_ascii=False)[:800]
-                            break
-                        rows = []
-                        for sp in recs:
-                            rows.append({
-                                "speech_id": sp.get("speechID"),
-                                "date": sp.get("date"),
-                                "nameOfHouse": sp.get("nameOfHouse") or sp.get("houseName"),
-                                "nameOfMeeting": sp.get("nameOfMeeting"),
-                                "speaker": sp.get("speaker"),
-                                "speakerGroup": sp.get("speakerGroup"),
-                                "speech": sp.get("speech"),
-                                "speechURL": sp.get("speechURL"),
-                                "issueID": sp.get("issueID"),
-                                "meetingURL": sp.get("meetingURL"),
-                                "billID": sp.get("billID"),
-                            })
-                        df_all.append(pd.DataFrame(rows))
-                        if len(recs) < 100:
-                            break
-                        start += len(recs)
-                        time.sleep(1.0)
-
-    df = pd.concat(df_all, ignore_index=True) if df_all else pd.DataFrame()
-    if len(df) and "speech_id" in df.columns:
-        df = df.drop_duplicates(subset=["speech_id"])
-    return df, last_params, last_url, last_num, last_preview
-
 if run:
+    cache = ResponseCache(CACHE_PATH, ttl=cache_days * 24 * 3600, max_bytes=int(cache_mb) * 1024 * 1024, offline=offline) if use_cache else None
+    last_params, last_url, last_num, last_preview = {}, "", None, ""
+    summary = None
+    stats = FetchStats()
+    # 書き出し先は実行ごとに分ける（他のセッション・実行の CSV と混ざらない）。このセッションの前回の分と、
+    # 古い実行（閉じたセッションなど）の分は消す
+    sweep_exports()
+    previous = st.session_state.get("export_dir")
+    if previous:
+        shutil.rmtree(previous, ignore_errors=True)
+    export_dir = EXPORT_DIR / uuid.uuid4().hex
+    st.session_state["export_dir"] = str(export_dir)
+    csv_path = export_dir / "export.csv"
     with st.spinner("取得中..."):
-        df, last_params, last_url, last_num, last_preview = fetch(date_from, date_until, houses, [], kw, mode, all_committees, endpoint="speech" if endpoint.startswith("speech") else "meeting_list")
-    st.success(f"取得件数: {len(df)}")
+        try:
+            if resumable and endpoint.startswith("speech"):
+                # 条件ごとに保存先を分ける（同じ条件なら続きから）
+                conditions = {"from": date_from, "until": date_until, "houses": houses, "kw": kw, "mode": mode}
+                store = SpeechStore(HARVEST_DIR / f"{cache_key('harvest', conditions)[:16]}.sqlite")
+                status = st.empty()
+                summary = harvest(store, date_from, date_until, houses, [], kw, mode, True, workers=workers, rate=rate, cache=cache, stats=stats,
+                                  progress=lambda s: status.write(f"保存済み: {s['stored']:,}件（今回 {s['pages']} ページ取得）"))
+                # 保存済みの発言は全件を DataFrame にせず、少しずつ CSV に書き出す
+                parts = export_csv(store.iter_frames(), csv_path, part_bytes=EXPORT_PART_MB * 2**20)
+                df = store.head(30)
+                store.close()
+            else:
+                df, last_params, last_url, last_num, last_preview = fetch(date_from, date_until, houses, [], kw, mode, True, endpoint="speech" if endpoint.startswith("speech") else "meeting_list", workers=workers, rate=rate, cache=cache, stats=stats, plan=plan)
+                parts = export_csv([df], csv_path, part_bytes=EXPORT_PART_MB * 2**20)
+        except CacheMiss as e:
+            st.error(f"オフラインのため取得できません（{e}）。オフラインを外して再取得してください。")
+            st.stop()
+        except requests.RequestException as e:
+            if resumable and endpoint.startswith("speech"):
+                st.error(f"取得が中断しました（{e}）。同じ条件で再実行すると続きから取得します。")
+                st.stop()
+            raise
+    n_rows = sum(rows for _, rows in parts)
+    st.success(f"取得件数: {n_rows}")
     with st.expander("デバッグ情報"):
+        st.write("リクエスト：", stats.summary())
+        st.dataframe(stats.frame(), use_container_width=True)
+        if cache is not None:
+            st.write("キャッシュ：", cache.stats())
+            cache.close()
+        if summary is not None:
+            st.write("再開可能な取得：", summary)
         st.write("最後に実行したURL："); st.code(last_url or "(なし)")
         st.write("最後のクエリパラメータ："); st.json(last_params or {})
         if last_num is not None: st.write(f"numberOfRecords: {last_num}")
-        if len(df)==0 and last_preview:
+        if n_rows==0 and last_preview:
             st.write("Raw JSON preview (truncated):"); st.code(last_preview)
-    if len(df):
-        # Excel でも文字化けしない BOM 付き UTF-8
-        csv_text = df.to_csv(index=False, encoding="utf-8-sig")
-        csv_bytes = csv_text.encode("utf-8-sig")
-        st.download_button("CSVをダウンロード", data=csv_bytes, file_name=outname, mime="text/csv")
+    if n_rows:
+        # ファイルはボタンを押したときに 1 つずつ読む（画面の再実行はしない）
+        name = Path(outname)
+        for i, (part_path, part_rows) in enumerate(parts, 1):
+            label, file_name = "CSVをダウンロード", outname
+            if len(parts) > 1:
+                label = f"CSVをダウンロード（{i}/{len(parts)}・{part_rows:,}件）"
+                file_name = f"{name.stem}_{i}{name.suffix}"
+            st.download_button(label, data=part_path.read_bytes, file_name=file_name,
+                               mime="text/csv", on_click="ignore", key=f"download_{i}")
         st.dataframe(df.head(30))
     else:
         st.info("0件。meeting_list は any 不使用。period/filters を緩め、speech は複合語×ORで。")
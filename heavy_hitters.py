@@ -0,0 +1,78 @@
+"""
+出現回数の多い語の近似集計（Space-Saving。メモリは capacity 語分のカウンタだけ）
+- 語の列（ジェネレータ）はまとまりごとに数え、(語, 回数) のまとまりとして取り込む
+- 取り込むたびに上位 capacity 語だけを残す。残っていない語の回数は floor（捨てた語の回数の上限）とみなす
+- 各語の count は多めの見積もりで、真の回数は count - error 以上 count 以下。
+  残っていない語の真の回数は floor 以下
+- 語の種類が capacity を超えるまでは何も捨てないので、結果は正確（error = 0）
+"""
+import collections
+import itertools
+
+import numpy as np
+import pandas as pd
+
+
+class SpaceSaving:
+    """上位の語の近似カウンタ（capacity=None なら捨てずに正確に数える）"""
+
+    def __init__(self, capacity: int | None = 10_000):
+        if capacity is not None and capacity < 1:
+            raise ValueError("capacity は 1 以上で指定してください")
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+        self.errors: dict[str, int] = {}
+        self.floor = 0
+        self.total = 0
+
+    @property
+    def exact(self) -> bool:
+        """まだ 1 語も捨てていない（結果が正確）"""
+        return self.floor == 0
+
+    def update(self, counts) -> None:
+        """(語 → 回数) のまとまり（dict・Counter・Series）を取り込む"""
+        for term, count in counts.items():
+            if count <= 0:
+                continue
+            self.total += int(count)
+            if term in self.counts:
+                self.counts[term] += int(count)
+            else:
+                # 残っていない語は、これまでの回数を floor と見積もる（その分が誤差）
+                self.counts[term] = self.floor + int(count)
+                self.errors[term] = self.floor
+        if self.capacity is not None and len(self.counts) > self.capacity:
+            self._shrink()
+
+    def _shrink(self) -> None:
+        """回数の多い capacity 語だけを残す"""
+        terms = list(self.counts)
+        values = np.fromiter(self.counts.values(), dtype=np.int64, count=len(terms))
+        dropped = np.argpartition(-values, self.capacity)[self.capacity:]
+        # 捨てた語の回数は、残した語の最小値以下
+        self.floor = max(self.floor, int(values[dropped].max()))
+        for i in dropped:
+            del self.counts[terms[i]], self.errors[terms[i]]
+
+    def consume(self, tokens, batch_size: int = 10_000) -> None:
+        """語の列（ジェネレータでよい）を batch_size 語ずつ数えて取り込む"""
+        tokens = iter(tokens)
+        while batch := collections.Counter(itertools.islice(tokens, batch_size)):
+            self.update(batch)
+
+    def top(self, n: int = 30) -> pd.DataFrame:
+        """回数の多い n 語（term, count, error, guaranteed）
+
+        guaranteed: count - error が n+1 番目の count 以上で、真の上位 n 語に入ることが確かな語。
+        同数は語の順。
+        """
+        ranked = pd.DataFrame({"term": pd.Series(list(self.counts), dtype=object),
+                               "count": np.fromiter(self.counts.values(), dtype=np.int64, count=len(self.counts)),
+                               "error": [self.errors[term] for term in self.counts]})
+        ranked = ranked.sort_values(["count", "term"], ascending=[False, True], kind="stable")
+        # n+1 番目（いなければ捨てた語の上限）
+        runner_up = int(ranked["count"].iloc[n]) if len(ranked) > n else self.floor
+        top = ranked.head(n).reset_index(drop=True)
+        top["guaranteed"] = (top["count"] - top["error"]) >= runner_up
+        return top
@@ -0,0 +1,335 @@
+"""
+発言×キーワードの疎行列インデックス
+- extract_keywords の結果をデータ読み込み時に一度だけ集計し、発言ごとの出現回数を保持する
+- 頻出キーワードやヒートマップは、フィルタ後の行に対する集計だけで求める
+- 索引の作成はチャンクに分け、workers > 1 なら複数プロセスで並列に集計する（結果は 1 プロセスと同じ）。
+  複数の索引を続けて作るときは count_pool のプロセスプールを使い回せる
+- 索引は .npz に保存でき、ファイルごとに作った索引は concat で 1 つにまとめられる
+"""
+import collections
+import contextlib
+import functools
+import multiprocessing
+import os
+import re
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+
+# ストップワード（拡張版）
+STOP_WORDS = frozenset({
+    '委員会', '本会議', '政府', '総理', '大臣', '答弁', '質疑', '報告', '資料',
+    '法律', '制度', '今回', '我が国', '国会', '議員', '先生', '委員', '議論',
+    '問題', '課題', '対応', '検討', '実施', '推進', '確認', '説明', '質問'
+})
+
+# 保存形式の版（語の取り出し方や保存する配列を変えたら上げる）
+INDEX_VERSION = 2
+
+
+class Tokenizer:
+    """キーワード抽出（パターンとストップワードは作成時に一度だけ用意する）
+
+    漢字の連続（min_length〜max_length 文字ずつ）とカタカナの連続（min_length + 1 文字以上）を
+    1 回の走査で取り出し、漢字の語 → カタカナの語の順に返す。
+    """
+
+    def __init__(self, min_length: int = 2, max_length: int = 6, stop_words=STOP_WORDS):
+        # 漢字とカタカナは重ならないので、別々に findall した場合と同じ語が取れる
+        self.pattern = re.compile(
+            rf'([\u4E00-\u9FFF]{{{min_length},{max_length}}})|([ァ-ヴー]{{{min_length + 1},}})'
+        )
+        self.stop_words = frozenset(stop_words)
+
+    def tokenize(self, text: str) -> list[str]:
+        """キーワードのリスト（extract_keywords と同じ結果）"""
+        if not isinstance(text, str) or not text.strip():
+            return []
+        stop_words = self.stop_words
+        kanji_terms, kata_terms = [], []
+        for kanji, kata in self.pattern.findall(text):
+            if kanji:
+                if kanji not in stop_words:
+                    kanji_terms.append(kanji)
+            elif kata not in stop_words:
+                kata_terms.append(kata)
+        return kanji_terms + kata_terms
+
+    def term_ids(self, text: str, vocab: dict[str, int]) -> list[int]:
+        """キーワードの語 ID のリスト。vocab にない語は末尾の ID で追加する"""
+        ids = []
+        for term in self.tokenize(text):
+            term_id = vocab.get(term)
+            if term_id is None:
+                term_id = vocab[term] = len(vocab)
+            ids.append(term_id)
+        return ids
+
+
+@functools.lru_cache(maxsize=None)
+def get_tokenizer(min_length: int = 2, max_length: int = 6) -> Tokenizer:
+    return Tokenizer(min_length, max_length)
+
+
+def extract_keywords(text: str, min_length: int = 2, max_length: int = 6) -> list[str]:
+    """キーワード抽出関数（改良版）"""
+    return get_tokenizer(min_length, max_length).tokenize(text)
+
+
+def _count_chunk(texts: list[str]) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray]:
+    """チャンク内の発言ごとのキーワード出現回数（語 ID・行位置はチャンク内のもの）
+
+    別プロセスからも呼べるようにモジュールの関数にしておく。
+    """
+    tokenizer = get_tokenizer()
+    term_ids: dict[str, int] = {}
+    rows, cols, counts = [], [], []
+    for row, speech in enumerate(texts):
+        # 語 ID は初出順に振られ、Counter も初出順を保つので、行内の並びが extract_keywords の順序と一致する
+        for term_id, count in collections.Counter(tokenizer.term_ids(speech, term_ids)).items():
+            rows.append(row)
+            cols.append(term_id)
+            counts.append(count)
+    return (
+        list(term_ids),
+        np.asarray(rows, dtype=np.int32),
+        np.asarray(cols, dtype=np.int32),
+        np.asarray(counts, dtype=np.int32),
+    )
+
+
+@contextlib.contextmanager
+def count_pool(workers: int):
+    """チャンクの集計に使うプロセスプール（workers <= 1 なら None）
+
+    プロセスは最初にチャンクを投げたときに起動するので、索引を作らずに終われば起動しない。
+    """
+    if workers <= 1:
+        yield None
+        return
+    # Streamlit などスレッドのあるプロセスから fork しないよう spawn で起動する
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+        yield pool
+
+
+@dataclass
+class KeywordIndex:
+    """発言×キーワードの出現回数（COO 形式の疎行列）
+
+    rows は元データの行位置。同じ行の要素は、その発言内での初出順に並ぶ。
+    """
+    vocab: list[str]
+    rows: np.ndarray
+    cols: np.ndarray
+    counts: np.ndarray
+    n_rows: int
+    term_ids: dict[str, int] = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.term_ids = {term: i for i, term in enumerate(self.vocab)}
+
+    @classmethod
+    def build(cls, speeches, chunk_size: int = 5000, workers: int = 1,
+              pool: ProcessPoolExecutor | None = None) -> "KeywordIndex":
+        """発言テキスト列（pd.Series または TextStore）から索引を作成
+
+        workers > 1 ならチャンクを複数プロセスで集計する。チャンクの結果は行順に取り込むので、
+        語 ID（初出順）も要素の並びも 1 プロセスで作ったときと同じになる。
+        pool（count_pool で作ったもの）を渡すとそれを使い、渡さなければこの索引の分だけプールを起動する。
+        """
+        n_rows = len(speeches)
+        term_ids: dict[str, int] = {}
+        rows, cols, counts = [], [], []
+
+        def chunks():
+            # テキストはチャンクごとに取り出す
+            for start in range(0, n_rows, chunk_size):
+                yield start, speeches.take(np.arange(start, min(start + chunk_size, n_rows))).fillna('').tolist()
+
+        def merge(start, result):
+            vocab, chunk_rows, chunk_cols, chunk_counts = result
+            # チャンク内の語 ID → 全体の語 ID
+            mapping = np.asarray([term_ids.setdefault(term, len(term_ids)) for term in vocab], dtype=np.int32)
+            rows.append(chunk_rows + start)
+            cols.append(mapping[chunk_cols])
+            counts.append(chunk_counts)
+
+        # チャンクが 1 つなら並列にしても速くならない
+        workers = min(workers, -(-n_rows // chunk_size))
+        if workers <= 1:
+            for start, texts in chunks():
+                merge(start, _count_chunk(texts))
+        else:
+            with contextlib.nullcontext(pool) if pool is not None else count_pool(workers) as pool:
+                # 投げておくチャンクは同時数の 2 倍まで（テキストを全部は取り出さない）
+                pending = collections.deque()
+                for start, texts in chunks():
+                    pending.append((start, pool.submit(_count_chunk, texts)))
+                    if len(pending) >= 2 * workers:
+                        start, future = pending.popleft()
+                        merge(start, future.result())
+                while pending:
+                    start, future = pending.popleft()
+                    merge(start, future.result())
+
+        empty = np.empty(0, dtype=np.int32)
+        return cls(
+            vocab=list(term_ids),
+            rows=np.concatenate(rows) if rows else empty,
+            cols=np.concatenate(cols) if cols else empty,
+            counts=np.concatenate(counts) if counts else empty,
+            n_rows=n_rows,
+        )
+
+    @classmethod
+    def concat(cls, parts: list[tuple["KeywordIndex", np.ndarray]], n_rows: int) -> "KeywordIndex":
+        """部分ごとの索引を 1 つにまとめる
+
+        parts は (索引, その索引の各行の行位置) のリスト。要素は行位置順に並べ直すので、
+        同じ行の要素の並び（発言内での初出順）は保たれる（語 ID の振り方だけが変わる）。
+        """
+        term_ids: dict[str, int] = {}
+        rows, cols, counts = [], [], []
+        for index, positions in parts:
+            mapping = np.asarray([term_ids.setdefault(term, len(term_ids)) for term in index.vocab], dtype=np.int32)
+            rows.append(np.asarray(positions, dtype=np.int32)[index.rows])
+            cols.append(mapping[index.cols])
+            counts.append(index.counts)
+
+        empty = np.empty(0, dtype=np.int32)
+        rows = np.concatenate(rows) if rows else empty
+        order = np.argsort(rows, kind="stable")
+        return cls(
+            vocab=list(term_ids),
+            rows=rows[order],
+            cols=(np.concatenate(cols) if cols else empty)[order],
+            counts=(np.concatenate(counts) if counts else empty)[order],
+            n_rows=n_rows,
+        )
+
+    def write(self, path: Path) -> None:
+        """.npz に保存（一時ファイルに書いてから置き換える）
+
+        語彙は固定幅の文字列配列にせず（最長の語 × 4 バイトが全語にかかる）、UTF-8 で連結したバイト列と
+        語ごとの終了位置で持つ。
+        """
+        # 一時ファイルは書くたびに別の名前（同じプロセスの複数セッションが同じ索引を作っても混ざらない）
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with open(fd, "wb") as f:
+                encoded = [term.encode("utf-8") for term in self.vocab]
+                vocab_ends = np.cumsum([len(data) for data in encoded], dtype=np.int64)
+                np.savez(f, version=INDEX_VERSION, vocab_bytes=np.frombuffer(b"".join(encoded), dtype=np.uint8),
+                         vocab_ends=vocab_ends, rows=self.rows, cols=self.cols, counts=self.counts, n_rows=self.n_rows)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def read(cls, path: Path) -> "KeywordIndex | None":
+        """保存した索引を読む（ない・版が違う・壊れているときは None）"""
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != INDEX_VERSION:
+                    return None
+                raw = data["vocab_bytes"].tobytes()
+                ends = data["vocab_ends"].tolist()
+                vocab = [raw[start:end].decode("utf-8") for start, end in zip([0, *ends], ends)]
+                return cls(vocab=vocab, rows=data["rows"], cols=data["cols"],
+                           counts=data["counts"], n_rows=int(data["n_rows"]))
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+    def _select(self, positions: np.ndarray) -> np.ndarray:
+        """指定行に属する非ゼロ要素の位置（元の並び順のまま）"""
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[positions] = True
+        return np.flatnonzero(mask[self.rows])
+
+    def top_terms(self, positions: np.ndarray, n: int = 30) -> pd.DataFrame:
+        """指定行の頻出キーワード上位 n 件（Counter.most_common と同じ順序）"""
+        sel = self._select(positions)
+        cols = self.cols[sel]
+        totals = np.bincount(cols, weights=self.counts[sel], minlength=len(self.vocab)).astype(np.int64)
+        # 同数の場合は選択範囲内での初出順（要素を並べ替えず、語ごとの最小の位置を求める）
+        first_seen = np.full(len(self.vocab), len(cols), dtype=np.int64)
+        np.minimum.at(first_seen, cols, np.arange(len(cols)))
+        present = np.flatnonzero(totals)
+        # 上位 n 件の出現回数以上の語だけを残してから並べる（全語の並べ替えはしない）
+        if len(present) > n > 0:
+            threshold = np.partition(totals[present], len(present) - n)[len(present) - n]
+            present = present[totals[present] >= threshold]
+        top = present[np.lexsort((first_seen[present], -totals[present]))[:n]]
+        return pd.DataFrame({
+            'term': [self.vocab[i] for i in top],
+            'count': totals[top],
+        })
+
+    def group_term_matrix(self, positions: np.ndarray, groups: pd.Series, terms: list[str]) -> pd.DataFrame:
+        """グループ（政党など）×指定キーワードの出現回数（0 埋め済みの密行列）
+
+        groups は positions と同じ並びの Series。欠損グループの行は集計しない。
+        """
+        term_ids = [self.term_ids[t] for t in terms if t in self.term_ids]
+        codes, uniques = pd.factorize(groups, sort=True)
+
+        # キーワード ID → 0..k-1、対象外は -1
+        lookup = np.full(len(self.vocab), -1, dtype=np.int64)
+        lookup[term_ids] = np.arange(len(term_ids))
+        # 行位置 → グループコード（欠損グループ・対象外の行は -1）
+        row_group = np.full(self.n_rows, -1, dtype=np.int64)
+        row_group[positions] = codes
+
+        sel = self._select(positions)
+        term_code = lookup[self.cols[sel]]
+        group_code = row_group[self.rows[sel]]
+        keep = (term_code >= 0) & (group_code >= 0)
+
+        # (グループ, キーワード) を一次元化して一度の bincount で集計
+        k = len(term_ids)
+        matrix = np.bincount(
+            group_code[keep] * k + term_code[keep],
+            weights=self.counts[sel][keep],
+            minlength=len(uniques) * k,
+        ).astype(np.int64).reshape(len(uniques), k)
+
+        return pd.DataFrame(
+            matrix,
+            index=pd.Index(uniques, name=groups.name),
+            columns=pd.Index([self.vocab[i] for i in term_ids], name='term'),
+        )
+
+
+def create_heatmap_data(df: pd.DataFrame, top_terms: pd.DataFrame, index: KeywordIndex, top_n: int = 15) -> pd.DataFrame:
+    """ヒートマップ用データ作成"""
+    if len(top_terms) == 0:
+        return pd.DataFrame()
+
+    focus_terms = top_terms['term'].head(top_n).tolist()
+
+    # 政党×キーワードの出現回数を集計（索引から一括集計）
+    matrix = index.group_term_matrix(df.index.to_numpy(), df['party'], focus_terms)
+
+    # 出現のない政党・キーワードは表示しない
+    matrix = matrix.loc[matrix.sum(axis=1) > 0, matrix.sum(axis=0) > 0]
+    if matrix.empty:
+        return pd.DataFrame()
+
+    # 順序を決定（頻度順）
+    term_order = matrix.sum(axis=0).sort_index().sort_values(ascending=False).index.tolist()
+    party_order = matrix.sum(axis=1).sort_index().sort_values(ascending=False).index.tolist()
+
+    # 全組み合わせ（0埋め済み）を政党→キーワードの順に縦持ちへ
+    matrix = matrix.reindex(index=party_order, columns=term_order)
+    return pd.DataFrame({
+        'party': np.repeat(party_order, len(term_order)),
+        'term': np.tile(term_order, len(party_order)),
+        'count': matrix.to_numpy().ravel(),
+    })
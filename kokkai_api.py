@@ -0,0 +1,807 @@
+# -*- coding: utf-8 -*-
+"""
+国会会議録検索システム API の取得処理（GUI から独立）
+- 各検索条件の 1 ページ目で numberOfRecords を確認し、残りの startRecord を先に計画する
+- 計画したページはスレッドプールで並列に取得する。間隔はトークンバケットで制限する
+- リクエストは ApiClient が出す（接続を使い回すセッション・429/5xx・通信エラーはゆらぎ付きの指数バックオフで再試行・
+  応答が速ければ間隔を詰め、エラーや遅い応答では広げる）
+- base_url を差し替えればローカルのスタブサーバーでも動かせる
+- cache（ResponseCache）を渡すと、取得済みのページはネットワークに出ずに再利用する
+- harvest は取得したページをその都度 SpeechStore に保存し、中断後は未取得のページから再開する
+- stats（FetchStats）を渡すと、リクエストごとの所要時間・受信バイト数・件数を記録する
+- fetch は受け取ったページから順に列ごとのリストへ追記し（speechID の重複は集合で除く）、ページは手放す
+- export_csv は DataFrame を順にファイルへ書き出す（CSV 全体の文字列を作らない。大きければ複数のファイルに分ける）
+- harvest_meetings は meeting_list で会議を数え、meeting で会議ごとの全発言を 1 回 10 会議ずつ取る
+  （speech の 1 回 100 発言よりリクエストが少ない）。行は speech_rows と同じ列
+- OR 検索は plan=True のとき plan_union が院・委員会ごとに件数を確かめ、語ごとの検索と語なしの検索（本文で絞る）の
+  安い方を選ぶ（本文の絞り込みは NFKC でそろえて比べるが、API の表記ゆれの扱いと完全には一致しないので既定は使わない）
+"""
+import collections
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import unicodedata
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from response_cache import ResponseCache, cache_key
+from speech_store import SpeechStore
+
+API_BASE = "https://kokkai.ndl.go.jp/api"
+UA = "kokkai-dashboard-gui-fetcher/1.0"
+PAGE_SIZE = 100
+# meeting（会議録の全文）の 1 回あたりの最大件数
+MEETING_PAGE_SIZE = 10
+# export_csv が 1 回に書き出す行数（ファイルを分けるかはこの単位で確かめる）
+EXPORT_BATCH_ROWS = 1000
+# エンドポイントごとの既定のリクエスト間隔（秒間リクエスト数）
+DEFAULT_RATE = {"speech": 1.0, "meeting_list": 2.0, "meeting": 1.0}
+# 再試行する HTTP ステータス（混雑・一時的なサーバーエラー）
+RETRY_STATUS = {429, 500, 502, 503, 504}
+
+
+def build_params(date_from, date_until, house, committee, kw_terms, mode, start=1, maximum=100, include_keywords=True):
+    p = dict(recordPacking="json", maximumRecords=maximum, startRecord=start, from_=date_from, until=date_until)
+    p["from"] = p.pop("from_")
+    if committee:
+        p["nameOfMeeting"] = committee
+    if house and house != "両院":
+        p["nameOfHouse"] = house
+    if include_keywords and kw_terms:
+        if mode.startswith("AND"):
+            p["any"] = " ".join(kw_terms)
+        else:
+            p["any"] = kw_terms[0]  # OR の場合は語ごとにループ
+    return p
+
+def num_records(js):
+    if isinstance(js, dict) and "numberOfRecords" in js:
+        try: return int(js["numberOfRecords"])
+        except: return js["numberOfRecords"]
+    if isinstance(js, dict) and "records" in js and isinstance(js["records"], dict):
+        n = js["records"].get("numberOfRecords")
+        try: return int(n)
+        except: return n
+    return None
+
+
+class RateLimiter:
+    """トークンバケット方式のリクエスト間隔制御（スレッド間で共有）"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """トークンが溜まるまで待ってから 1 つ消費する"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class AdaptiveRateLimiter(RateLimiter):
+    """応答に合わせて間隔を変えるトークンバケット（スレッド間で共有）
+
+    max_rate の半分から始め、応答が fast 秒未満なら step ずつ max_rate まで上げる。
+    エラー・slow 秒を超える応答では半分（min_rate まで）に下げる。Retry-After があればその間は全スレッドで待つ。
+    """
+
+    def __init__(self, max_rate: float, min_rate: float | None = None, fast: float = 0.5, slow: float = 5.0,
+                 step: float | None = None):
+        super().__init__(max_rate / 2)
+        self.max_rate = max_rate
+        self.min_rate = min_rate or max_rate / 8
+        self.fast = fast
+        self.slow = slow
+        self.step = step or max_rate / 10
+        self.paused_until = 0.0
+
+    def acquire(self):
+        while (wait := self.paused_until - time.monotonic()) > 0:
+            time.sleep(wait)
+        super().acquire()
+
+    def success(self, latency: float) -> None:
+        with self.lock:
+            if latency < self.fast:
+                self.rate = min(self.max_rate, self.rate + self.step)
+            elif latency > self.slow:
+                self.rate = max(self.min_rate, self.rate / 2)
+
+    def failure(self, retry_after: float | None = None) -> None:
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+            if retry_after:
+                self.paused_until = max(self.paused_until, time.monotonic() + retry_after)
+
+
+class FetchStats:
+    """リクエストごとの所要時間・受信バイト数・件数（スレッド間で共有）"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests: list[dict] = []
+        self.plans: list[dict] = []
+        self.started = time.monotonic()
+
+    def add(self, params: dict, latency: float, nbytes: int, records: int, cached: bool, retries: int = 0) -> None:
+        with self.lock:
+            self.requests.append({"startRecord": params.get("startRecord"), "latency_ms": latency * 1000,
+                                  "bytes": nbytes, "records": records, "cached": cached, "retries": retries})
+
+    def add_plan(self, plan: dict) -> None:
+        """OR 検索の計画と、語ごとに取得した場合と比べて減ったリクエスト数・受信バイト数"""
+        with self.lock:
+            self.plans.append(plan)
+
+    def frame(self) -> pd.DataFrame:
+        with self.lock:
+            return pd.DataFrame(self.requests,
+                                columns=["startRecord", "latency_ms", "bytes", "records", "cached", "retries"])
+
+    def summary(self) -> dict:
+        """集計（所要時間はキャッシュを使わなかったリクエストだけ）"""
+        df = self.frame()
+        network = df[~df["cached"].astype(bool)]
+        elapsed = time.monotonic() - self.started
+        latency = network["latency_ms"]
+        return {
+            "requests": len(network),
+            "retries": int(network["retries"].sum()),
+            "cached": len(df) - len(network),
+            "bytes": int(network["bytes"].sum()),
+            "records": int(df["records"].sum()),
+            "elapsed_s": round(elapsed, 2),
+            "records_per_s": round(float(df["records"].sum()) / elapsed, 1) if elapsed > 0 else None,
+            "latency_ms": {
+                "mean": round(float(latency.mean()), 1), "p50": round(float(latency.median()), 1),
+                "p95": round(float(latency.quantile(0.95)), 1), "max": round(float(latency.max()), 1),
+            } if len(latency) else None,
+            "plan": self.plans[-1] if self.plans else None,
+        }
+
+
+@dataclass
+class Page:
+    """1 回のリクエスト結果"""
+    params: dict
+    url: str
+    js: dict
+    nbytes: int = 0
+
+    @property
+    def total(self):
+        return num_records(self.js)
+
+
+def _n_records(js) -> int:
+    return len(js.get("speechRecord") or js.get("meetingRecord") or []) if isinstance(js, dict) else 0
+
+
+def _retry_after(response) -> float | None:
+    """Retry-After ヘッダーの秒数（日付形式・なしは None）"""
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+class ApiClient:
+    """API のクライアント（スレッド間で共有できる）
+
+    接続はセッションで使い回す（pool_size は同時リクエスト数以上にする）。429/5xx・通信エラーは
+    最大 retries 回まで再試行し、その他の 4xx はすぐに送出する。rate は秒間リクエスト数の上限。
+    cache があれば取得済みのページはリクエストしない。stats にはリクエストごとの計測結果を記録する。
+    """
+
+    def __init__(self, base_url: str = API_BASE, rate: float = 1.0, cache: ResponseCache | None = None,
+                 stats: FetchStats | None = None, pool_size: int = 4, retries: int = 5, backoff: float = 1.0,
+                 max_backoff: float = 60.0, timeout: float = 60.0, adaptive: bool = True):
+        self.base_url = base_url
+        self.limiter = AdaptiveRateLimiter(rate) if adaptive else RateLimiter(rate)
+        self.cache = cache
+        self.stats = stats
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers.update({"User-Agent": UA, "Accept": "application/json"})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def backoff_delay(self, attempt: int, retry_after: float | None = None) -> float:
+        """attempt 回目（0 始まり）の失敗の後に待つ秒数（2 倍ずつ伸ばし、0.5〜1 倍のゆらぎを掛ける）"""
+        delay = min(self.max_backoff, self.backoff * 2 ** attempt) * random.uniform(0.5, 1.0)
+        return max(delay, retry_after or 0.0)
+
+    def get(self, endpoint: str, params: dict) -> Page:
+        url = f"{self.base_url}/{endpoint}"
+        # キャッシュにあればリクエストしない（間隔制御の対象外）
+        if self.cache is not None:
+            start = time.perf_counter()
+            hit = self.cache.get(url, params)
+            if hit is not None:
+                if self.stats is not None:
+                    self.stats.add(params, time.perf_counter() - start, 0, _n_records(hit[1]), cached=True)
+                return Page(params, hit[0], hit[1])
+
+        attempt = 0
+        while True:
+            self.limiter.acquire()
+            # 所要時間は間隔制御の待ち時間を含めない
+            start = time.perf_counter()
+            retry_after = None
+            try:
+                r = self.session.get(url, params=params, timeout=self.timeout)
+                r.raise_for_status()
+                js = r.json()
+            except requests.HTTPError as e:
+                if r.status_code not in RETRY_STATUS:
+                    raise
+                error, retry_after = e, _retry_after(r)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError,
+                    requests.exceptions.JSONDecodeError) as e:
+                # 本文が途中で切れた・JSON として読めない応答も取り直す（URL の誤りなどの ValueError はすぐに送出する）
+                error = e
+            else:
+                break
+            if isinstance(self.limiter, AdaptiveRateLimiter):
+                self.limiter.failure(retry_after)
+            if attempt >= self.retries:
+                raise error
+            time.sleep(self.backoff_delay(attempt, retry_after))
+            attempt += 1
+
+        latency = time.perf_counter() - start
+        if isinstance(self.limiter, AdaptiveRateLimiter):
+            self.limiter.success(latency)
+        page = Page(params, r.url, js, len(r.content))
+        if self.stats is not None:
+            self.stats.add(params, latency, page.nbytes, _n_records(page.js), cached=False, retries=attempt)
+        if self.cache is not None:
+            self.cache.put(url, params, page.url, page.js)
+        return page
+
+    def close(self) -> None:
+        self.session.close()
+
+
+def meeting_rows(js):
+    """meeting_list の応答 → 会議ごとの行"""
+    rows = []
+    for mt in js.get("meetingRecord") or []:
+        sp_recs = mt.get("speechRecord") or []
+        url = sp_recs[0].get("speechURL") if isinstance(sp_recs, list) and len(sp_recs) else None
+        rows.append({
+            "date": mt.get("date"),
+            "house": mt.get("nameOfHouse"),
+            "meeting": mt.get("nameOfMeeting"),
+            "issue": mt.get("issue"),
+            "session": mt.get("session"),
+            "url": url,
+        })
+    return rows
+
+def speech_rows(js):
+    """speech の応答 → 発言ごとの行"""
+    rows = []
+    for sp in js.get("speechRecord") or []:
+        rows.append({
+            "speech_id": sp.get("speechID"),
+            "date": sp.get("date"),
+            "session": sp.get("session"),
+            "nameOfHouse": sp.get("nameOfHouse") or sp.get("houseName"),
+            "nameOfMeeting": sp.get("nameOfMeeting"),
+            "speaker": sp.get("speaker"),
+            "speakerGroup": sp.get("speakerGroup"),
+            "speech": sp.get("speech"),
+            "speechURL": sp.get("speechURL"),
+            "issueID": sp.get("issueID"),
+            "meetingURL": sp.get("meetingURL"),
+            "billID": sp.get("billID"),
+        })
+    return rows
+
+
+class ColumnBuffer:
+    """行を列ごとのリストに追記する（ページごとの DataFrame は作らない）
+
+    key を指定すると、その列の値が既に追記した行と同じ行は捨てる（最初の行を残す）。
+    """
+
+    def __init__(self, key: str | None = None, seen=None):
+        self.key = key
+        self.columns: dict[str, list] = {}
+        # seen: 既に持っている key の値（その行は追記しない）
+        self.seen: set = set(seen) if seen is not None else set()
+        self.duplicates = 0
+
+    def __len__(self) -> int:
+        return len(next(iter(self.columns.values()), []))
+
+    def extend(self, rows) -> int:
+        """行（dict）を追記し、追記した件数を返す。列は最初の行のキーの順"""
+        added = 0
+        for row in rows:
+            if self.key is not None:
+                value = row.get(self.key)
+                if value in self.seen:
+                    self.duplicates += 1
+                    continue
+                self.seen.add(value)
+            if not self.columns:
+                self.columns = {col: [] for col in row}
+            for col, values in self.columns.items():
+                values.append(row.get(col))
+            added += 1
+        return added
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.columns) if self.columns else pd.DataFrame()
+
+
+def export_csv(frames, path: Path, part_bytes: int | None = None) -> list[tuple[Path, int]]:
+    """DataFrame を順に BOM 付き UTF-8 の CSV へ書き出し、(ファイル, 行数) のリストを返す（行がなければ空）
+
+    part_bytes を指定すると、ファイルがその大きさを超えたところで次のファイル（<名前>_2.csv, ...）に移る。
+    分けたファイルもそれぞれ BOM と見出しの付いた CSV になる（ダウンロード時に 1 ファイルずつ読めばよい）。
+    呼び出しごとに別の一時ファイルに書いてから置き換えるので、途中で失敗しても前のファイルは壊れず、
+    同じ path に同時に書いても混ざらない。
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    parts: list[list] = []  # [ファイル, 一時ファイル, 行数]
+    f = None
+    try:
+        for frame in frames:
+            # 大きさは EXPORT_BATCH_ROWS 行ごとに確かめる
+            for start in range(0, len(frame), EXPORT_BATCH_ROWS):
+                if f is None or (part_bytes and f.tell() >= part_bytes):
+                    if f is not None:
+                        f.close()
+                    target = path if not parts else path.with_stem(f"{path.stem}_{len(parts) + 1}")
+                    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{target.name}.", suffix=".tmp")
+                    parts.append([target, tmp, 0])
+                    # Excel でも文字化けしない BOM 付き UTF-8（BOM はファイルの先頭に 1 回だけ付く）
+                    f = open(fd, "w", encoding="utf-8-sig", newline="")
+                batch = frame.iloc[start:start + EXPORT_BATCH_ROWS]
+                batch.to_csv(f, index=False, header=parts[-1][2] == 0)
+                parts[-1][2] += len(batch)
+        if f is not None:
+            f.close()
+        for target, tmp, _ in parts:
+            os.replace(tmp, target)
+    except BaseException:
+        if f is not None:
+            f.close()
+        for _, tmp, _ in parts:
+            if os.path.exists(tmp):
+                os.unlink(tmp)
+        raise
+    return [(target, n_rows) for target, _, n_rows in parts]
+
+
+def meeting_speech_rows(js, issue_ids=None):
+    """meeting の応答 → 発言ごとの行（speech_rows と同じ列。日付・院・会議名などは会議から補う）
+
+    issue_ids を指定すると、その会議の発言だけ。
+    """
+    rows = []
+    for mt in js.get("meetingRecord") or []:
+        if issue_ids is not None and mt.get("issueID") not in issue_ids:
+            continue
+        for sp in mt.get("speechRecord") or []:
+            rows.append({
+                "speech_id": sp.get("speechID"),
+                "date": mt.get("date"),
+                "session": mt.get("session"),
+                "nameOfHouse": mt.get("nameOfHouse"),
+                "nameOfMeeting": mt.get("nameOfMeeting"),
+                "speaker": sp.get("speaker"),
+                "speakerGroup": sp.get("speakerGroup"),
+                "speech": sp.get("speech"),
+                "speechURL": sp.get("speechURL"),
+                "issueID": mt.get("issueID"),
+                "meetingURL": mt.get("meetingURL"),
+                "billID": sp.get("billID"),
+            })
+    return rows
+
+
+def plan_queries(date_from, date_until, houses, committees, kw, mode, all_committees, endpoint="speech"):
+    """検索条件 → startRecord を受け取って params を返す関数のリスト（院 × 委員会 × 語の組）"""
+    terms = [t for t in (kw or "").split() if t.strip()]
+    if mode.startswith("なし"):
+        terms = []
+
+    houses = houses or ["両院"]
+    committees = committees or [None]
+    if all_committees:
+        committees = [None]
+
+    queries = []
+    for h in houses:
+        for cm in committees:
+            if endpoint.startswith("meeting"):
+                # meeting_list: any は使わない
+                queries.append(partial(build_params, str(date_from), str(date_until), h, cm, [], mode,
+                                       maximum=PAGE_SIZE, include_keywords=False))
+            else:
+                # speech: AND はまとめ / OR は語ごと
+                term_sets = [terms] if (terms and mode.startswith("AND")) else [[t] for t in terms] if terms else [[]]
+                for ts in term_sets:
+                    queries.append(partial(build_params, str(date_from), str(date_until), h, cm, ts, "AND",
+                                           maximum=PAGE_SIZE, include_keywords=True))
+    return queries
+
+
+def _pages(n_records: int) -> int:
+    """全件を取るのに必要なページ数（0 件でも 1 回は問い合わせる）"""
+    return max(1, -(-n_records // PAGE_SIZE))
+
+
+def _without_keywords(query):
+    """検索から語（any）を外した検索"""
+    def unfiltered(start=1):
+        params = query(start=start)
+        params.pop("any", None)
+        return params
+    return unfiltered
+
+
+def _normalize(text: str) -> str:
+    """全角・半角などの表記の違いをそろえる（ＴＰＰ と TPP を同じに扱う API の検索に合わせる）"""
+    return unicodedata.normalize("NFKC", text)
+
+
+def _contains_any(terms: list[str], row: dict) -> bool:
+    """本文に語のいずれかを含むか（terms は _normalize 済み）"""
+    speech = _normalize(row.get("speech") or "")
+    return any(term in speech for term in terms)
+
+
+def plan_union(get, queries, firsts: list[Page]):
+    """OR の語ごとの検索を、院・委員会ごとに安い取り方に置き換える
+
+    各語の 1 ページ目（取得済み）の numberOfRecords から語ごとに取る残りのページ数を求め、語なしの検索の件数
+    （maximumRecords=1 で確認）の全ページ数の方が少なければ、語なしで取得して本文に語を含む発言だけを残す。
+    語が重なる発言が多いほど語ごとの検索は同じ発言を何度も取るので、語なしの方が安くなる。
+    返り値: (検索, 1 ページ目, 残す行の条件 or None, 続きのページを取るか) のリストと、計画の集計
+    """
+    windows: dict[str, list[int]] = {}
+    for i, query in enumerate(queries):
+        params = {k: v for k, v in query(start=1).items() if k not in ("any", "startRecord")}
+        windows.setdefault(cache_key("window", params), []).append(i)
+
+    jobs = [(query, first, None, True) for query, first in zip(queries, firsts)]
+    report = {"windows": len(windows), "unfiltered_windows": 0, "probe_requests": 0, "probe_bytes": 0,
+              "naive_requests": 0, "naive_records": 0}
+    for members in windows.values():
+        totals = [firsts[i].total for i in members]
+        if not all(isinstance(total, int) for total in totals):
+            continue
+        report["naive_requests"] += sum(_pages(total) for total in totals)
+        report["naive_records"] += sum(totals)
+        # 1 ページ目は取得済み。語なしは 1 ページ目から取り直すので、残りが 2 ページ以上でないと得にならない
+        remaining = sum(_pages(total) - 1 for total in totals)
+        if len(members) < 2 or remaining < 2:
+            continue
+        unfiltered = _without_keywords(queries[members[0]])
+        probe = get(dict(unfiltered(start=1), maximumRecords=1))
+        report["probe_requests"] += 1
+        report["probe_bytes"] += probe.nbytes
+        if not isinstance(probe.total, int) or _pages(probe.total) >= remaining:
+            continue
+        report["unfiltered_windows"] += 1
+        for i in members:
+            jobs[i] = (queries[i], firsts[i], None, False)
+        terms = [_normalize(queries[i](start=1)["any"]) for i in members]
+        jobs.append((unfiltered, get(unfiltered(start=1)), partial(_contains_any, terms), True))
+    return jobs, report
+
+
+def _in_order(pool, get, tasks, limit: int):
+    """tasks の (目印, params) を順に get し、(目印, 結果) を同じ順に返す（同時に投げておくのは limit 件まで）"""
+    pending = collections.deque()
+    for tag, params in tasks:
+        pending.append((tag, pool.submit(get, params)))
+        if len(pending) >= limit:
+            tag, future = pending.popleft()
+            yield tag, future.result()
+    while pending:
+        tag, future = pending.popleft()
+        yield tag, future.result()
+
+
+def fetch(date_from, date_until, houses, committees, kw, mode, all_committees, endpoint="speech",
+          workers=1, rate=None, base_url=API_BASE, cache: ResponseCache | None = None,
+          stats: FetchStats | None = None, client: ApiClient | None = None, known_ids=None,
+          plan: bool = False):
+    """検索条件に合う発言（または会議）をすべて取得
+
+    workers: 同時に投げるリクエスト数。rate: 秒間リクエスト数の上限（全スレッド合計）
+    cache: 応答キャッシュ（None なら常に取得）。stats: リクエストごとの計測結果の記録先
+    client: 使い回す ApiClient（渡すと base_url・rate・cache・stats は client のものを使う）
+    known_ids: 既に持っている speechID（届いたページからすぐ除く）
+    plan: OR 検索を plan_union で安い取り方にする（計画と減った量は stats に記録する）。
+          語なしで取った発言は本文を NFKC でそろえて絞るので、API の表記ゆれの扱いと違う発言は落ちることがある
+    """
+    is_meeting = endpoint.startswith("meeting")
+    name = "meeting_list" if is_meeting else "speech"
+    to_rows = meeting_rows if is_meeting else speech_rows
+    record_key = "meetingRecord" if is_meeting else "speechRecord"
+    if client is None:
+        client = ApiClient(base_url, rate or DEFAULT_RATE[name], cache=cache, stats=stats, pool_size=max(1, workers))
+    get = partial(client.get, name)
+
+    queries = plan_queries(date_from, date_until, houses, committees, kw, mode, all_committees, endpoint)
+    # 発言は speechID で重複を除く（OR の語ごとの検索で同じ発言が何度も返る）
+    buffer = ColumnBuffer(key=None if is_meeting else "speech_id", seen=known_ids)
+    last = {"params": {}, "url": "", "num": None, "preview": ""}
+    received = {"requests": 0, "bytes": 0, "records": 0}
+
+    def consume(page: Page, keep=None):
+        """ページの行を列に追記する（ページの JSON は保持しない）。keep があれば条件に合う行だけ"""
+        last.update(params=page.params, url=page.url, num=page.total)
+        rows = to_rows(page.js)
+        received["requests"] += 1
+        received["bytes"] += page.nbytes
+        received["records"] += len(rows)
+        if not rows:
+            last["preview"] = json.dumps(page.js, ensure_ascii=False)[:800]
+        buffer.extend(rows if keep is None else filter(keep, rows))
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        # 1 ページ目で件数を確認
+        firsts = list(pool.map(lambda q: get(q(start=1)), queries))
+        report = None
+        if plan and not is_meeting and mode.startswith("OR"):
+            jobs, report = plan_union(get, queries, firsts)
+        else:
+            jobs = [(query, first, None, True) for query, first in zip(queries, firsts)]
+        del firsts
+
+        # 残りのページの startRecord を計画する。件数が読めない検索は None（後で順に取る）
+        planned = []
+        for query, first, keep, more in jobs:
+            recs = first.js.get(record_key) or []
+            total = first.total
+            if not more or len(recs) < PAGE_SIZE:
+                planned.append(range(0))
+            elif isinstance(total, int):
+                planned.append(range(1 + len(recs), total + 1, PAGE_SIZE))
+            else:
+                planned.append(None)
+
+        # 計画したページは同時数の 2 倍まで先に投げておき、計画順に取り込む（取り込んだページはすぐ手放す）
+        job_queries = [query for query, *_ in jobs]
+        tasks = ((i, job_queries[i](start=s)) for i, starts in enumerate(planned) if starts for s in starts)
+        pages = _in_order(pool, get, tasks, 2 * max(1, workers))
+        ahead = next(pages, None)
+        for i, starts in enumerate(planned):
+            query, first, keep, _ = jobs[i]
+            jobs[i] = None
+            consume(first, keep)
+            if starts is not None:
+                while ahead is not None and ahead[0] == i:
+                    consume(ahead[1], keep)
+                    ahead = next(pages, None)
+                continue
+            # 件数が読めない場合は短いページが来るまで順に取得
+            start = 1 + PAGE_SIZE
+            while True:
+                page = get(query(start=start))
+                consume(page, keep)
+                recs = page.js.get(record_key) or []
+                if len(recs) < PAGE_SIZE:
+                    break
+                start += len(recs)
+
+    if report is not None and client.stats is not None:
+        # 語ごとに全ページを取った場合との差（受信バイト数は 1 件あたりの平均から見積もる。キャッシュから読んだ分は 0）
+        requests_made = received["requests"] + report["probe_requests"]
+        bytes_made = received["bytes"] + report["probe_bytes"]
+        per_record = received["bytes"] / received["records"] if received["records"] and received["bytes"] else None
+        report.update(requests=requests_made, requests_saved=report["naive_requests"] - requests_made,
+                      bytes=bytes_made,
+                      bytes_saved=round(report["naive_records"] * per_record - bytes_made) if per_record else None,
+                      duplicates=buffer.duplicates)
+        client.stats.add_plan(report)
+    return buffer.frame(), last["params"], last["url"], last["num"], last["preview"]
+
+
+def query_key(url, params) -> str:
+    """検索条件（startRecord を除く）のキー"""
+    return cache_key(url, {k: v for k, v in params.items() if k != "startRecord"})
+
+
+def harvest(store: SpeechStore, date_from, date_until, houses, committees, kw, mode, all_committees,
+            workers=1, rate=None, base_url=API_BASE, cache: ResponseCache | None = None, progress=None,
+            stats: FetchStats | None = None, client: ApiClient | None = None):
+    """検索条件に合う発言を取得しながら store に保存（speech エンドポイントのみ）
+
+    ページごとに発言と取得済みの記録を保存するので、途中で失敗しても同じ条件で呼び直せば
+    未取得のページだけを取得する。メモリに持つのは処理中のページだけ。
+    progress: ページを保存するたびに集計（dict）を受け取る関数
+    client: 使い回す ApiClient（渡すと base_url・rate・cache・stats は client のものを使う）
+    """
+    if client is None:
+        client = ApiClient(base_url, rate or DEFAULT_RATE["speech"], cache=cache, stats=stats,
+                           pool_size=max(1, workers))
+    url = f"{client.base_url}/speech"
+    get = partial(client.get, "speech")
+    summary = {"pages": 0, "resumed_pages": 0, "added": 0, "stored": 0}
+
+    def save(key, start, page):
+        summary["added"] += store.save_page(key, start, speech_rows(page.js), total=page.total if start == 1 else None)
+        summary["pages"] += 1
+        if progress is not None:
+            progress(dict(summary, stored=store.count()))
+
+    def tasks():
+        """未取得のページ (キー, startRecord, params) を順に返す"""
+        for query in plan_queries(date_from, date_until, houses, committees, kw, mode, all_committees, "speech"):
+            params = query(start=1)
+            key = query_key(url, params)
+            store.register_query(key, params)
+            done = store.completed_pages(key)
+            summary["resumed_pages"] += len(done)
+            if 1 not in done:
+                page = get(params)
+                save(key, 1, page)
+                done[1] = len(page.js.get("speechRecord") or [])
+            total = store.query_total(key)
+            if isinstance(total, int):
+                for start in range(1, total + 1, PAGE_SIZE):
+                    if start not in done:
+                        yield key, start, query(start=start)
+                continue
+            # 件数が読めない場合は短いページが来るまで順に取得
+            start = 1
+            while done[start] >= PAGE_SIZE:
+                start += done[start]
+                if start not in done:
+                    page = get(query(start=start))
+                    save(key, start, page)
+                    done[start] = len(page.js.get("speechRecord") or [])
+
+    # 投げておくリクエストは同時数の 2 倍まで（結果はすぐ保存して手放す）
+    pending = {}
+    error = None
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        task_iter = tasks()
+        while True:
+            while error is None and len(pending) < 2 * max(1, workers):
+                try:
+                    task = next(task_iter, None)
+                except Exception as e:
+                    # 1 ページ目の取得に失敗しても、取得中のページは保存してから止める
+                    error = e
+                    break
+                if task is None:
+                    break
+                key, start, params = task
+                pending[pool.submit(get, params)] = (key, start)
+            if not pending:
+                break
+            finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in finished:
+                key, start = pending.pop(future)
+                if future.exception() is not None:
+                    error = error or future.exception()
+                    continue
+                save(key, start, future.result())
+    if error is not None:
+        raise error
+    summary["stored"] = store.count()
+    return summary
+
+
+def _pages_of(pool, get, query, record_key: str, page_size: int, limit: int):
+    """検索の全ページ（1 ページ目で件数を確認し、残りは limit 件まで先に投げて並列に取得し、順に返す）"""
+    first = get(query(start=1, maximum=page_size))
+    yield first
+    recs = first.js.get(record_key) or []
+    if len(recs) < page_size:
+        return
+    if isinstance(first.total, int):
+        tasks = ((None, query(start=s, maximum=page_size)) for s in range(1 + len(recs), first.total + 1, page_size))
+        for _, page in _in_order(pool, get, tasks, limit):
+            yield page
+        return
+    # 件数が読めない場合は短いページが来るまで順に取得
+    start = 1 + len(recs)
+    while True:
+        page = get(query(start=start, maximum=page_size))
+        yield page
+        recs = page.js.get(record_key) or []
+        if len(recs) < page_size:
+            return
+        start += len(recs)
+
+
+def _meeting_query(date_from, date_until, house, session, start=1, maximum=PAGE_SIZE):
+    """会議の検索条件（session を指定するとその回次の会議）"""
+    params = build_params(date_from and str(date_from), date_until and str(date_until), house, None, [], "AND",
+                          start=start, maximum=maximum, include_keywords=False)
+    if session is not None:
+        params["sessionFrom"] = params["sessionTo"] = session
+    return params
+
+
+def harvest_meetings(date_from, date_until, houses=None, session=None, workers=1, rate=None, base_url=API_BASE,
+                     cache: ResponseCache | None = None, stats: FetchStats | None = None,
+                     client: ApiClient | None = None, known_ids=None):
+    """会議単位で全発言を取得し、(発言の DataFrame, 集計) を返す（列は speech_rows と同じ）
+
+    meeting_list（1 回 100 会議）で会議と各会議の speechID を数え、meeting（1 回 10 会議・本文つき）で
+    取る。known_ids（既に持っている speechID）だけの会議は取らず、その会議しかないページはリクエストしない。
+    meeting のページに並びの違いで入らなかった会議は issueID で 1 件ずつ取る。
+    date_from / date_until は None でもよい（session だけで絞る）。
+    client を渡すと base_url・rate・cache・stats は client のものを使う。
+    """
+    if client is None:
+        client = ApiClient(base_url, rate or DEFAULT_RATE["meeting"], cache=cache, stats=stats,
+                           pool_size=max(1, workers))
+    known_ids = set(known_ids) if known_ids is not None else set()
+    buffer = ColumnBuffer(key="speech_id", seen=known_ids)
+    summary = {"meetings": 0, "skipped_meetings": 0, "list_requests": 0, "meeting_requests": 0,
+               "single_requests": 0}
+
+    # 先に投げておくリクエストは同時数の 2 倍まで
+    limit = 2 * max(1, workers)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        for house in houses or ["両院"]:
+            query = partial(_meeting_query, date_from, date_until, house, session)
+            # 会議の一覧（並びは meeting と同じ）。発言がすべて手元にある会議は取らない
+            issue_ids, wanted = [], set()
+            for page in _pages_of(pool, partial(client.get, "meeting_list"), query, "meetingRecord", PAGE_SIZE,
+                                  limit):
+                summary["list_requests"] += 1
+                for mt in page.js.get("meetingRecord") or []:
+                    issue_ids.append(mt.get("issueID"))
+                    speech_ids = {sp.get("speechID") for sp in mt.get("speechRecord") or []}
+                    if not speech_ids or not speech_ids <= known_ids:
+                        wanted.add(mt.get("issueID"))
+            summary["meetings"] += len(issue_ids)
+            summary["skipped_meetings"] += len(issue_ids) - len(wanted)
+
+            # 取る会議を含むページだけを並列に取得し、一覧の順に取り込む
+            starts = [s for s in range(1, len(issue_ids) + 1, MEETING_PAGE_SIZE)
+                      if wanted.intersection(issue_ids[s - 1:s - 1 + MEETING_PAGE_SIZE])]
+            tasks = ((None, query(start=s, maximum=MEETING_PAGE_SIZE)) for s in starts)
+            remaining = set(wanted)
+            for _, page in _in_order(pool, partial(client.get, "meeting"), tasks, limit):
+                summary["meeting_requests"] += 1
+                buffer.extend(meeting_speech_rows(page.js, remaining))
+                remaining -= {mt.get("issueID") for mt in page.js.get("meetingRecord") or []}
+            for issue_id in sorted(remaining):
+                page = client.get("meeting", {"recordPacking": "json", "issueID": issue_id,
+                                               "maximumRecords": MEETING_PAGE_SIZE})
+                summary["single_requests"] += 1
+                buffer.extend(meeting_speech_rows(page.js, {issue_id}))
+
+    summary["speeches"] = len(buffer)
+    summary["duplicates"] = buffer.duplicates
+    return buffer.frame(), summary
@@ -0,0 +1,208 @@
+"""
+発言テキストの文字 n-gram 転置索引
+- 日本語は空白で区切れないため、文字 bigram（既定）ごとに発言の行位置リストを持つ
+- 部分一致検索は、検索語の n-gram の行リストを積集合で絞り込み、候補だけを正規表現で確認する
+- 索引は .npz に保存でき、ファイルごとに作った索引は concat で 1 つにまとめられる
+"""
+import os
+import re
+import tempfile
+import unicodedata
+import zipfile
+from pathlib import Path
+
+import numpy as np
+
+# 1 文字あたりのビット数（Unicode のコードポイントは 21 ビットに収まる）
+_CHAR_BITS = 21
+# 保存形式の版
+INDEX_VERSION = 1
+
+
+def _indexable(term: str) -> bool:
+    """索引で候補を絞れる検索語か（大文字小文字の扱いが単純な文字だけを含む）"""
+    return "\x00" not in term and all(c.isascii() or c.lower() == c.upper() for c in term)
+
+
+def _exact(term: str) -> bool:
+    """n-gram の一致だけで部分一致が確定する語か（大文字小文字・結合文字を含まない）"""
+    return all(c.lower() == c.upper() == c.casefold() and not unicodedata.combining(c) for c in term)
+
+
+def _intersect(small: np.ndarray, large: np.ndarray) -> np.ndarray:
+    """昇順の行位置配列どうしの積集合（小さい側を二分探索）"""
+    if len(small) == 0 or len(large) == 0:
+        return small[:0]
+    idx = np.searchsorted(large, small)
+    idx[idx == len(large)] = 0
+    return small[large[idx] == small]
+
+
+class NgramIndex:
+    """文字 n-gram → 行位置（昇順）の転置索引。大文字小文字は区別しない（casefold）"""
+
+    def __init__(self, n: int, keys: np.ndarray, indptr: np.ndarray, postings: np.ndarray, n_rows: int):
+        self.n = n
+        self.keys = keys
+        self.indptr = indptr
+        self.postings = postings
+        self.n_rows = n_rows
+
+    def _gram_keys(self, codes: np.ndarray) -> np.ndarray:
+        """コードポイント列 → 連続 n 文字のキー"""
+        keys = np.zeros(len(codes) - self.n + 1, dtype=np.uint64)
+        for j in range(self.n):
+            keys = (keys << np.uint64(_CHAR_BITS)) | codes[j:len(codes) - self.n + 1 + j]
+        return keys
+
+    @staticmethod
+    def _codes(text: str) -> np.ndarray:
+        return np.frombuffer(text.encode("utf-32-le"), dtype=np.uint32).astype(np.uint64)
+
+    @classmethod
+    def build(cls, speeches, n: int = 2, chunk_size: int = 5000) -> "NgramIndex":
+        """発言テキスト列（pd.Series または TextStore）から索引を作成"""
+        if not 1 <= n <= 3:
+            raise ValueError("n は 1〜3 で指定してください")
+        index = cls(n, np.empty(0, np.uint64), np.zeros(1, np.int64), np.empty(0, np.int32), len(speeches))
+
+        chunk_keys, chunk_rows = [], []
+        for start in range(0, len(speeches), chunk_size):
+            # テキストはチャンクごとに取り出す
+            rows = np.arange(start, min(start + chunk_size, len(speeches)))
+            chunk = [t.casefold() for t in speeches.take(rows).fillna("").astype(str)]
+            if not chunk:
+                continue
+            # \x00 で連結し、発言をまたぐ n-gram は後で捨てる
+            codes = cls._codes("\x00".join(chunk) + "\x00")
+            rows = np.repeat(np.arange(start, start + len(chunk), dtype=np.int64),
+                             [len(t) + 1 for t in chunk])
+            if len(codes) < n:
+                continue
+            keys = index._gram_keys(codes)
+            windows = np.lib.stride_tricks.sliding_window_view(codes, n)
+            valid = (windows != 0).all(axis=1)
+            keys, rows = keys[valid], rows[:len(valid)][valid]
+
+            # (キー, 行) の重複を除く
+            order = np.lexsort((rows, keys))
+            keys, rows = keys[order], rows[order]
+            first = np.ones(len(keys), dtype=bool)
+            first[1:] = (keys[1:] != keys[:-1]) | (rows[1:] != rows[:-1])
+            chunk_keys.append(keys[first])
+            chunk_rows.append(rows[first])
+
+        if chunk_keys:
+            keys = np.concatenate(chunk_keys)
+            rows = np.concatenate(chunk_rows)
+            # チャンクは行順なので、安定ソートで各キー内の行位置も昇順になる
+            order = np.argsort(keys, kind="stable")
+            keys, rows = keys[order], rows[order]
+            index.keys, starts = np.unique(keys, return_index=True)
+            index.indptr = np.append(starts, len(keys)).astype(np.int64)
+            index.postings = rows.astype(np.int32)
+        return index
+
+    @classmethod
+    def concat(cls, parts: list[tuple["NgramIndex", np.ndarray]], n_rows: int) -> "NgramIndex":
+        """部分ごとの索引を 1 つにまとめる（parts は (索引, その索引の各行の行位置) のリスト）
+
+        全体は並べ替えず、キーごとの件数から各部分の行リストの置き場所を求めて部分の順に詰める。
+        部分の行位置が昇順で部分どうしも行順（月別ファイルを読んだ順）なら、各キーの行位置はそのまま昇順になる。
+        """
+        n = parts[0][0].n if parts else 2
+        index = cls(n, np.empty(0, np.uint64), np.zeros(1, np.int64), np.empty(0, np.int32), n_rows)
+        if any(part.n != n for part, _ in parts):
+            raise ValueError("n の違う索引はまとめられません")
+        if not parts:
+            return index
+        keys = np.unique(np.concatenate([part.keys for part, _ in parts]))
+        ids = [np.searchsorted(keys, part.keys) for part, _ in parts]
+        counts = np.zeros(len(keys), dtype=np.int64)
+        for part_ids, (part, _) in zip(ids, parts):
+            counts[part_ids] += np.diff(part.indptr)
+        indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        postings = np.empty(indptr[-1], dtype=np.int32)
+        # 各キーの次の書き込み位置
+        fill = indptr[:-1].copy()
+        for part_ids, (part, positions) in zip(ids, parts):
+            lengths = np.diff(part.indptr)
+            dest = np.repeat(fill[part_ids] - part.indptr[:-1], lengths) + np.arange(len(part.postings))
+            postings[dest] = np.asarray(positions, dtype=np.int32)[part.postings]
+            fill[part_ids] += lengths
+        # キー内で行位置が下がるところがあれば（部分が行順でないとき）、キーの番号と行位置の 1 つの整数で並べ直す
+        down = np.flatnonzero(postings[1:] < postings[:-1]) + 1
+        if np.isin(down, indptr, invert=True).any():
+            composite = np.repeat(np.arange(len(keys), dtype=np.int64), counts) * max(n_rows, 1) + postings
+            postings = postings[np.argsort(composite)]
+        index.keys, index.indptr, index.postings = keys, indptr, postings
+        return index
+
+    def write(self, path: Path) -> None:
+        """.npz に保存（一時ファイルに書いてから置き換える）"""
+        # 一時ファイルは書くたびに別の名前（同じプロセスの複数セッションが同じ索引を作っても混ざらない）
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+        try:
+            with open(fd, "wb") as f:
+                np.savez(f, version=INDEX_VERSION, n=self.n, keys=self.keys, indptr=self.indptr,
+                         postings=self.postings, n_rows=self.n_rows)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    @classmethod
+    def read(cls, path: Path) -> "NgramIndex | None":
+        """保存した索引を読む（ない・版が違う・壊れているときは None）"""
+        try:
+            with np.load(path) as data:
+                if int(data["version"]) != INDEX_VERSION:
+                    return None
+                return cls(int(data["n"]), data["keys"], data["indptr"], data["postings"], int(data["n_rows"]))
+        except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+            return None
+
+    def postings_for(self, key: np.uint64) -> np.ndarray:
+        i = np.searchsorted(self.keys, key)
+        if i == len(self.keys) or self.keys[i] != key:
+            return self.postings[:0]
+        return self.postings[self.indptr[i]:self.indptr[i + 1]]
+
+    def candidates(self, term: str) -> np.ndarray | None:
+        """term を含み得る行位置（昇順）。索引で絞れない語は None"""
+        folded = term.casefold()
+        if len(folded) < self.n or not _indexable(term):
+            return None
+        lists = sorted((self.postings_for(k) for k in np.unique(self._gram_keys(self._codes(folded)))), key=len)
+        result = lists[0]
+        for postings in lists[1:]:
+            if len(result) == 0:
+                break
+            result = _intersect(result, postings)
+        return result
+
+    def search(self, texts, terms: list[str], positions: np.ndarray | None = None,
+               case: bool = False) -> np.ndarray:
+        """terms のいずれかを含む行位置（昇順）
+
+        texts は索引作成時と同じ発言テキスト列（pd.Series または TextStore）。positions（昇順）を渡すとその行に限定する。
+        結果は texts.str.contains("|".join(map(re.escape, terms)), case=case) と一致する。
+        """
+        scope = np.arange(self.n_rows) if positions is None else np.asarray(positions)
+        hits = []
+        for term in terms:
+            cand = self.candidates(term)
+            cand = scope if cand is None else _intersect(cand, scope) if positions is not None else cand
+            if len(cand) == 0:
+                continue
+            if len(term) == self.n and _exact(term) and cand is not scope:
+                # 検索語がちょうど 1 つの n-gram なら行リストがそのまま答え
+                hits.append(cand)
+                continue
+            # 候補だけを正規表現で確認
+            matched = texts.take(cand).fillna("").astype(str).str.contains(re.escape(term), case=case, regex=True)
+            hits.append(cand[matched.to_numpy(dtype=bool)])
+        if not hits:
+            return scope[:0]
+        return np.unique(np.concatenate(hits))
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""
+ダッシュボード用の成果物の事前計算（夜間バッチ用）
+- 元データ（CSV・差分ファイル）を月別ファイル（列指向の Parquet + 本文ファイル）に分ける
+- 月別ファイルごとのキーワード索引・n-gram 索引と、全期間の集計表を months/ に保存する
+- 作成済みの成果物は作り直さない（--rebuild ですべて作り直す）。デプロイ前や sync_kokkai.py の後に実行しておけば、
+  ダッシュボードの初回表示は成果物を読むだけになる
+
+    python precompute.py                 # data/ の成果物をそろえる
+    python precompute.py --workers 4 --rebuild
+"""
+import argparse
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from pathlib import Path
+
+from analytics import build_file_artifacts, load_rollup_cube, month_files
+from dataset import MONTH_DIR, month_catalog, select_months
+
+DATA_DIR = Path(__file__).parent / "data"
+
+
+def precompute(data_dir: Path, workers: int = 1, rebuild: bool = False, progress=None) -> dict:
+    """成果物をそろえ、件数と所要時間を返す。progress(完了数, 全体数, ファイルの結果) で進捗を通知"""
+    start = time.perf_counter()
+    catalog = month_catalog(data_dir)
+    split_seconds = time.perf_counter() - start
+
+    names = month_files(catalog, select_months(catalog))
+    build = partial(build_file_artifacts, data_dir / MONTH_DIR, rebuild=rebuild)
+    files = []
+    if workers <= 1:
+        results = map(build, names)
+    else:
+        # 月別ファイルごとに別プロセスで作る（spawn で起動し、結果は一覧の順に受け取る）
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+        results = pool.map(build, names)
+    try:
+        for result in results:
+            files.append(result)
+            if progress:
+                progress(len(files), len(names), result)
+    finally:
+        if workers > 1:
+            pool.shutdown()
+
+    index_seconds = time.perf_counter() - start - split_seconds
+    rollup_cube = load_rollup_cube(data_dir, catalog, rebuild=rebuild)
+    return {
+        "rows": catalog["rows"],
+        "months": len(catalog["months"]),
+        "files": len(files),
+        "rollup_rows": len(rollup_cube.cube),
+        "split_seconds": split_seconds,
+        "index_seconds": index_seconds,
+        "rollup_seconds": time.perf_counter() - start - split_seconds - index_seconds,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--workers", type=int, default=1, help="索引を作るプロセス数")
+    parser.add_argument("--rebuild", action="store_true", help="作成済みの索引・集計表も作り直す")
+    args = parser.parse_args()
+
+    def progress(done, total, result):
+        print(f"[{done}/{total}] {result['file']}: {result['rows']:,}件 {result['seconds']:.2f}秒")
+
+    try:
+        summary = precompute(args.data_dir, workers=args.workers, rebuild=args.rebuild, progress=progress)
+    except FileNotFoundError as e:
+        raise SystemExit(f"元データがありません: {e}")
+    print(f"{summary['rows']:,}件（{summary['months']}か月・{summary['files']}ファイル）"
+          f" 月別分割 {summary['split_seconds']:.1f}秒・索引 {summary['index_seconds']:.1f}秒・"
+          f"集計表 {summary['rollup_rows']:,}行 {summary['rollup_seconds']:.1f}秒")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+処理時間・メモリの計測
+- スクリプトの上から順に lap(名前) を呼ぶと、前回の lap からの経過時間・処理行数を記録する
+- measure_memory=True ならプロセスの RSS から区間内のメモリ増分（区間内の最大 RSS の増分・RSS の増分）も記録する
+  （RSS はプロセス全体の値なので、同時に動く他のセッションの分も含まれる。tracemalloc と違って
+  計測を始める・止める状態がないので、他のセッションの計測や速さに影響せず、途中で抜けても後始末はいらない）
+- 区間内の最大 RSS は、区間の始めに /proc/self/clear_refs で最大値（VmHWM）を今の RSS に戻してから
+  /proc/self/status の VmHWM を読む（Linux のみ。戻せない環境では空欄）。VmHWM はプロセスに 1 つなので、
+  戻して測るのは同時に 1 つの Profiler だけにする（Streamlit のセッションは同じプロセスのスレッドなので、
+  ほかのセッションが測っている間は空欄。値はプロセス全体の最大なので、同時に動く他のセッションの分も含む）
+- 記録は DataFrame でデバッグ情報に表示し、JSON Lines のログに追記して集計できる
+"""
+import json
+import os
+import threading
+import time
+import weakref
+from pathlib import Path
+
+import pandas as pd
+
+_log_lock = threading.Lock()
+# 最大 RSS を戻して測っている Profiler（プロセスに 1 つ。手放さずに消えた Profiler の分は空く）
+_peak_lock = threading.Lock()
+_peak_owner: weakref.ref | None = None
+
+
+def _rss() -> int | None:
+    """現在の RSS（バイト）。/proc のない OS では None"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def _reset_peak_rss() -> bool:
+    """最大 RSS（VmHWM）を今の RSS に戻す。戻せない OS では False"""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _claim_peak(profiler: "Profiler") -> bool:
+    """profiler が最大 RSS を戻して測れるか（ほかの Profiler が測っている間は False）"""
+    global _peak_owner
+    with _peak_lock:
+        owner = _peak_owner() if _peak_owner is not None else None
+        if owner is not None and owner is not profiler:
+            return False
+        _peak_owner = weakref.ref(profiler)
+        return True
+
+
+def _release_peak(profiler: "Profiler") -> None:
+    global _peak_owner
+    with _peak_lock:
+        if _peak_owner is not None and _peak_owner() is profiler:
+            _peak_owner = None
+
+
+def _peak_rss() -> int | None:
+    """最後に戻してからの最大 RSS（バイト）。/proc のない OS では None"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _mb(after: int | None, before: int | None) -> float | None:
+    return None if after is None or before is None else (after - before) / 2**20
+
+
+class Profiler:
+    """区間ごとの 経過時間・処理行数・メモリ増分
+
+    peak_mb はプロセス全体の最大 RSS の増分で、ほかの Profiler が測っている区間では None。
+    計測を終えたら close() で手放す（ほかのセッションが測れるようになる）。
+    """
+
+    def __init__(self, measure_memory: bool = False):
+        self.measure_memory = measure_memory
+        self.records: list[dict] = []
+        self.closed = False
+        self._reset()
+
+    def _reset(self) -> None:
+        self.started = time.perf_counter()
+        if self.measure_memory:
+            # ほかの Profiler が測っておらず、最大 RSS を戻せたときだけ、区間内の最大 RSS を測る
+            measure_peak = not self.closed and _claim_peak(self) and _reset_peak_rss()
+            self.base = _rss()
+            self.base_peak = self.base if measure_peak else None
+
+    def lap(self, section: str, rows: int | None = None) -> dict:
+        """前回の lap からの区間を section として記録"""
+        entry = {"section": section, "seconds": time.perf_counter() - self.started,
+                 "rows": None if rows is None else int(rows)}
+        if self.measure_memory:
+            entry["peak_mb"] = _mb(_peak_rss(), self.base_peak)
+            entry["retained_mb"] = _mb(_rss(), self.base)
+        self.records.append(entry)
+        self._reset()
+        return entry
+
+    def close(self) -> None:
+        """最大 RSS の計測を手放す（この後の区間の peak_mb は None）"""
+        self.closed = True
+        self.base_peak = None
+        _release_peak(self)
+
+    def frame(self) -> pd.DataFrame:
+        return pd.DataFrame(self.records)
+
+    def write_log(self, path: Path, **context) -> None:
+        """区間ごとに 1 行の JSON を追記（context は各行に付ける項目）"""
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S")
+        lines = [json.dumps({"timestamp": timestamp, **context, **entry}, ensure_ascii=False, default=str)
+                 for entry in self.records]
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _log_lock, open(path, "a", encoding="utf-8") as f:
+            f.write("".join(line + "\n" for line in lines))
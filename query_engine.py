@@ -0,0 +1,136 @@
+"""
+フィルタ処理（行位置の配列で絞り込む）
+- 日付は読み込み時に並べ替えておき、期間は二分探索で求める
+- 院・委員会・政党はカテゴリコードの配列を持ち、選択値の表を引くだけでマスクを作る
+- 絞り込み結果は行位置の配列。発言テキストは必要な行だけ取り出す（TextStore を渡せば本文はメモリに持たない）
+- 発言数・文字数は 日付×院×委員会×政党×発言者 の集計表（RollupCube）からも同じ条件で求められる
+"""
+import numpy as np
+import pandas as pd
+
+from text_store import TEXT_COLUMNS
+
+# カテゴリで絞り込める列
+FILTER_COLUMNS = ["house", "committee", "party"]
+# 集計表の軸
+ROLLUP_DIMENSIONS = ["date", "session", "house", "committee", "party", "speaker"]
+# 集計表を作るのに要る列（テキストは読まなくてよい）
+ROLLUP_SOURCE_COLUMNS = ROLLUP_DIMENSIONS + ["has_speech", "char_count"]
+
+
+def rollup_rows(meta: pd.DataFrame) -> pd.DataFrame:
+    """発言行を集計表と同じ列構成（軸 + row_count / speech_count / char_count）にする"""
+    return pd.DataFrame({
+        **{col: meta[col] for col in ROLLUP_DIMENSIONS},
+        "row_count": np.ones(len(meta), dtype=np.int64),
+        "speech_count": meta["has_speech"].astype(np.int64),
+        "char_count": meta["char_count"],
+    })
+
+
+class RowIndex:
+    """日付・カテゴリ列で行位置を絞り込む索引"""
+
+    def __init__(self, frame: pd.DataFrame):
+        self.n_rows = len(frame)
+
+        # 日付順の行位置と並べ替え済みの日付（NaT は末尾に来るが期間検索には掛からない）
+        dates = frame["date"].to_numpy(dtype="datetime64[ns]")
+        self.date_order = np.argsort(dates, kind="stable")
+        self.sorted_dates = dates[self.date_order]
+        # 各行の新しさの順位（大きいほど新しい。NaT は最も古い扱い、同じ日付は行位置の大きい方が上）
+        dated = ~np.isnat(self.sorted_dates)
+        self.date_rank = np.empty(self.n_rows, dtype=np.int64)
+        self.date_rank[np.concatenate([self.date_order[~dated], self.date_order[dated]])] = np.arange(self.n_rows)
+
+        # 列ごとのカテゴリ名とコード
+        self.categories: dict[str, pd.Index] = {}
+        self.codes: dict[str, np.ndarray] = {}
+        for col in FILTER_COLUMNS:
+            values = pd.Categorical(frame[col])
+            self.categories[col] = values.categories
+            self.codes[col] = values.codes
+
+    def date_mask(self, start, end) -> np.ndarray:
+        """start <= date <= end の行のマスク"""
+        lo = np.searchsorted(self.sorted_dates, np.datetime64(pd.to_datetime(start), "ns"), side="left")
+        hi = np.searchsorted(self.sorted_dates, np.datetime64(pd.to_datetime(end), "ns"), side="right")
+        mask = np.zeros(self.n_rows, dtype=bool)
+        mask[self.date_order[lo:hi]] = True
+        return mask
+
+    def category_mask(self, col: str, values: list) -> np.ndarray:
+        """col が values のいずれかである行のマスク"""
+        selected = np.zeros(len(self.categories[col]) + 1, dtype=bool)
+        selected[self.categories[col].get_indexer_for(values)] = True
+        # 見つからない値・欠損（コード -1）は末尾の False を引く
+        selected[-1] = False
+        return selected[self.codes[col]]
+
+    def latest(self, rows, k: int) -> np.ndarray:
+        """rows のうち日付の新しい k 行（新しい順）。並べ替えるのは選んだ k 行だけ"""
+        rows = np.asarray(rows, dtype=np.int64)
+        ranks = self.date_rank[rows]
+        if len(rows) > k:
+            top = np.argpartition(-ranks, k - 1)[:k] if k > 0 else np.empty(0, dtype=np.int64)
+            rows, ranks = rows[top], ranks[top]
+        return rows[np.argsort(-ranks)]
+
+    def select(self, date_range=None, houses=None, committees=None, parties=None) -> np.ndarray:
+        """条件に合う行位置（昇順）。空の条件は絞り込まない"""
+        mask = np.ones(self.n_rows, dtype=bool)
+        if date_range is not None:
+            mask &= self.date_mask(*date_range)
+        for col, values in (("house", houses), ("committee", committees), ("party", parties)):
+            if values:
+                mask &= self.category_mask(col, values)
+        return np.flatnonzero(mask)
+
+
+class QueryEngine(RowIndex):
+    """発言データの絞り込み用索引"""
+
+    def __init__(self, speeches: pd.DataFrame, texts=None):
+        """texts: 行位置でテキストを取り出すもの（TextStore）。None なら speeches の speech 列"""
+        super().__init__(speeches)
+        self.speech = speeches["speech"] if texts is None else texts
+
+        # テキスト以外の列（発言の有無だけは集計用に残す）
+        self.meta = speeches.drop(columns=["speech", *TEXT_COLUMNS], errors="ignore")
+        if "has_speech" not in self.meta.columns:
+            self.meta["has_speech"] = speeches["speech"].notna()
+
+    def frame(self, rows: np.ndarray) -> pd.DataFrame:
+        """指定行のテキスト以外の列（index は元の行位置）"""
+        return self.meta.take(rows)
+
+    def texts(self, rows) -> pd.Series:
+        """指定行の発言テキスト"""
+        return self.speech.take(np.asarray(rows))
+
+
+class RollupCube(RowIndex):
+    """日付（と国会の回次）×院×委員会×政党×発言者ごとの 行数・発言数・文字数
+
+    キーワード条件がなければ、メトリクス・ランキング・推移はこの表を絞り込んで集計すれば
+    発言行から集計した結果と一致する。
+    """
+
+    def __init__(self, cube: pd.DataFrame):
+        super().__init__(cube)
+        self.cube = cube
+
+    @classmethod
+    def build(cls, meta: pd.DataFrame) -> "RollupCube":
+        """発言行（ROLLUP_SOURCE_COLUMNS があればよい）から集計表を作成"""
+        return cls(
+            rollup_rows(meta)
+            .groupby(ROLLUP_DIMENSIONS, observed=True, dropna=False, sort=False)
+            [["row_count", "speech_count", "char_count"]]
+            .sum()
+            .reset_index()
+        )
+
+    def frame(self, rows: np.ndarray) -> pd.DataFrame:
+        """指定行（集計表の行位置）"""
+        return self.cube.take(rows)
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+"""
+API 応答のローカルキャッシュ（SQLite）
+- キーはエンドポイント URL + 正規化したクエリパラメータ
+- 本文は zlib 圧縮して保存。有効期限（TTL）と合計サイズ上限（最終利用が古い順に削除）を持つ
+- offline=True のときはネットワークに出ず、キャッシュにない応答は CacheMiss を送出する
+- FixtureCache は応答を 1 件 1 ファイルの JSON として記録・再生する（テスト・ベンチマーク用。接続先によらず使える）
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+
+
+class CacheMiss(LookupError):
+    """オフライン再生時にキャッシュにない応答を要求した"""
+
+
+def cache_key(url: str, params: dict) -> str:
+    """エンドポイントとパラメータから一意なキーを作る（順序・型・前後の空白の違いは無視）"""
+    normalized = sorted((str(k), " ".join(str(v).split())) for k, v in params.items() if v is not None)
+    return hashlib.sha256(json.dumps([url, normalized], ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """API 応答（JSON）のキャッシュ。スレッド間で共有できる"""
+
+    def __init__(self, path: Path, ttl: float | None = 7 * 24 * 3600, max_bytes: int = 512 * 1024 * 1024,
+                 offline: bool = False):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at)")
+        self.conn.commit()
+
+    def get(self, url: str, params: dict):
+        """(取得時の URL, JSON) を返す。なければ None（オフライン時は CacheMiss）"""
+        key = cache_key(url, params)
+        now = time.time()
+        with self.lock:
+            row = self.conn.execute("SELECT url, body, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+            # オフライン再生では期限切れでも使う
+            if row is not None and (self.offline or self.ttl is None or now - row[2] <= self.ttl):
+                self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (now, key))
+                self.conn.commit()
+                self.hits += 1
+                return row[0], json.loads(zlib.decompress(row[1]))
+            self.misses += 1
+        if self.offline:
+            raise CacheMiss(f"キャッシュにない応答です: {url} {params}")
+        return None
+
+    def put(self, url: str, params: dict, response_url: str, js) -> None:
+        body = zlib.compress(json.dumps(js, ensure_ascii=False).encode("utf-8"))
+        now = time.time()
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (key, url, body, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (cache_key(url, params), response_url, body, len(body), now, now),
+            )
+            self._evict()
+            self.conn.commit()
+
+    def _evict(self) -> None:
+        """合計サイズが上限を超えたら、最終利用が古いものから削除"""
+        total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        freed = 0
+        stale = []
+        for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+            if total - freed <= self.max_bytes:
+                break
+            stale.append((key,))
+            freed += size
+        self.conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+
+    def stats(self) -> dict:
+        with self.lock:
+            count, size = self.conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {"hits": self.hits, "misses": self.misses, "entries": count, "bytes": size}
+
+    def clear(self) -> None:
+        with self.lock:
+            self.conn.execute("DELETE FROM responses")
+            self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class FixtureCache:
+    """記録した API 応答（JSON ファイル）。ResponseCache と同じ get / put で ApiClient に渡せる
+
+    キーはエンドポイント名 + 正規化したクエリパラメータ（接続先の URL は含めないので、本物の API で記録した応答も
+    ローカルで再生できる）。offline=True ならネットワークに出ず、記録にない応答は CacheMiss を送出する。
+    """
+
+    def __init__(self, directory: Path, offline: bool = True):
+        self.directory = Path(directory)
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+
+    def _path(self, url: str, params: dict) -> Path:
+        return self.directory / f"{cache_key(url.rsplit('/', 1)[-1], params)[:32]}.json"
+
+    def get(self, url: str, params: dict):
+        """(取得時の URL, JSON) を返す。なければ None（オフライン時は CacheMiss）"""
+        path = self._path(url, params)
+        if path.exists():
+            record = json.loads(path.read_text(encoding="utf-8"))
+            with self.lock:
+                self.hits += 1
+            return record["url"], record["response"]
+        with self.lock:
+            self.misses += 1
+        if self.offline:
+            raise CacheMiss(f"記録にない応答です: {url} {params}")
+        return None
+
+    def put(self, url: str, params: dict, response_url: str, js) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(url, params)
+        record = {"endpoint": url.rsplit("/", 1)[-1], "params": params, "url": response_url, "response": js}
+        tmp_path = path.with_name(f".{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_text(json.dumps(record, ensure_ascii=False, indent=1), encoding="utf-8")
+        os.replace(tmp_path, path)
+
+    def stats(self) -> dict:
+        with self.lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(list(self.directory.glob("*.json")))}
+
+    def close(self) -> None:
+        pass
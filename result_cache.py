@@ -0,0 +1,98 @@
+"""
+絞り込み条件ごとの集計結果のキャッシュ（プロセス内で全セッションが共有する）
+- キーは (集計の種類, 正規化した絞り込み条件)。条件は 期間・院・委員会・キーワード（順序・重複・前後の空白は無視）
+- 件数と合計サイズ（DataFrame のメモリ使用量）の上限を持ち、最後に使ったのが古い順に捨てる
+- データの版（dataset_version）が変わったら全部捨てる
+- 返す結果は複数のセッションで共有するので、呼び出し側で書き換えない
+"""
+import collections
+import threading
+
+import pandas as pd
+
+
+def filter_key(date_range=None, houses=None, committees=None, keywords=None) -> tuple:
+    """絞り込み条件 → キャッシュのキー（同じ結果になる条件は同じキーにする）"""
+    def names(values):
+        return None if values is None else tuple(sorted({str(v).strip() for v in values}))
+
+    dates = None if date_range is None else tuple(pd.Timestamp(d).strftime("%Y-%m-%d") for d in date_range)
+    # キーワードなしと空のリストは同じ
+    return dates, names(houses), names(committees), names(keywords or [])
+
+
+def result_size(value) -> int:
+    """結果のおおよそのバイト数"""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    return 64
+
+
+class ResultCache:
+    """集計結果の LRU キャッシュ。スレッド間で共有できる"""
+
+    def __init__(self, max_entries: int = 256, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: collections.OrderedDict = collections.OrderedDict()
+        self.nbytes = 0
+        self.version = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def use_version(self, version) -> None:
+        """データの版を設定（前と違えば全部捨てる）"""
+        with self.lock:
+            if version != self.version:
+                self.entries.clear()
+                self.nbytes = 0
+                self.version = version
+
+    def get(self, section: str, key: tuple, compute):
+        """キャッシュにあればそれを、なければ compute() の結果を保存して返す"""
+        with self.lock:
+            entry = self.entries.get((section, key))
+            if entry is not None:
+                self.entries.move_to_end((section, key))
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+            version = self.version
+
+        # 計算中はロックを持たない（同じ条件を同時に計算することはあるが、結果は同じ）
+        value = compute()
+        size = result_size(value)
+        with self.lock:
+            # 計算中に版が変わったら古いデータの結果なので保存しない
+            if version == self.version and size <= self.max_bytes and (section, key) not in self.entries:
+                self.entries[(section, key)] = (value, size)
+                self.nbytes += size
+                self._evict()
+        return value
+
+    def _evict(self) -> None:
+        while len(self.entries) > self.max_entries or self.nbytes > self.max_bytes:
+            _, (_, size) = self.entries.popitem(last=False)
+            self.nbytes -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.nbytes = 0
+
+    def stats(self) -> dict:
+        with self.lock:
+            total = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": self.nbytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+                "evictions": self.evictions,
+            }
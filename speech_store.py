@@ -0,0 +1,115 @@
+# -*- coding: utf-8 -*-
+"""
+取得した発言のローカル保存先（SQLite）
+- 発言は speechID をキーに保存する（同じ発言は 1 件だけ）
+- 取得済みのページ（検索条件 × startRecord）を発言と同じトランザクションで記録し、
+  中断しても次回はまだ取得していないページから再開できる
+- 列が足りない既存の保存先は開いたときに列を追加する（追加前の発言の値は NULL）
+"""
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import pandas as pd
+
+SPEECH_COLUMNS = ["speech_id", "date", "session", "nameOfHouse", "nameOfMeeting", "speaker", "speakerGroup",
+                  "speech", "speechURL", "issueID", "meetingURL", "billID"]
+
+
+class SpeechStore:
+    """発言と取得状況（チェックポイント）の保存先"""
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(self.path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        columns = ", ".join(f"{col} TEXT" for col in SPEECH_COLUMNS[1:])
+        self.conn.executescript(f"""
+            CREATE TABLE IF NOT EXISTS speeches (speech_id TEXT PRIMARY KEY, {columns});
+            CREATE TABLE IF NOT EXISTS queries (
+                query_key TEXT PRIMARY KEY,
+                house TEXT,
+                committee TEXT,
+                terms TEXT,
+                params TEXT NOT NULL,
+                total INTEGER
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                query_key TEXT NOT NULL,
+                start_record INTEGER NOT NULL,
+                n_records INTEGER NOT NULL,
+                completed_at REAL NOT NULL,
+                PRIMARY KEY (query_key, start_record)
+            );
+        """)
+        # 以前の版で作った保存先に無い列を追加
+        existing = {row[1] for row in self.conn.execute("PRAGMA table_info(speeches)")}
+        for col in SPEECH_COLUMNS:
+            if col not in existing:
+                self.conn.execute(f"ALTER TABLE speeches ADD COLUMN {col} TEXT")
+        self.conn.commit()
+
+    def register_query(self, query_key: str, params: dict) -> None:
+        """検索条件を登録（既にあれば何もしない）"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO queries (query_key, house, committee, terms, params) VALUES (?, ?, ?, ?, ?)",
+                (query_key, params.get("nameOfHouse"), params.get("nameOfMeeting"), params.get("any"),
+                 json.dumps(params, ensure_ascii=False, sort_keys=True)),
+            )
+            self.conn.commit()
+
+    def query_total(self, query_key: str) -> int | None:
+        with self.lock:
+            row = self.conn.execute("SELECT total FROM queries WHERE query_key = ?", (query_key,)).fetchone()
+        return row[0] if row else None
+
+    def completed_pages(self, query_key: str) -> dict[int, int]:
+        """取得済みの startRecord → そのページの件数"""
+        with self.lock:
+            rows = self.conn.execute("SELECT start_record, n_records FROM pages WHERE query_key = ?", (query_key,))
+            return dict(rows.fetchall())
+
+    def save_page(self, query_key: str, start_record: int, rows: list[dict], total: int | None = None) -> int:
+        """1 ページ分の発言と取得済みの記録を保存。新規に追加した発言数を返す"""
+        values = [tuple(row.get(col) for col in SPEECH_COLUMNS) for row in rows]
+        placeholders = ", ".join("?" for _ in SPEECH_COLUMNS)
+        with self.lock, self.conn:
+            before = self.conn.total_changes
+            self.conn.executemany(
+                f"INSERT OR IGNORE INTO speeches ({', '.join(SPEECH_COLUMNS)}) VALUES ({placeholders})", values)
+            added = self.conn.total_changes - before
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (query_key, start_record, n_records, completed_at) VALUES (?, ?, ?, ?)",
+                (query_key, start_record, len(rows), time.time()),
+            )
+            if total is not None:
+                self.conn.execute("UPDATE queries SET total = ? WHERE query_key = ?", (total, query_key))
+        return added
+
+    def count(self) -> int:
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM speeches").fetchone()[0]
+
+    def iter_frames(self, chunk_size: int = 10_000):
+        """保存済みの発言を chunk_size 行ずつ DataFrame で返す（日付順）"""
+        # 読み出し専用の接続で少しずつ読む（全件をメモリに載せない）
+        conn = sqlite3.connect(self.path)
+        try:
+            cursor = conn.execute(f"SELECT {', '.join(SPEECH_COLUMNS)} FROM speeches ORDER BY date, speech_id")
+            while rows := cursor.fetchmany(chunk_size):
+                yield pd.DataFrame(rows, columns=SPEECH_COLUMNS)
+        finally:
+            conn.close()
+
+    def head(self, n: int = 30) -> pd.DataFrame:
+        with self.lock:
+            rows = self.conn.execute(f"SELECT {', '.join(SPEECH_COLUMNS)} FROM speeches ORDER BY date, speech_id LIMIT ?", (n,)).fetchall()
+        return pd.DataFrame(rows, columns=SPEECH_COLUMNS)
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+ダッシュボード用データの差分同期
+- 保存済みの最新の発言日から今日までの発言だけを取得する（最新日は取りこぼし防止のため含める）
+- 保存済みの speech_id は取得中にページから除き、残りを data/partitions/ に日付範囲のファイルとして追加する
+- ダッシュボードは manifest.json の更新を検知して読み込み直す
+- --meetings は会議単位で取得する（meeting_list で会議を数え、meeting で 1 回 10 会議分の全発言を取る）。
+  まとめて取り込むときはこちらの方がリクエストが少ない。--session で国会の回次を指定できる
+
+    python sync_kokkai.py                # data/ を今日まで同期
+    python sync_kokkai.py --until 2025-08-31 --rate 0.5
+    python sync_kokkai.py --meetings --session 217    # 第 217 回国会の全発言
+"""
+import argparse
+from datetime import date
+from pathlib import Path
+
+from dataset import append_partition, catalog_bounds, month_catalog, read_months, select_months
+from kokkai_api import API_BASE, FetchStats, fetch, harvest_meetings
+from response_cache import ResponseCache
+
+DATA_DIR = Path(__file__).parent / "data"
+CACHE_PATH = Path(__file__).parent / ".cache" / "kokkai_responses.sqlite"
+
+
+def sync(data_dir: Path, until: date, houses=None, workers=1, rate=None, cache: ResponseCache | None = None,
+         since: date | None = None, base_url=API_BASE, stats: FetchStats | None = None, meetings: bool = False,
+         session: int | None = None):
+    """差分を取得して追加。追加したファイルの情報（新しい発言がなければ None）を返す
+
+    meetings: 会議単位で取得する（harvest_meetings）。session: 国会の回次（指定すると since は省略できる）
+    """
+    if session is not None and not meetings:
+        raise SystemExit("--session は --meetings と一緒に指定してください。")
+    try:
+        catalog = month_catalog(data_dir)
+    except FileNotFoundError:
+        catalog = None
+    if since is None and session is None:
+        since = catalog_bounds(catalog)[1] if catalog else None
+        if since is None:
+            raise SystemExit("保存済みの発言がありません。--since で開始日を指定してください。")
+
+    # 保存済みの発言は届いたページからすぐ除く（取得する期間に掛かる月の speech_id だけを読む）
+    known_ids = set()
+    if catalog:
+        period = (since, until) if since is not None else None
+        stored = read_months(data_dir, catalog, select_months(catalog, period),
+                            columns=["speech_id"], date_range=period)
+        if "speech_id" in stored.columns:
+            known_ids = set(stored["speech_id"].dropna())
+
+    if meetings:
+        df = harvest_meetings(since, until, houses, session=session, workers=workers, rate=rate, base_url=base_url,
+                              cache=cache, stats=stats, known_ids=known_ids)[0]
+    else:
+        df = fetch(since, until, houses or ["両院"], [], "", "なし（全文対象）", True, endpoint="speech",
+                   workers=workers, rate=rate, base_url=base_url, cache=cache, stats=stats, known_ids=known_ids)[0]
+    if df.empty:
+        return None
+    return append_partition(data_dir, df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", type=Path, default=DATA_DIR)
+    parser.add_argument("--since", type=date.fromisoformat, default=None, help="開始日（既定: 保存済みの最新日）")
+    parser.add_argument("--until", type=date.fromisoformat, default=date.today(), help="終了日（既定: 今日）")
+    parser.add_argument("--house", action="append", choices=["衆議院", "参議院", "両院"], help="院（複数指定可）")
+    parser.add_argument("--workers", type=int, default=1, help="同時リクエスト数")
+    parser.add_argument("--rate", type=float, default=None, help="1 秒あたりの最大リクエスト数")
+    parser.add_argument("--meetings", action="store_true", help="会議単位で取得する（まとめて取り込むとき向け）")
+    parser.add_argument("--session", type=int, default=None, help="国会の回次（--meetings と一緒に指定）")
+    parser.add_argument("--cache", action="store_true", help="応答キャッシュを使う（失敗後の再実行で取得済みのページを再利用）")
+    args = parser.parse_args()
+
+    cache = ResponseCache(CACHE_PATH, ttl=24 * 3600) if args.cache else None
+    stats = FetchStats()
+    entry = sync(args.data_dir, args.until, houses=args.house, workers=args.workers, rate=args.rate,
+                 cache=cache, since=args.since, stats=stats, meetings=args.meetings, session=args.session)
+    print("リクエスト:", stats.summary())
+    if entry is None:
+        print("新しい発言はありません")
+    else:
+        print(f"{entry['rows']:,}件を追加しました: {entry['file']}（{entry['min_date']}〜{entry['max_date']}）")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,7 @@
+"""
+テストとベンチマークで共有する部品（合成データ・ローカルの API サーバー・もとの app.py の実装）
+- corpus: 合成した発言データ
+- fake_api: 国会会議録検索システム API の代わりに動かすローカルのサーバー
+- legacy: 比較に使うもとの app.py の実装
+ベンチマークのスクリプトはここから読み込む（スクリプトを変えてもテストは壊れない）
+"""
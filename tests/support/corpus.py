@@ -0,0 +1,107 @@
+"""
+テスト・ベンチマーク用の合成発言データ
+- load_data 後と同じ列（party / house / committee / speaker / speech / char_count）を持つ DataFrame を作る
+"""
+import numpy as np
+import pandas as pd
+
+KANJI = list("税制消費外国経済予算防衛教育医療年金少子化対策物価賃金環境外交安全保障地方創生災害復興")
+KATAKANA = ["エネルギー", "デジタル", "インフレ", "ガソリン", "マイナンバー", "サプライチェーン"]
+FILLERS = ["について", "であります。", "、", "と考えております。"]
+PARTIES = ["自由民主党", "立憲民主党", "日本維新の会", "公明党", "国民民主党", "日本共産党", "政党不明"]
+HOUSES = ["衆議院", "参議院"]
+COMMITTEES = ["予算委員会", "財務金融委員会", "外務委員会", "厚生労働委員会", "本会議"]
+
+
+def make_speeches(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """合成発言データを作成"""
+    rng = np.random.default_rng(seed)
+    speeches = []
+    for _ in range(n_rows):
+        parts = []
+        for _ in range(rng.integers(5, 30)):
+            r = rng.random()
+            if r < 0.6:
+                parts.append("".join(rng.choice(KANJI, size=rng.integers(1, 8))))
+            elif r < 0.8:
+                parts.append(str(rng.choice(KATAKANA)))
+            else:
+                parts.append(str(rng.choice(FILLERS)))
+        speeches.append("".join(parts))
+
+    df = pd.DataFrame({
+        "date": pd.Timestamp("2025-01-23") + pd.to_timedelta(rng.integers(0, 195, n_rows), unit="D"),
+        "house": rng.choice(HOUSES, n_rows),
+        "committee": rng.choice(COMMITTEES, n_rows),
+        "speaker": [f"議員{i}" for i in rng.integers(0, 300, n_rows)],
+        "party": rng.choice(PARTIES, n_rows),
+        "speech": speeches,
+    })
+    df["char_count"] = df["speech"].str.len()
+    return df
+
+
+# make_records 用の語彙・分布（実データに近い偏りを持たせる）
+RECORD_PARTIES = ["自由民主党", "立憲民主党", "日本維新の会", "公明党", "国民民主党", "日本共産党",
+                  "れいわ新選組", "社会民主党", "参政党", "無所属"]
+RECORD_PARTY_WEIGHTS = [0.42, 0.2, 0.1, 0.08, 0.06, 0.05, 0.03, 0.02, 0.02, 0.02]
+RECORD_COMMITTEES = ["本会議", "予算委員会", "財務金融委員会", "外務委員会", "厚生労働委員会", "経済産業委員会",
+                     "国土交通委員会", "総務委員会", "法務委員会", "文部科学委員会", "農林水産委員会", "環境委員会",
+                     "安全保障委員会", "内閣委員会", "決算委員会", "議院運営委員会", "災害対策特別委員会",
+                     "消費者問題に関する特別委員会", "憲法審査会", "行政監視委員会"]
+STOP_TERMS = ["委員会", "政府", "大臣", "答弁", "我が国", "問題", "検討", "質問"]
+PARTICLES = ["の", "を", "に", "は", "が", "と", "、", "。", "について", "であります。", "と考えております。"]
+
+
+def _zipf_weights(n: int, a: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, n + 1) ** a
+    return weights / weights.sum()
+
+
+def make_records(n_rows: int, seed: int = 0, start: str = "2016-01-04", end: str = "2025-08-05") -> pd.DataFrame:
+    """取得 CSV（speeches_sample.csv）と同じ列の合成データ
+
+    発言者・委員会・語は Zipf 分布、政党は議席数程度の偏りを持たせる。日付は平日で、
+    通常国会の会期（1〜6 月）に多く出るようにする。国会の回次は 1〜6 月を通常国会、7〜12 月を
+    臨時国会として年に 2 回ずつ進める。一部の政党・発言は欠損にする。
+    """
+    rng = np.random.default_rng(seed)
+
+    # 日付（平日のみ、1〜6 月は 3 倍出やすい）
+    days = pd.bdate_range(start, end)
+    day_weights = np.where(days.month <= 6, 3.0, 1.0)
+    dates = days[rng.choice(len(days), n_rows, p=day_weights / day_weights.sum())]
+
+    # 発言者ごとに政党・院を固定し、発言数は Zipf 分布
+    n_speakers = 800
+    speaker_party = rng.choice(len(RECORD_PARTIES), n_speakers, p=RECORD_PARTY_WEIGHTS)
+    speaker_house = rng.choice(HOUSES, n_speakers, p=[0.6, 0.4])
+    speakers = rng.choice(n_speakers, n_rows, p=_zipf_weights(n_speakers))
+    party = np.asarray(RECORD_PARTIES, dtype=object)[speaker_party[speakers]]
+    party[rng.random(n_rows) < 0.03] = None
+
+    # 語彙: 漢字の複合語・カタカナ語・ストップワード。語のあとには助詞・句読点を挟む
+    kanji_terms = sorted({"".join(rng.choice(KANJI, size=rng.integers(2, 7))) for _ in range(5000)})
+    vocab = np.asarray(kanji_terms + KATAKANA + STOP_TERMS, dtype=object)
+    vocab_weights = _zipf_weights(len(vocab), a=1.05)[rng.permutation(len(vocab))]
+
+    # 発言の長さ（語数）は対数正規分布
+    lengths = np.clip(rng.lognormal(3.2, 0.7, n_rows).astype(np.int64), 3, 400)
+    n_tokens = int(lengths.sum())
+    tokens = vocab[rng.choice(len(vocab), n_tokens, p=vocab_weights)] + np.asarray(PARTICLES, dtype=object)[
+        rng.choice(len(PARTICLES), n_tokens)]
+    bounds = np.concatenate([[0], np.cumsum(lengths)])
+    speech = np.asarray(["".join(tokens[bounds[i]:bounds[i + 1]]) for i in range(n_rows)], dtype=object)
+    speech[rng.random(n_rows) < 0.005] = None
+
+    return pd.DataFrame({
+        "speech_id": [f"syn{i:08d}" for i in range(n_rows)],
+        "date": dates.strftime("%Y-%m-%d"),
+        "session": 190 + 2 * (dates.year - 2016) + (dates.month > 6),
+        "nameOfHouse": speaker_house[speakers],
+        "nameOfMeeting": np.asarray(RECORD_COMMITTEES)[rng.choice(len(RECORD_COMMITTEES), n_rows,
+                                                                   p=_zipf_weights(len(RECORD_COMMITTEES), a=0.9))],
+        "speaker": [f"議員{i:03d}" for i in speakers],
+        "speakerGroup": party,
+        "speech": speech,
+    })
@@ -0,0 +1,186 @@
+"""
+国会会議録検索システム API の代わりに動かすローカルのサーバー（テスト・ベンチマーク・動作確認用）
+- speech / meeting_list / meeting の 3 つのエンドポイントを、合成した発言から本物と同じ形の JSON で返す
+- from / until / nameOfHouse / nameOfMeeting / any（空白区切りは AND。全角・半角の違いは NFKC でそろえる）/
+  sessionFrom / sessionTo / issueID / startRecord / maximumRecords に対応
+- 応答の遅延・一定割合のエラー（503、429 は Retry-After 付き）を入れられる。接続数・リクエスト数を数える
+
+    server = FakeApi(n_speeches=5000, error_rate=0.1).start()
+    fetch(..., base_url=server.base_url)
+    server.stop()
+"""
+import json
+import random
+import threading
+import time
+import unicodedata
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from tests.support.corpus import COMMITTEES, HOUSES, PARTIES, make_speeches
+
+# 1 会議あたりの発言数
+SPEECHES_PER_MEETING = 40
+
+
+def make_records(n_speeches: int, seed: int = 0) -> list[dict]:
+    """API の speechRecord と同じ項目の発言（日付順。会議ごとに issueID をまとめる）"""
+    df = make_speeches(n_speeches, seed=seed).sort_values("date", kind="stable").reset_index(drop=True)
+    records = []
+    for i, row in enumerate(df.itertuples(index=False)):
+        meeting = i // SPEECHES_PER_MEETING
+        records.append({
+            "speechID": f"fake_{i:07d}",
+            "issueID": f"fake_issue_{meeting:05d}",
+            "session": 200 + meeting % 20,
+            "nameOfHouse": HOUSES[meeting % len(HOUSES)],
+            "nameOfMeeting": COMMITTEES[meeting % len(COMMITTEES)],
+            "issue": f"第{meeting % 30 + 1}号",
+            "date": row.date.strftime("%Y-%m-%d"),
+            "speechOrder": i % SPEECHES_PER_MEETING,
+            "speaker": row.speaker,
+            "speakerGroup": row.party if row.party in PARTIES else None,
+            "speech": row.speech,
+            "speechURL": f"https://example.invalid/speech/{i}",
+            "meetingURL": f"https://example.invalid/meeting/{meeting}",
+            "billID": None,
+        })
+    # 同じ会議の発言は同じ日付・院・会議名にそろえる
+    for i, record in enumerate(records):
+        first = records[i - record["speechOrder"]]
+        record["date"] = first["date"]
+    return records
+
+
+MEETING_FIELDS = ["issueID", "session", "nameOfHouse", "nameOfMeeting", "issue", "date", "meetingURL"]
+# meeting_list の speechRecord に含まれる項目（本文なし）
+SHORT_SPEECH_FIELDS = ["speechID", "speechOrder", "speaker", "speechURL"]
+# meeting の speechRecord に含まれる項目
+LONG_SPEECH_FIELDS = ["speechID", "speechOrder", "speaker", "speakerGroup", "speech", "speechURL"]
+
+
+class FakeApi:
+    """ローカルの API サーバー（別スレッドで動かす）
+
+    latency: 応答までの秒数。error_rate: エラーを返す割合（retry_after があれば 429 + Retry-After、なければ 503）
+    error_kind: エラーの種類。"status" はエラーのステータス、"truncated" は本文を途中で切って接続を閉じる、
+    "invalid" は 200 で JSON として読めない本文を返す
+    """
+
+    def __init__(self, n_speeches: int = 2000, records: list[dict] | None = None, latency: float = 0.0,
+                 error_rate: float = 0.0, retry_after: float | None = None, error_kind: str = "status",
+                 seed: int = 0):
+        self.records = records if records is not None else make_records(n_speeches, seed=seed)
+        self.latency = latency
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.error_kind = error_kind
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.errors = 0
+        self.server = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server.server_address[1]}/api"
+
+    def start(self) -> "FakeApi":
+        api = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # 見出しと本文を別々に送るので、keep-alive で遅延 ACK を待たないようにする
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                with api.lock:
+                    api.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                status, body = api.respond(url.path.rsplit("/", 1)[-1], {k: v[0] for k, v in parse_qs(url.query).items()})
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8") if body is not None else b""
+                if status == 200 and body is None:
+                    # 壊れた応答（途中で切れた本文・読めない JSON）
+                    data = b'{"numberOfRecords": '
+                    self.send_response(200)
+                    self.send_header("Content-Type", "application/json; charset=utf-8")
+                    truncated = api.error_kind == "truncated"
+                    self.send_header("Content-Length", str(len(data) * (2 if truncated else 1)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                    self.close_connection = truncated
+                    return
+                self.send_response(status)
+                if status == 429 and api.retry_after is not None:
+                    self.send_header("Retry-After", str(api.retry_after))
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def search(self, query: dict) -> list[dict]:
+        records = [r for r in self.records if query.get("from", "0000") <= r["date"] <= query.get("until", "9999")]
+        if "nameOfHouse" in query:
+            records = [r for r in records if r["nameOfHouse"] == query["nameOfHouse"]]
+        if "nameOfMeeting" in query:
+            records = [r for r in records if query["nameOfMeeting"] in r["nameOfMeeting"]]
+        if "sessionFrom" in query:
+            records = [r for r in records if r["session"] >= int(query["sessionFrom"])]
+        if "sessionTo" in query:
+            records = [r for r in records if r["session"] <= int(query["sessionTo"])]
+        if "issueID" in query:
+            records = [r for r in records if r["issueID"] == query["issueID"]]
+        if "any" in query:
+            terms = unicodedata.normalize("NFKC", query["any"]).split()
+            records = [r for r in records if all(t in unicodedata.normalize("NFKC", r["speech"]) for t in terms)]
+        return records
+
+    def respond(self, endpoint: str, query: dict) -> tuple[int, dict | None]:
+        """(ステータス, JSON) を返す"""
+        with self.lock:
+            self.requests += 1
+            failed = self.random.random() < self.error_rate
+            self.errors += failed
+        if self.latency:
+            time.sleep(self.latency)
+        if failed:
+            if self.error_kind != "status":
+                return 200, None
+            return (429 if self.retry_after is not None else 503), None
+
+        records = self.search(query)
+        start = int(query.get("startRecord", 1))
+        maximum = int(query.get("maximumRecords", 30))
+        if endpoint == "speech":
+            key, items = "speechRecord", records
+        else:
+            meetings: dict[str, list[dict]] = {}
+            for record in records:
+                meetings.setdefault(record["issueID"], []).append(record)
+            fields = LONG_SPEECH_FIELDS if endpoint == "meeting" else SHORT_SPEECH_FIELDS
+            key, items = "meetingRecord", [
+                {**{f: speeches[0][f] for f in MEETING_FIELDS},
+                 "speechRecord": [{f: s[f] for f in fields} for s in speeches]}
+                for speeches in meetings.values()
+            ]
+        page = items[start - 1:start - 1 + maximum]
+        body = {"numberOfRecords": len(items), "numberOfReturn": len(page), "startRecord": start, key: page}
+        if start - 1 + maximum < len(items):
+            body["nextRecordPosition"] = start + maximum
+        return 200, body
@@ -0,0 +1,64 @@
+"""
+もとの app.py の実装（新しい実装と同じ結果になるかを比べるためだけに使う。変えないこと）
+"""
+import collections
+import re
+
+import pandas as pd
+
+
+def legacy_extract_keywords(text: str, min_length: int = 2, max_length: int = 6) -> list[str]:
+    """もとの extract_keywords（呼び出しごとにパターン文字列・ストップワードを作り、漢字とカタカナで 2 回 findall）"""
+    if not isinstance(text, str) or not text.strip():
+        return []
+
+    kanji_pattern = rf'[\u4E00-\u9FFF]{{{min_length},{max_length}}}'
+    kata_pattern = rf'[ァ-ヴー]{{{min_length + 1},}}'
+
+    kanji_terms = re.findall(kanji_pattern, text)
+    kata_terms = re.findall(kata_pattern, text)
+
+    stop_words = {
+        '委員会', '本会議', '政府', '総理', '大臣', '答弁', '質疑', '報告', '資料',
+        '法律', '制度', '今回', '我が国', '国会', '議員', '先生', '委員', '議論',
+        '問題', '課題', '対応', '検討', '実施', '推進', '確認', '説明', '質問'
+    }
+
+    all_terms = kanji_terms + kata_terms
+    return [term for term in all_terms if term not in stop_words]
+
+
+def legacy_heatmap_data(df: pd.DataFrame, top_terms: pd.DataFrame, top_n: int = 15) -> pd.DataFrame:
+    """もとの create_heatmap_data（政党ごとの再抽出 + 二重ループの 0 埋め）"""
+    if len(top_terms) == 0:
+        return pd.DataFrame()
+
+    focus_terms = set(top_terms['term'].head(top_n))
+
+    heatmap_rows = []
+    for party, group in df.groupby('party'):
+        party_terms = []
+        for speech in group['speech'].fillna(''):
+            party_terms.extend([term for term in legacy_extract_keywords(speech) if term in focus_terms])
+
+        term_counts = collections.Counter(party_terms)
+        for term, count in term_counts.items():
+            heatmap_rows.append({'party': party, 'term': term, 'count': count})
+
+    if not heatmap_rows:
+        return pd.DataFrame()
+
+    heat_df = pd.DataFrame(heatmap_rows)
+
+    term_order = (heat_df.groupby('term')['count'].sum()
+                  .sort_values(ascending=False).index.tolist())
+    party_order = (heat_df.groupby('party')['count'].sum()
+                   .sort_values(ascending=False).index.tolist())
+
+    complete_data = []
+    for party in party_order:
+        for term in term_order:
+            count = heat_df[(heat_df['party'] == party) & (heat_df['term'] == term)]['count'].sum()
+            complete_data.append({'party': party, 'term': term, 'count': count})
+
+    return pd.DataFrame(complete_data)
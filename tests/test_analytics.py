@@ -0,0 +1,297 @@
+"""
+analytics の集計が、もとの app.py（DataFrame を順に絞り込んで pandas で集計する）と同じ結果になるかのテスト
+（合成データ tests/support/corpus.make_records を月別ファイルに分けて読む）
+
+    python -m pytest tests
+"""
+import collections
+import os
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import analytics
+from dataset import BASE_CSV, month_catalog, read_months, select_months
+from tests.support.corpus import make_records
+from tests.support.legacy import legacy_extract_keywords, legacy_heatmap_data
+
+N_ROWS = 3000
+
+# (期間, 院, 委員会, キーワード)
+CONDITIONS = [
+    (None, [], [], ""),
+    (("2019-04-01", "2021-09-30"), ["衆議院"], ["本会議", "予算委員会", "外務委員会"], ""),
+    (("2024-01-01", "2025-08-05"), [], [], "エネルギー デジタル"),
+    (None, ["参議院"], [], "税制"),
+]
+
+
+def baseline_load(csv_path: Path) -> pd.DataFrame:
+    """もとの app.py の load_data"""
+    speeches = pd.read_csv(csv_path)
+    speeches["date"] = pd.to_datetime(speeches["date"], errors="coerce")
+    speeches["char_count"] = speeches["speech"].fillna("").astype(str).apply(len)
+    speeches["party"] = speeches["speakerGroup"].fillna("政党不明")
+    speeches["house"] = speeches["nameOfHouse"].fillna("院不明")
+    speeches["committee"] = speeches["nameOfMeeting"].fillna("委員会不明")
+    speeches["speaker"] = speeches["speaker"].fillna("発言者不明")
+    return speeches
+
+
+def baseline_filter(speeches: pd.DataFrame, date_range, houses, committees, keyword_input) -> pd.DataFrame:
+    """もとの app.py のデータフィルタリング"""
+    filtered_df = speeches.copy()
+    if date_range:
+        filtered_df = filtered_df[(filtered_df["date"] >= pd.to_datetime(date_range[0]))
+                                  & (filtered_df["date"] <= pd.to_datetime(date_range[1]))]
+    if houses:
+        filtered_df = filtered_df[filtered_df["house"].isin(houses)]
+    if committees:
+        filtered_df = filtered_df[filtered_df["committee"].isin(committees)]
+    if keyword_input.strip():
+        keywords = [k.strip() for k in keyword_input.split() if k.strip()]
+        pattern = "|".join(map(re.escape, keywords))
+        filtered_df = filtered_df[filtered_df["speech"].fillna("").str.contains(pattern, regex=True, case=False)]
+    return filtered_df
+
+
+@pytest.fixture(scope="module")
+def data(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("data")
+    make_records(N_ROWS, seed=1).to_csv(data_dir / BASE_CSV, index=False)
+    catalog = month_catalog(data_dir)
+    months = select_months(catalog)
+    frame = read_months(data_dir, catalog, months, columns=analytics.DASHBOARD_COLUMNS)
+    engine = analytics.load_query_engine(data_dir, frame)
+    return {
+        "baseline": baseline_load(data_dir / BASE_CSV),
+        "frame": frame,
+        "engine": engine,
+        "cube": analytics.load_rollup_cube(data_dir, catalog),
+        "keyword_index": analytics.load_keyword_index(data_dir, catalog, months, engine),
+        "streaming_index": analytics.load_streaming_keyword_index(data_dir, catalog, months, engine),
+        "ngram_index": analytics.load_ngram_index(data_dir, catalog, months, engine),
+    }
+
+
+def select(data, date_range, houses, committees, keyword_input):
+    """analytics での絞り込み → (filtered_df, stats_df, もとの app.py の filtered_df)"""
+    keywords = analytics.parse_keywords(keyword_input)
+    rows = analytics.filter_rows(data["engine"], date_range=date_range, houses=houses, committees=committees,
+                                 keywords=keywords, ngram_index=data["ngram_index"])
+    filtered_df = data["engine"].frame(rows)
+    stats_df = analytics.stats_frame(filtered_df, data["cube"], date_range=date_range, houses=houses,
+                                     committees=committees, keywords=keywords)
+    return filtered_df, stats_df, baseline_filter(data["baseline"], date_range, houses, committees, keyword_input)
+
+
+@pytest.fixture(scope="module", params=CONDITIONS, ids=["all", "house_committee", "keyword", "house_keyword"])
+def selected(request, data):
+    return select(data, *request.param)
+
+
+def test_filter_rows_match(selected):
+    filtered_df, _, expected = selected
+    # 月別ファイルの row_id は CSV の行番号
+    assert len(expected) > 0
+    assert sorted(filtered_df["row_id"]) == expected.index.tolist()
+
+
+def test_metrics_match(selected):
+    _, stats_df, expected = selected
+    assert stats_df["row_count"].sum() == len(expected)
+    assert stats_df["char_count"].sum() == expected["char_count"].sum()
+    assert stats_df["speaker"].nunique() == expected["speaker"].nunique()
+    assert stats_df["party"].nunique() == expected["party"].nunique()
+
+
+def test_speaker_ranking_matches(selected):
+    _, stats_df, expected = selected
+    ranking = analytics.speaker_ranking(stats_df)
+    totals = expected.groupby(["speaker", "party"])["char_count"].sum()
+    baseline = totals.sort_values(ascending=False).head(20)
+    # 同数の並びは決まっていないので、合計の並びと各組の合計を比べる
+    assert ranking["char_count"].tolist() == baseline.tolist()
+    for row in ranking.itertuples():
+        assert totals[(row.speaker, row.party)] == row.char_count
+
+
+def test_party_ranking_matches(selected):
+    _, stats_df, expected = selected
+    ranking = analytics.party_ranking(stats_df)
+    baseline = (
+        expected.groupby("party", as_index=False)
+        .agg({"speech": "count", "char_count": "sum"})
+        .rename(columns={"speech": "speech_count"})
+        .sort_values("speech_count", ascending=False)
+    )
+    assert ranking["speech_count"].tolist() == baseline["speech_count"].tolist()
+    assert (ranking.set_index(ranking["party"].astype(str))[["speech_count", "char_count"]].sort_index().to_dict()
+            == baseline.set_index("party")[["speech_count", "char_count"]].sort_index().to_dict())
+
+
+def test_daily_timeline_matches(selected):
+    _, stats_df, expected = selected
+    daily = analytics.timeline(stats_df, "day")
+    baseline = (
+        expected.groupby("date", as_index=False)
+        .agg({"speech": "count", "char_count": "sum"})
+        .rename(columns={"speech": "speech_count"})
+    )
+    pd.testing.assert_frame_equal(daily[["date", "speech_count", "char_count"]].reset_index(drop=True),
+                                  baseline[["date", "speech_count", "char_count"]], check_dtype=False)
+    assert (daily["date"] == daily["end"]).all()
+
+
+def test_latest_speeches_match(data, selected):
+    filtered_df, _, expected = selected
+    latest = analytics.latest_speeches(filtered_df, data["engine"])
+    baseline = expected.sort_values("date", ascending=False).head(20)
+    # 同じ日付の中の並びは決まっていないので、日付の並びと各行の内容を比べる
+    assert latest["date"].tolist() == baseline["date"].dt.strftime("%Y-%m-%d").tolist()
+    rows = data["baseline"].loc[latest.index]
+    for col in ["house", "committee", "speaker", "party"]:
+        assert latest[col].astype(str).tolist() == rows[col].tolist()
+    speech = rows["speech"].fillna("").astype(str).apply(lambda x: (x[:200] + "...") if len(x) > 200 else x)
+    assert latest["speech"].tolist() == speech.tolist()
+
+
+def test_keyword_ranking_matches(data, selected):
+    filtered_df, _, expected = selected
+    counter = collections.Counter(term for speech in expected["speech"].fillna("")
+                                  for term in legacy_extract_keywords(speech))
+    baseline = counter.most_common(30)
+    # 同数の順（初出順）まで同じ
+    for index in (data["keyword_index"], data["streaming_index"]):
+        top = analytics.keyword_ranking(index, filtered_df)
+        assert list(zip(top["term"], top["count"])) == baseline
+
+
+@pytest.mark.parametrize("index", ["keyword_index", "streaming_index"])
+def test_heatmap_matches_legacy(data, selected, index):
+    filtered_df, _, expected = selected
+    top_keywords = analytics.keyword_ranking(data[index], filtered_df)
+    heatmap_data = analytics.heatmap(filtered_df, top_keywords, data[index], top_n=15)
+    # もとの app.py はもとの行（絞り込んだ DataFrame）から政党ごとに語を取り出し直す
+    baseline = legacy_heatmap_data(expected, top_keywords, top_n=15)
+    assert len(baseline) > 0
+    # 行・並び・回数まで同じ
+    actual = heatmap_data.assign(party=heatmap_data["party"].astype(str)).reset_index(drop=True)
+    pd.testing.assert_frame_equal(actual, baseline, check_dtype=False)
+
+
+def test_streaming_heatmap_matches(data, selected):
+    filtered_df, _, _ = selected
+    top_keywords = analytics.keyword_ranking(data["keyword_index"], filtered_df)
+    terms = top_keywords["term"].head(15).tolist()
+    positions = filtered_df.index.to_numpy()
+    pd.testing.assert_frame_equal(
+        data["streaming_index"].group_term_matrix(positions, filtered_df["party"], terms),
+        data["keyword_index"].group_term_matrix(positions, filtered_df["party"], terms),
+    )
+
+
+def test_streaming_top_terms_approximate(data):
+    # 近似（Space-Saving）に切り替えても、数え漏れは error の範囲に収まる
+    engine = data["engine"]
+    streaming = analytics.StreamingKeywordIndex(
+        data["streaming_index"].month_dir, data["streaming_index"].names, data["streaming_index"].positions,
+        len(engine.speech), capacity=200, exact_rows=0)
+    positions = np.arange(len(engine.speech))
+    index = data["keyword_index"]
+    exact = index.top_terms(positions, n=len(index.vocab)).set_index("term")["count"]
+    top = streaming.top_terms(positions, n=30)
+    assert (top["error"] >= 0).all()
+    for row in top.itertuples():
+        assert row.count - row.error <= exact[row.term] <= row.count
+
+
+def bucket_totals(stats_df: pd.DataFrame, granularity: str) -> pd.DataFrame:
+    """stats_df を集計単位ごとに pandas でそのまま合計した 最初の日・最後の日・発言数・文字数"""
+    dated = stats_df[stats_df["date"].notna()]
+    if granularity == "session":
+        dated = dated[dated["session"].notna()]
+        keys = dated["session"].astype("int64")
+    else:
+        keys = dated["date"].dt.to_period({"week": "W-SUN", "month": "M"}[granularity])
+    return (dated.groupby(keys.rename("bucket"))
+            .agg(date=("date", "min"), end=("date", "max"), speech_count=("speech_count", "sum"),
+                 char_count=("char_count", "sum"))
+            .sort_values("date").reset_index())
+
+
+@pytest.mark.parametrize("granularity", ["week", "month", "session"])
+def test_timeline_buckets_match_stats(selected, granularity):
+    _, stats_df, _ = selected
+    buckets = analytics.timeline(stats_df, granularity)
+    expected = bucket_totals(stats_df, granularity)
+    assert len(buckets) > 0
+    pd.testing.assert_frame_equal(buckets[["date", "end", "speech_count", "char_count"]],
+                                  expected[["date", "end", "speech_count", "char_count"]], check_dtype=False)
+    dated = stats_df[stats_df["date"].notna()]
+    if granularity == "session":
+        dated = dated[dated["session"].notna()]
+        assert buckets["session"].tolist() == expected["bucket"].tolist()
+    else:
+        # 区間は暦の週（月曜〜日曜）・月に収まる
+        periods = expected["bucket"]
+        assert (buckets["date"] >= periods.dt.start_time).all()
+        assert (buckets["end"] <= periods.dt.end_time).all()
+    assert buckets["speech_count"].sum() == dated["speech_count"].sum()
+    assert buckets["char_count"].sum() == dated["char_count"].sum()
+    assert (buckets["date"] <= buckets["end"]).all()
+    assert (buckets["end"].iloc[:-1].to_numpy() < buckets["date"].iloc[1:].to_numpy()).all()
+
+
+@pytest.mark.parametrize("granularity", ["day", "week", "month", "session"])
+@pytest.mark.parametrize("max_points", [1, 3, 7, 50])
+def test_limit_points_keeps_totals(selected, granularity, max_points):
+    _, stats_df, _ = selected
+    buckets = analytics.timeline(stats_df, granularity)
+    limited = analytics.timeline(stats_df, granularity, max_points=max_points)
+    assert len(limited) <= max_points
+    assert len(limited) == min(len(buckets), max_points)
+    assert limited["speech_count"].sum() == buckets["speech_count"].sum()
+    assert limited["char_count"].sum() == buckets["char_count"].sum()
+    # まとめた区間は元の区間の最初の日から最後の日までを重ならずに覆う
+    assert limited["date"].iloc[0] == buckets["date"].iloc[0]
+    assert limited["end"].iloc[-1] == buckets["end"].iloc[-1]
+    assert (limited["end"].iloc[:-1].to_numpy() < limited["date"].iloc[1:].to_numpy()).all()
+
+
+@pytest.mark.parametrize("max_points", [10, 60, 400, 5000])
+def test_timeline_granularity_fits_max_points(selected, max_points):
+    _, stats_df, _ = selected
+    granularity = analytics.timeline_granularity(stats_df, max_points)
+    dates = stats_df["date"].dropna()
+    days = (dates.max() - dates.min()).days + 1
+    if granularity != "session":
+        assert -(-days // analytics.TIMELINE_BUCKET_DAYS[granularity]) <= max_points
+    # 選んだ単位より細かい単位では点が多すぎる
+    finer = analytics.TIMELINE_GRANULARITIES[:analytics.TIMELINE_GRANULARITIES.index(granularity)]
+    for unit in finer:
+        assert -(-days // analytics.TIMELINE_BUCKET_DAYS[unit]) > max_points
+
+
+@pytest.mark.parametrize("max_cells", [1, 7, 40, 100, int(os.environ.get("KOKKAI_MAX_HEATMAP_CELLS", 600))])
+def test_limit_heatmap_stays_under_max_cells(data, selected, max_cells):
+    filtered_df, _, _ = selected
+    top_keywords = analytics.keyword_ranking(data["keyword_index"], filtered_df)
+    heatmap_data = analytics.heatmap(filtered_df, top_keywords, data["keyword_index"])
+    limited = analytics.limit_heatmap(heatmap_data, max_terms=20, max_cells=max_cells)
+    n_terms, n_parties = limited["term"].nunique(), limited["party"].nunique()
+    assert 0 < n_terms * n_parties <= max_cells
+    assert len(limited) == n_terms * n_parties
+    # 残すのは合計の多いキーワード・政党
+    term_totals = heatmap_data.groupby("term")["count"].sum()
+    terms = limited["term"].unique()
+    if len(terms) < len(term_totals):
+        assert term_totals[terms].min() >= term_totals.drop(terms).max()
+    data_terms = heatmap_data[heatmap_data["term"].isin(terms)]
+    party_totals = data_terms.groupby("party")["count"].sum()
+    kept = limited["party"].unique()
+    if len(kept) < len(party_totals):
+        assert party_totals[kept].min() >= party_totals.drop(kept).max()
@@ -0,0 +1,152 @@
+"""
+kokkai_api.ApiClient の再試行（429/503・Retry-After）と AdaptiveRateLimiter の間隔調整のテスト（ローカルの FakeApi を相手にする）
+
+    python -m pytest tests
+"""
+import time
+
+import pytest
+import requests
+
+from kokkai_api import AdaptiveRateLimiter, ApiClient, FetchStats, fetch
+from tests.support.fake_api import FakeApi
+
+PARAMS = {"recordPacking": "json", "maximumRecords": 10, "startRecord": 1}
+
+
+class FlakyApi(FakeApi):
+    """最初の failures 回だけエラー（retry_after があれば 429 + Retry-After、なければ 503）を返す"""
+
+    def __init__(self, failures: int, status: int = 503, **kwargs):
+        super().__init__(n_speeches=50, **kwargs)
+        self.failures = failures
+        self.status = status
+
+    def respond(self, endpoint, query):
+        with self.lock:
+            failed = self.requests < self.failures
+            if failed:
+                self.requests += 1
+                self.errors += 1
+        if failed:
+            return self.status, None
+        return super().respond(endpoint, query)
+
+
+def client_for(server: FakeApi, **kwargs) -> ApiClient:
+    return ApiClient(server.base_url, **{"rate": 1000.0, "backoff": 0.001, **kwargs})
+
+
+@pytest.mark.parametrize("status", [429, 503])
+def test_retry_count(status):
+    server = FlakyApi(3, status=status).start()
+    stats = FetchStats()
+    client = client_for(server, stats=stats, adaptive=False)
+    try:
+        page = client.get("speech", PARAMS)
+    finally:
+        client.close()
+        server.stop()
+    assert len(page.js["speechRecord"]) == 10
+    assert server.requests == 4
+    assert stats.frame()["retries"].tolist() == [3]
+
+
+def test_gives_up_after_retries():
+    server = FlakyApi(10).start()
+    client = client_for(server, retries=2, adaptive=False)
+    try:
+        with pytest.raises(requests.HTTPError):
+            client.get("speech", PARAMS)
+    finally:
+        client.close()
+        server.stop()
+    assert server.requests == 3
+
+
+def test_waits_at_least_retry_after():
+    server = FlakyApi(1, status=429, retry_after=0.3).start()
+    client = client_for(server)
+    try:
+        start = time.monotonic()
+        client.get("speech", PARAMS)
+        elapsed = time.monotonic() - start
+    finally:
+        client.close()
+        server.stop()
+    assert server.requests == 2
+    assert elapsed >= 0.3
+    # Retry-After の間は全スレッドの取得を止める
+    assert client.limiter.paused_until >= start + 0.3
+
+
+def test_other_errors_are_not_retried():
+    server = FlakyApi(1, status=404).start()
+    client = client_for(server)
+    try:
+        with pytest.raises(requests.HTTPError):
+            client.get("speech", PARAMS)
+    finally:
+        client.close()
+        server.stop()
+    assert server.requests == 1
+
+
+@pytest.mark.parametrize("base_url", ["127.0.0.1/api", "ftp://127.0.0.1/api", "http://"])
+def test_bad_url_fails_at_once(base_url):
+    # URL の誤り（requests では ValueError の派生）は再試行せず、間隔も下げない
+    client = ApiClient(base_url, rate=1000.0, backoff=10.0)
+    rate = client.limiter.rate
+    try:
+        start = time.monotonic()
+        with pytest.raises(ValueError):
+            client.get("speech", PARAMS)
+        assert time.monotonic() - start < 1.0
+    finally:
+        client.close()
+    assert client.limiter.rate == rate
+
+
+def test_limiter_slows_down_and_recovers():
+    limiter = AdaptiveRateLimiter(10.0, fast=0.5, slow=5.0)
+    assert limiter.rate == 5.0
+    limiter.failure()
+    assert limiter.rate == 2.5
+    limiter.failure()
+    limiter.failure()
+    # min_rate（既定は max_rate / 8）より下げない
+    assert limiter.rate == 1.25
+    limiter.success(0.1)
+    assert limiter.rate == 2.25
+    for _ in range(20):
+        limiter.success(0.1)
+    assert limiter.rate == 10.0
+    # 普通の速さの応答では変えず、遅い応答では半分にする
+    limiter.success(1.0)
+    assert limiter.rate == 10.0
+    limiter.success(6.0)
+    assert limiter.rate == 5.0
+
+
+def test_limiter_pauses_for_retry_after():
+    limiter = AdaptiveRateLimiter(1000.0)
+    limiter.failure(retry_after=0.2)
+    start = time.monotonic()
+    limiter.acquire()
+    assert time.monotonic() - start >= 0.2
+
+
+def test_fetch_under_errors_matches_and_slows_down():
+    server = FakeApi(n_speeches=600, error_rate=0.3).start()
+    stats = FetchStats()
+    client = ApiClient(server.base_url, rate=1000.0, backoff=0.001, retries=20, stats=stats, pool_size=2)
+    try:
+        df = fetch("2025-01-01", "2025-12-31", ["両院"], [], "", "なし（全文対象）", True, workers=2,
+                   client=client)[0]
+    finally:
+        client.close()
+        server.stop()
+    assert len(df) == len(server.records)
+    assert server.errors > 0
+    # 再試行の回数の合計はサーバーが返したエラーの数
+    assert stats.frame()["retries"].sum() == server.errors
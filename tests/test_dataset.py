@@ -0,0 +1,62 @@
+"""
+dataset のテスト（日付のない発言・同時に追加したときの manifest・元 CSV から月別ファイルへの分割）
+
+    python -m pytest tests
+"""
+import threading
+
+import pandas as pd
+
+from dataset import BASE_CSV, MONTH_DIR, append_partition, month_catalog, read_manifest
+from tests.support.corpus import make_records
+
+
+def records(n: int, seed: int = 0) -> pd.DataFrame:
+    return make_records(n, seed=seed, start="2025-04-01", end="2025-04-30")
+
+
+def test_undated_rows_are_dropped(tmp_path):
+    df = records(20)
+    df.loc[df.index[::3], "date"] = None
+    entry = append_partition(tmp_path, df)
+    dated = pd.to_datetime(df["date"], errors="coerce").dropna()
+    assert entry["rows"] == len(dated)
+    assert (entry["min_date"], entry["max_date"]) == (dated.min().strftime("%Y-%m-%d"),
+                                                      dated.max().strftime("%Y-%m-%d"))
+    assert len(pd.read_parquet(tmp_path / entry["file"])) == len(dated)
+
+
+def test_all_undated_adds_nothing(tmp_path):
+    df = records(5).assign(date=None)
+    assert append_partition(tmp_path, df) is None
+    assert read_manifest(tmp_path) == {"partitions": []}
+
+
+def test_concurrent_appends_keep_every_partition(tmp_path):
+    frames = [records(10, seed=i) for i in range(8)]
+    entries = []
+    threads = [threading.Thread(target=lambda df=df: entries.append(append_partition(tmp_path, df)))
+               for df in frames]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # 同じ秒・同じ日付範囲でもファイル名は重ならず、manifest にはすべて残る
+    files = sorted(entry["file"] for entry in entries)
+    assert len(set(files)) == len(frames)
+    assert sorted(p["file"] for p in read_manifest(tmp_path)["partitions"]) == files
+    assert all((tmp_path / name).exists() for name in files)
+
+
+def test_month_catalog_splits_csv_without_base_parquet(tmp_path):
+    df = make_records(300, seed=1, start="2025-01-06", end="2025-03-31")
+    df.to_csv(tmp_path / BASE_CSV, index=False)
+    # 以前の版が作った整形済み Parquet は作り直しのときに消える
+    (tmp_path / BASE_CSV).with_suffix(".parquet").write_bytes(b"old cache")
+    catalog = month_catalog(tmp_path)
+    assert catalog["rows"] == len(df)
+    assert sorted(catalog["months"]) == ["2025-01", "2025-02", "2025-03"]
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([BASE_CSV, MONTH_DIR])
+    # 2 回目は分割済みの一覧をそのまま使い、Parquet も作らない
+    assert month_catalog(tmp_path) == catalog
+    assert sorted(p.name for p in tmp_path.iterdir()) == sorted([BASE_CSV, MONTH_DIR])
@@ -0,0 +1,86 @@
+"""
+kokkai_api.export_csv（ファイルの分割）と ColumnBuffer（speechID の重複除去）のテスト
+
+    python -m pytest tests
+"""
+import codecs
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from kokkai_api import ColumnBuffer, export_csv, fetch
+from tests.support.corpus import make_records
+from tests.support.fake_api import FakeApi
+from tests.support.fake_api import make_records as make_api_records
+
+
+@pytest.fixture(scope="module")
+def frames():
+    df = make_records(5000, seed=3)
+    # ページごとに届く DataFrame（大きさはばらばら）
+    return [df.iloc[start:stop] for start, stop in [(0, 700), (700, 2600), (2600, 2601), (2601, 5000)]]
+
+
+def test_parts_have_bom_and_header_and_equal_unsplit_export(tmp_path, frames):
+    whole = export_csv(frames, tmp_path / "whole" / "export.csv")
+    assert [(path.name, n_rows) for path, n_rows in whole] == [("export.csv", 5000)]
+    whole_bytes = whole[0][0].read_bytes()
+
+    parts = export_csv(frames, tmp_path / "parts" / "export.csv", part_bytes=len(whole_bytes) // 5)
+    assert [path.name for path, _ in parts] == ["export.csv", *(f"export_{i}.csv" for i in range(2, len(parts) + 1))]
+    assert len(parts) > 2
+    assert sum(n_rows for _, n_rows in parts) == 5000
+
+    header = whole_bytes.split(b"\n", 1)[0] + b"\n"
+    assert header.startswith(codecs.BOM_UTF8)
+    joined = b""
+    for i, (path, n_rows) in enumerate(parts):
+        data = path.read_bytes()
+        # どのファイルも BOM と見出しから始まる CSV
+        assert data.startswith(header)
+        assert len(pd.read_csv(path, encoding="utf-8-sig")) == n_rows
+        joined += data if i == 0 else data[len(header):]
+    # つなげると分けずに書き出したファイルと同じ
+    assert joined == whole_bytes
+    pd.testing.assert_frame_equal(
+        pd.concat([pd.read_csv(path, encoding="utf-8-sig") for path, _ in parts], ignore_index=True),
+        pd.read_csv(whole[0][0], encoding="utf-8-sig"))
+
+
+def test_empty_export_writes_nothing(tmp_path):
+    assert export_csv([pd.DataFrame()], tmp_path / "export.csv") == []
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_column_buffer_drops_duplicate_speech_ids():
+    buffer = ColumnBuffer(key="speech_id", seen={"known"})
+    first = [{"speech_id": f"s{i}", "speech": f"first {i}"} for i in range(5)]
+    # 次のページに前のページと同じ発言・保存済みの発言・ページ内の重複が混ざる
+    second = [{"speech_id": "s3", "speech": "again"}, {"speech_id": "known", "speech": "stored"},
+              {"speech_id": "s5", "speech": "new"}, {"speech_id": "s5", "speech": "new again"}]
+    assert buffer.extend(first) == 5
+    assert buffer.extend(second) == 1
+    assert buffer.duplicates == 3
+    df = buffer.frame()
+    assert df["speech_id"].tolist() == ["s0", "s1", "s2", "s3", "s4", "s5"]
+    assert df.loc[df["speech_id"] == "s3", "speech"].item() == "first 3"
+
+
+def test_fetch_drops_duplicate_speech_ids_across_pages():
+    records = make_api_records(250)
+    # 2・3 ページ目に 1 ページ目と同じ speechID の発言が入る
+    for i, j in [(150, 20), (230, 21), (231, 100)]:
+        records[i] = {**records[i], "speechID": records[j]["speechID"]}
+    server = FakeApi(records=records).start()
+    try:
+        df = fetch("2025-01-01", "2025-12-31", ["両院"], [], "", "なし（全文対象）", True,
+                   base_url=server.base_url, rate=1000.0)[0]
+    finally:
+        server.stop()
+    ids = [record["speechID"] for record in records]
+    assert len(df) == len(set(ids)) == 247
+    assert df["speech_id"].is_unique
+    np.testing.assert_array_equal(df["speech_id"], list(dict.fromkeys(ids)))
+    # 最初に届いた行を残す
+    assert df.loc[df["speech_id"] == records[20]["speechID"], "speech"].item() == records[20]["speech"]
@@ -0,0 +1,113 @@
+"""
+kokkai_api.fetch の並列取得のテスト（ローカルの FakeApi を相手にする）
+
+    python -m pytest tests
+"""
+import time
+import weakref
+
+import pandas as pd
+import pytest
+
+import kokkai_api
+from kokkai_api import PAGE_SIZE, ApiClient, FetchStats, fetch
+from tests.support.fake_api import FakeApi, make_records
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = FakeApi(n_speeches=3000).start()
+    yield server
+    server.stop()
+
+
+def run(server, workers, kw="", mode="なし（全文対象）", track=None, plan=False, stats=None):
+    client = ApiClient(server.base_url, rate=1000.0, stats=stats, pool_size=workers, adaptive=False)
+    if track is not None:
+        get = client.get
+
+        def tracked_get(name, params):
+            # 手放されていないページの数の最大を記録する
+            page = get(name, params)
+            track["live"] += 1
+            track["peak"] = max(track["peak"], track["live"])
+            weakref.finalize(page, lambda: track.__setitem__("live", track["live"] - 1))
+            return page
+
+        client.get = tracked_get
+    try:
+        return fetch("2025-01-01", "2025-12-31", ["両院"], [], kw, mode, True, workers=workers, client=client,
+                     plan=plan)[0]
+    finally:
+        client.close()
+
+
+@pytest.mark.parametrize("kw, mode", [("", "なし（全文対象）"), ("予算 税制", "OR（いずれか含む）")])
+def test_parallel_matches_serial(server, kw, mode):
+    serial = run(server, 1, kw, mode)
+    parallel = run(server, 4, kw, mode)
+    assert len(serial) > PAGE_SIZE
+    pd.testing.assert_frame_equal(parallel, serial)
+
+
+def test_pages_in_flight_are_bounded(server, monkeypatch):
+    # 取り込みを遅くして、取得の方が先に進むようにする
+    speech_rows = kokkai_api.speech_rows
+
+    def slow_rows(js):
+        time.sleep(0.02)
+        return speech_rows(js)
+
+    monkeypatch.setattr(kokkai_api, "speech_rows", slow_rows)
+    workers = 2
+    track = {"live": 0, "peak": 0}
+    df = run(server, workers, track=track)
+    assert len(df) == len(server.records)
+    # 30 ページあっても、持つのは先に投げた 2 * workers ページと 1 ページ目・取り込み中の分だけ
+    assert len(server.records) // PAGE_SIZE > 4 * workers
+    assert track["peak"] <= 2 * workers + 3
+
+
+@pytest.mark.parametrize("kw", ["予算 税制", "エネルギー デジタル インフレ", "サプライチェーン 防衛"])
+def test_plan_matches_per_term(server, kw):
+    per_term = run(server, 2, kw, "OR（いずれか含む）")
+    planned = run(server, 2, kw, "OR（いずれか含む）", plan=True)
+    assert len(per_term) > PAGE_SIZE
+    assert set(planned["speech_id"]) == set(per_term["speech_id"])
+
+
+def test_plan_keeps_width_variants():
+    # 語なしで取って本文で絞る場合も、API と同じく全角・半角の表記ゆれの発言を残す
+    records = make_records(400)
+    for i, record in enumerate(records):
+        if i % 4 == 0:
+            record["speech"] = "ＴＰＰとｴﾈﾙｷﾞｰについて。" + record["speech"]
+        elif i % 4 != 3:
+            record["speech"] = "TPPとエネルギーと関税について。" + record["speech"]
+    variants = {record["speechID"] for record in records[::4]}
+    server = FakeApi(records=records).start()
+    try:
+        per_term = run(server, 2, "TPP エネルギー 関税", "OR（いずれか含む）")
+        stats = FetchStats()
+        planned = run(server, 2, "TPP エネルギー 関税", "OR（いずれか含む）", plan=True, stats=stats)
+    finally:
+        server.stop()
+    assert stats.summary()["plan"]["unfiltered_windows"] > 0
+    assert variants <= set(per_term["speech_id"])
+    assert set(planned["speech_id"]) == set(per_term["speech_id"])
+
+
+@pytest.mark.parametrize("error_kind", ["truncated", "invalid"])
+def test_broken_responses_are_retried(error_kind):
+    # 途中で切れた本文・JSON として読めない本文は取り直して、同じ結果になる
+    server = FakeApi(n_speeches=600, error_rate=0.3, error_kind=error_kind).start()
+    try:
+        client = ApiClient(server.base_url, rate=1000.0, backoff=0.001, retries=20, adaptive=False)
+        try:
+            df = fetch("2025-01-01", "2025-12-31", ["両院"], [], "", "なし（全文対象）", True, client=client)[0]
+        finally:
+            client.close()
+        assert server.errors > 0
+        assert len(df) == len(server.records)
+    finally:
+        server.stop()
@@ -0,0 +1,59 @@
+"""
+heavy_hitters.SpaceSaving のテスト（偏りのある語の列で、見積もりの範囲と guaranteed の主張が成り立つこと）
+
+    python -m pytest tests
+"""
+import collections
+
+import numpy as np
+import pytest
+
+from heavy_hitters import SpaceSaving
+
+
+def skewed_stream(n_tokens: int, n_terms: int, seed: int) -> list[str]:
+    """Zipf 分布の語の列（語の出る順はばらばら）"""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, n_terms + 1) ** 1.1
+    ids = rng.choice(n_terms, n_tokens, p=weights / weights.sum())
+    names = rng.permutation(n_terms)
+    return [f"t{names[i]}" for i in ids]
+
+
+@pytest.mark.parametrize("seed, capacity, batch_size", [(0, 50, 200), (1, 100, 1000), (2, 30, 50)])
+def test_bounds_and_guaranteed_terms(seed, capacity, batch_size):
+    stream = skewed_stream(50_000, 3000, seed)
+    truth = collections.Counter(stream)
+    counter = SpaceSaving(capacity)
+    counter.consume(iter(stream), batch_size=batch_size)
+    assert not counter.exact
+    assert counter.total == len(stream)
+    assert len(counter.counts) <= capacity
+
+    # 残っている語: count - error <= 真の回数 <= count
+    for term, count in counter.counts.items():
+        assert count - counter.errors[term] <= truth[term] <= count, term
+    # 残っていない語: 真の回数 <= floor
+    for term in truth.keys() - counter.counts.keys():
+        assert truth[term] <= counter.floor, term
+
+    n = 10
+    top = counter.top(n)
+    nth = truth.most_common(n)[-1][1]
+    guaranteed = top.loc[top["guaranteed"], "term"]
+    assert len(guaranteed) > 0
+    # guaranteed の語は真の上位 n 語に入る（同数の語はどれが入ってもよい）
+    for term in guaranteed:
+        assert truth[term] >= nth, term
+
+
+def test_exact_until_capacity_is_exceeded():
+    stream = skewed_stream(5_000, 200, 3)
+    truth = collections.Counter(stream)
+    counter = SpaceSaving(200)
+    counter.consume(iter(stream), batch_size=300)
+    assert counter.exact
+    assert counter.counts == dict(truth)
+    top = counter.top(5)
+    assert (top["error"] == 0).all()
+    assert top["count"].tolist() == [count for _, count in truth.most_common(5)]
@@ -0,0 +1,94 @@
+"""
+keyword_index のテスト（Tokenizer が旧実装の extract_keywords と同じ語を取り出すこと、複数プロセスで作った索引が 1 プロセスで作った索引と同じになること、
+保存して読んだ索引が元と同じになること）
+
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from keyword_index import KeywordIndex, Tokenizer, count_pool, extract_keywords
+from tests.support.corpus import make_speeches
+from tests.support.legacy import legacy_extract_keywords
+
+# 境界ケース（長い漢字の連続・長音・ストップワード・空白・欠損など）
+EDGE_CASES = [
+    None, "", "   ", "税", "税制", "予算委員会", "委員会", "我が国の問題", "ヴァ", "ヴァー", "ーーー",
+    "国際協力銀行法改正案審議会", "漢字七文字連続税", "エネルギーサプライチェーン", "アイ", "ｶﾀｶﾅ", "カタカナ税制カタカナ",
+    "○議員　消費税について、インフレ対策であります。", "一二三四五六七八九十一二三", "ァィゥ", "TAX税制TAX",
+]
+
+
+@pytest.fixture(scope="module")
+def texts():
+    return [*EDGE_CASES, *make_speeches(2000)["speech"].tolist()]
+
+
+@pytest.mark.parametrize("min_length, max_length", [(2, 6), (1, 3), (3, 10)])
+def test_tokenize_matches_legacy(texts, min_length, max_length):
+    tokenizer = Tokenizer(min_length, max_length)
+    for text in texts:
+        assert tokenizer.tokenize(text) == legacy_extract_keywords(text, min_length, max_length), text
+
+
+def test_extract_keywords_matches_legacy(texts):
+    for text in texts:
+        assert extract_keywords(text) == legacy_extract_keywords(text), text
+
+
+def test_term_ids_follow_tokenize(texts):
+    tokenizer = Tokenizer()
+    vocab: dict[str, int] = {}
+    for text in texts:
+        ids = tokenizer.term_ids(text, vocab)
+        terms = list(vocab)
+        assert [terms[i] for i in ids] == tokenizer.tokenize(text)
+    assert sorted(vocab.values()) == list(range(len(vocab)))
+
+
+def assert_same_index(actual: KeywordIndex, expected: KeywordIndex):
+    assert actual.vocab == expected.vocab
+    assert actual.n_rows == expected.n_rows
+    for name in ("rows", "cols", "counts"):
+        np.testing.assert_array_equal(getattr(actual, name), getattr(expected, name))
+
+
+def test_parallel_build_matches_serial(texts):
+    series = pd.Series(texts, dtype=object)
+    serial = KeywordIndex.build(series, chunk_size=300)
+    parts = [np.arange(start, min(start + 700, len(series))) for start in range(0, len(series), 700)]
+    serial_parts = [(KeywordIndex.build(series.iloc[rows].reset_index(drop=True), chunk_size=300), rows)
+                    for rows in parts]
+    # 1 つのプールを複数の索引で使い回す（precompute.py・ダッシュボードと同じ）
+    with count_pool(2) as pool:
+        parallel = KeywordIndex.build(series, chunk_size=300, workers=2, pool=pool)
+        parallel_parts = [(KeywordIndex.build(series.iloc[rows].reset_index(drop=True), chunk_size=300, workers=2,
+                                              pool=pool), rows)
+                          for rows in parts]
+    assert_same_index(parallel, serial)
+    for (index, _), (expected, _) in zip(parallel_parts, serial_parts):
+        assert_same_index(index, expected)
+    # 行順に並んだ部分をつなぐと、全体から作った索引と同じ
+    assert_same_index(KeywordIndex.concat(parallel_parts, len(series)), serial)
+    assert_same_index(KeywordIndex.concat(parallel_parts, len(series)),
+                      KeywordIndex.concat(serial_parts, len(series)))
+
+
+def test_write_and_read(tmp_path, texts):
+    index = KeywordIndex.build(pd.Series(texts, dtype=object), chunk_size=300)
+    path = tmp_path / "index.npz"
+    index.write(path)
+    assert_same_index(KeywordIndex.read(path), index)
+    # 語彙は UTF-8 で連結して保存する（固定幅の文字列配列より小さい）
+    with np.load(path) as data:
+        assert data["vocab_bytes"].nbytes == sum(len(term.encode("utf-8")) for term in index.vocab)
+        assert data["vocab_bytes"].nbytes < np.asarray(index.vocab, dtype=str).nbytes / 3
+
+    # 版が違う・壊れている保存は読まない
+    with np.load(path) as data:
+        arrays = dict(data)
+    np.savez(path, **{**arrays, "version": 1})
+    assert KeywordIndex.read(path) is None
+    path.write_bytes(b"PK\x03\x04broken")
+    assert KeywordIndex.read(path) is None
@@ -0,0 +1,84 @@
+"""
+kokkai_api.harvest_meetings のテスト（benchmarks/fixtures/meetings の記録を再生する。ネットワークには出ない）
+
+    python -m pytest tests
+"""
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from kokkai_api import ApiClient, harvest_meetings, speech_rows
+from response_cache import FixtureCache
+
+FIXTURES = Path(__file__).resolve().parent.parent / "benchmarks" / "fixtures" / "meetings" / "meeting"
+# 記録した期間（FakeApi --speeches 1000 の 2025-01〜03。9 会議・360 発言）
+DATE_FROM, DATE_UNTIL = "2025-01-01", "2025-03-31"
+
+
+def recorded(endpoint: str, directory: Path = FIXTURES) -> list[tuple[Path, dict]]:
+    """記録のうち endpoint の一覧ページ（startRecord つき）の (ファイル, 記録)"""
+    records = [(path, json.loads(path.read_text(encoding="utf-8"))) for path in sorted(directory.glob("*.json"))]
+    return [(path, r) for path, r in records if r["endpoint"] == endpoint and "startRecord" in r["params"]]
+
+
+@pytest.fixture(scope="module")
+def meetings():
+    """meeting_list の記録にある 会議 → speechID の一覧"""
+    return {mt["issueID"]: [sp["speechID"] for sp in mt["speechRecord"]]
+            for _, r in recorded("meeting_list") for mt in r["response"]["meetingRecord"]}
+
+
+def harvest(directory: Path = FIXTURES, known_ids=None):
+    # 記録にない応答は CacheMiss になる（接続先は使われない）
+    client = ApiClient(cache=FixtureCache(directory, offline=True), rate=1000.0, adaptive=False)
+    try:
+        return harvest_meetings(DATE_FROM, DATE_UNTIL, client=client, known_ids=known_ids)
+    finally:
+        client.close()
+
+
+def test_replays_all_speeches(meetings):
+    df, summary = harvest()
+    expected = [sid for ids in meetings.values() for sid in ids]
+    assert len(expected) == 360
+    assert df["speech_id"].tolist() == expected
+    assert summary["meetings"] == len(meetings)
+    assert summary["single_requests"] == 0
+    # speech エンドポイントの取り込みと同じ列
+    assert df.columns.tolist() == list(speech_rows({"speechRecord": [{}]})[0])
+    assert df[["date", "session", "speaker", "nameOfMeeting", "speech"]].notna().all().all()
+    assert df["speakerGroup"].notna().any()
+
+
+def test_known_ids_are_skipped(meetings):
+    issue_ids = list(meetings)
+    # 1 会議はすべて手元にあり、もう 1 会議は一部だけ手元にある
+    known = set(meetings[issue_ids[0]]) | set(meetings[issue_ids[1]][:5])
+    df, summary = harvest(known_ids=known)
+    assert summary["skipped_meetings"] == 1
+    assert set(df["speech_id"]) == {sid for ids in meetings.values() for sid in ids} - known
+    assert len(df) == 360 - len(known)
+
+    # すべて手元にあれば meeting は 1 回も取らない
+    df, summary = harvest(known_ids={sid for ids in meetings.values() for sid in ids})
+    assert len(df) == 0
+    assert summary["skipped_meetings"] == len(meetings)
+    assert summary["meeting_requests"] == 0
+
+
+def test_missing_meeting_is_fetched_by_issue_id(meetings, tmp_path):
+    # meeting のページから 1 会議を抜く（一覧と並びがずれた場合）。その会議は issueID で取り直す
+    directory = tmp_path / "meeting"
+    shutil.copytree(FIXTURES, directory)
+    dropped = list(meetings)[-1]
+    for path, record in recorded("meeting", directory):
+        response = record["response"]
+        response["meetingRecord"] = [mt for mt in response["meetingRecord"] if mt["issueID"] != dropped]
+        path.write_text(json.dumps(record, ensure_ascii=False), encoding="utf-8")
+
+    df, summary = harvest(directory)
+    assert summary["single_requests"] == 1
+    assert df["speech_id"].tolist() == [sid for ids in meetings.values() for sid in ids]
+    assert df.loc[df["issueID"] == dropped, "speech_id"].tolist() == meetings[dropped]
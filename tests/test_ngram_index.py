@@ -0,0 +1,109 @@
+"""
+ngram_index.NgramIndex のテスト（検索結果が str.contains と同じになること、concat が全体から作った索引と同じになること）
+
+    python -m pytest tests
+"""
+import re
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ngram_index import NgramIndex
+from tests.support.corpus import make_speeches
+
+# 大文字小文字・全角半角・casefold で長さが変わる文字・結合文字・欠損など
+EDGE_TEXTS = [
+    None, "", "税", "TAX税制", "tax", "Tax と税制", "ＴＡＸ", "ｔａｘ減税", "Straße", "STRASSE", "strasse",
+    "ΣΊΣΥΦΟΣ", "σίσυφος", "İstanbul", "istanbul", "café", "café", "Ａ", "a", "ｴﾈﾙｷﾞｰ", "エネルギー",
+]
+TERMS = [
+    # casefold・全角
+    "tax", "TAX", "Tax", "ＴＡＸ", "ｔａｘ", "ΣΊΣ", "σίσ", "İst", "ist",
+    # n より短い語（全件走査）
+    "税", "a", "Ａ",
+    # 索引で絞れない語（大文字小文字のある非 ASCII・\x00）
+    "é", "é", "ＴＡ", "\x00",
+    # 通常の語
+    "税制", "エネルギー", "ｴﾈﾙｷﾞｰ", "サプライチェーン", "防衛予算", "存在しない語",
+]
+# 大文字にすると長さが変わる文字（ß → SS）。str.contains(regex=False, case=False) は upper() どうしで比べるので
+# Straße と STRASSE を同じとみなすが、ダッシュボードのキーワード検索（もとの app.py）は正規表現の IGNORECASE で
+# 比べてきたので、こちらは正規表現の str.contains と比べる
+EXPANDING_TERMS = ["Straße", "STRASSE", "ss", "ß"]
+
+
+@pytest.fixture(scope="module")
+def texts():
+    return pd.Series([*EDGE_TEXTS, *make_speeches(1500)["speech"].tolist()], dtype=object)
+
+
+@pytest.fixture(scope="module")
+def index(texts):
+    return NgramIndex.build(texts, chunk_size=300)
+
+
+def contains(texts: pd.Series, terms: list[str], case: bool = False, regex: bool = False) -> np.ndarray:
+    mask = np.zeros(len(texts), dtype=bool)
+    for term in terms:
+        pattern = re.escape(term) if regex else term
+        mask |= texts.fillna("").str.contains(pattern, case=case, regex=regex).to_numpy(dtype=bool)
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize("term", TERMS)
+def test_search_matches_str_contains(texts, index, term):
+    np.testing.assert_array_equal(index.search(texts, [term], case=False), contains(texts, [term]))
+    np.testing.assert_array_equal(index.search(texts, [term], case=True), contains(texts, [term], case=True))
+
+
+@pytest.mark.parametrize("term", EXPANDING_TERMS)
+def test_search_matches_regex_for_expanding_case(texts, index, term):
+    np.testing.assert_array_equal(index.search(texts, [term], case=False), contains(texts, [term], regex=True))
+
+
+def test_search_multiple_terms_within_positions(texts, index):
+    terms = ["税制", "TAX", "a"]
+    np.testing.assert_array_equal(index.search(texts, terms), contains(texts, terms))
+    positions = np.arange(0, len(texts), 3)
+    np.testing.assert_array_equal(index.search(texts, terms, positions=positions),
+                                  np.intersect1d(contains(texts, terms), positions))
+
+
+def test_candidates_fall_back_for_short_and_non_indexable_terms(index):
+    assert index.candidates("税") is None
+    assert index.candidates("é") is None
+    assert index.candidates("ＴＡＸ") is None
+    assert index.candidates("税制") is not None
+
+
+def split_parts(texts: pd.Series, n_parts: int, order: str) -> list[np.ndarray]:
+    rows = np.arange(len(texts))
+    if order == "interleaved":
+        # 部分の中は昇順だが、部分どうしは行順にならない
+        return [rows[i::n_parts] for i in range(n_parts)]
+    parts = np.array_split(rows, n_parts)
+    if order == "reversed":
+        parts = parts[::-1]
+    return [*parts, rows[:0]]
+
+
+@pytest.mark.parametrize("order", ["in_order", "reversed", "interleaved"])
+def test_concat_matches_whole_build(texts, index, order):
+    parts = [(NgramIndex.build(texts.iloc[rows].reset_index(drop=True)), rows)
+             for rows in split_parts(texts, 5, order)]
+    merged = NgramIndex.concat(parts, len(texts))
+    for name in ("keys", "indptr", "postings"):
+        np.testing.assert_array_equal(getattr(merged, name), getattr(index, name))
+    for term in ["税制", "TAX", "税"]:
+        np.testing.assert_array_equal(merged.search(texts, [term]), contains(texts, [term]))
+
+
+def test_write_and_read(tmp_path, index):
+    path = tmp_path / "index.npz"
+    index.write(path)
+    loaded = NgramIndex.read(path)
+    for name in ("keys", "indptr", "postings"):
+        np.testing.assert_array_equal(getattr(loaded, name), getattr(index, name))
+    path.write_bytes(b"PK\x03\x04broken")
+    assert NgramIndex.read(path) is None
@@ -0,0 +1,72 @@
+"""
+profiling.Profiler のテスト
+
+    python -m pytest tests
+"""
+import os
+
+import pytest
+
+from profiling import Profiler, _reset_peak_rss
+
+MB = 2**20
+
+
+def touch(n_bytes: int) -> None:
+    """n_bytes を確保して書き込み（RSS に載せて）から手放す"""
+    data = b"x" * n_bytes
+    del data
+
+
+@pytest.mark.skipif(not (os.path.exists("/proc/self/status") and _reset_peak_rss()),
+                    reason="最大 RSS を戻せない環境")
+def test_peak_of_later_section_is_measured():
+    profiler = Profiler(measure_memory=True)
+    # 先に大きく確保した後でも、後の区間の一時的な確保が最大 RSS の増分に出る
+    touch(200 * MB)
+    first = profiler.lap("first")
+    touch(64 * MB)
+    second = profiler.lap("second")
+    profiler.lap("idle")
+    assert first["peak_mb"] >= 150
+    assert 50 <= second["peak_mb"] < 150
+    # 手放した分は残らない
+    assert second["retained_mb"] < 50
+    assert profiler.records[-1]["peak_mb"] < 50
+    profiler.close()
+
+
+@pytest.mark.skipif(not (os.path.exists("/proc/self/status") and _reset_peak_rss()),
+                    reason="最大 RSS を戻せない環境")
+def test_peak_is_measured_by_one_profiler_at_a_time():
+    first = Profiler(measure_memory=True)
+    second = Profiler(measure_memory=True)
+    touch(200 * MB)
+    # 後から始めた Profiler は最大 RSS を戻さない（先の Profiler の区間の最大が消えない）
+    assert second.lap("other")["peak_mb"] is None
+    assert first.lap("owner")["peak_mb"] >= 150
+    assert second.lap("other")["peak_mb"] is None
+
+    # 手放すと、次の区間から他の Profiler が測る
+    first.close()
+    second.lap("claim")
+    touch(64 * MB)
+    assert second.lap("measured")["peak_mb"] >= 50
+    assert first.lap("released")["peak_mb"] is None
+    second.close()
+
+    # 手放さずに消えた Profiler の分も空く
+    third = Profiler(measure_memory=True)
+    del third
+    fourth = Profiler(measure_memory=True)
+    fourth.lap("claim")
+    assert fourth.lap("measured")["peak_mb"] is not None
+    fourth.close()
+
+
+def test_without_memory_only_time_and_rows():
+    profiler = Profiler()
+    entry = profiler.lap("load", rows=3)
+    assert set(entry) == {"section", "seconds", "rows"}
+    assert entry["rows"] == 3
+    assert profiler.frame()["section"].tolist() == ["load"]
@@ -0,0 +1,134 @@
+"""
+query_engine のテスト（行位置での絞り込みが DataFrame の条件式と同じ行を選ぶこと、集計表の合計が発言行の集計と一致すること）
+
+    python -m pytest tests
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataset import prepare_speeches
+from query_engine import ROLLUP_DIMENSIONS, QueryEngine, RollupCube
+from tests.support.corpus import make_records
+
+
+@pytest.fixture(scope="module")
+def speeches():
+    df = prepare_speeches(make_records(2000, seed=2, start="2025-01-06", end="2025-03-31"))
+    # 日付の欠損・院の欠損（カテゴリのコード -1）を混ぜる
+    df.loc[df.index[::50], "date"] = pd.NaT
+    df["house"] = df["house"].cat.add_categories(["参議院（旧）"])
+    df.loc[df.index[::70], "house"] = np.nan
+    return df
+
+
+@pytest.fixture(scope="module")
+def engine(speeches):
+    return QueryEngine(speeches)
+
+
+def expected(speeches, date_range=None, houses=None, committees=None, parties=None) -> np.ndarray:
+    mask = np.ones(len(speeches), dtype=bool)
+    if date_range is not None:
+        start, end = (pd.Timestamp(d) for d in date_range)
+        mask &= ((speeches["date"] >= start) & (speeches["date"] <= end)).to_numpy()
+    for col, values in (("house", houses), ("committee", committees), ("party", parties)):
+        if values:
+            mask &= speeches[col].isin(values).to_numpy()
+    return np.flatnonzero(mask)
+
+
+@pytest.mark.parametrize("date_range", [
+    ("2025-01-01", "2025-12-31"),  # 全期間（日付の欠損は入らない）
+    ("2025-02-03", "2025-02-03"),  # 1 日だけ
+    ("2025-01-06", "2025-01-06"),  # 最初の日
+    ("2025-03-31", "2025-03-31"),  # 最後の日
+    ("2025-02-08", "2025-02-09"),  # 土日（平日のみのデータなので空）
+    ("2025-03-10", "2025-03-01"),  # 開始が終了より後（空）
+    ("2024-01-01", "2024-12-31"),  # データより前（空）
+    ("2026-01-01", "2026-12-31"),  # データより後（空）
+])
+def test_date_range_bounds(speeches, engine, date_range):
+    rows = engine.select(date_range=date_range)
+    np.testing.assert_array_equal(rows, expected(speeches, date_range=date_range))
+    assert not speeches["date"].iloc[rows].isna().any()
+
+
+def test_single_day_includes_every_row_of_that_day(speeches, engine):
+    day = speeches["date"].dropna().value_counts().idxmax()
+    rows = engine.select(date_range=(day, day))
+    assert len(rows) == (speeches["date"] == day).sum() > 1
+
+
+@pytest.mark.parametrize("houses, committees, parties", [
+    (["衆議院"], None, None),
+    (["衆議院", "参議院"], ["予算委員会", "本会議"], ["自由民主党", "政党不明"]),
+    (["存在しない院"], None, None),  # 辞書にない値だけ（空）
+    (["衆議院", "存在しない院"], None, None),  # 辞書にない値は無視
+    (["参議院（旧）"], None, None),  # カテゴリにはあるが使われていない値（空）
+    ([], [], []),  # 空の条件は絞り込まない
+])
+def test_category_filters(speeches, engine, houses, committees, parties):
+    rows = engine.select(houses=houses, committees=committees, parties=parties)
+    np.testing.assert_array_equal(rows, expected(speeches, houses=houses, committees=committees, parties=parties))
+
+
+def test_missing_category_never_matches(speeches, engine):
+    mask = engine.category_mask("house", list(speeches["house"].cat.categories))
+    np.testing.assert_array_equal(mask, speeches["house"].notna().to_numpy())
+
+
+def test_combined_filters(speeches, engine):
+    conditions = {"date_range": ("2025-02-01", "2025-02-28"), "houses": ["参議院"], "committees": ["本会議"]}
+    np.testing.assert_array_equal(engine.select(**conditions), expected(speeches, **conditions))
+
+
+def test_latest_is_newest_first(speeches, engine):
+    rows = engine.select(houses=["衆議院"])
+    latest = engine.latest(rows, 25)
+    dates = speeches["date"].iloc[latest]
+    assert dates.is_monotonic_decreasing
+    assert dates.iloc[-1] == speeches["date"].iloc[rows].nlargest(25).iloc[-1]
+    assert set(latest) <= set(rows)
+
+
+@pytest.fixture(scope="module")
+def cube(speeches):
+    return RollupCube.build(speeches)
+
+
+def totals(frame: pd.DataFrame, by: str) -> pd.DataFrame:
+    return (frame.groupby(frame[by].astype(object), dropna=False)[["row_count", "speech_count", "char_count"]]
+            .sum().sort_index())
+
+
+def speech_totals(speeches: pd.DataFrame, by: str) -> pd.DataFrame:
+    """発言行をそのまま集計した 行数・発言数・文字数"""
+    return totals(speeches.assign(row_count=1, speech_count=speeches["has_speech"].astype(np.int64)), by)
+
+
+def test_cube_has_one_row_per_dimension_combination(speeches, cube):
+    assert len(cube.cube) == len(speeches.groupby(ROLLUP_DIMENSIONS, observed=True, dropna=False))
+    assert cube.cube["row_count"].sum() == len(speeches)
+    assert cube.cube["speech_count"].sum() == speeches["has_speech"].sum()
+    assert cube.cube["char_count"].sum() == speeches["char_count"].sum()
+
+
+@pytest.mark.parametrize("by", ["party", "speaker", "house", "date", "session"])
+def test_cube_totals_match_groupby(speeches, cube, by):
+    pd.testing.assert_frame_equal(totals(cube.cube, by), speech_totals(speeches, by), check_dtype=False)
+
+
+@pytest.mark.parametrize("conditions", [
+    {},
+    {"date_range": ("2025-02-03", "2025-02-03")},
+    {"date_range": ("2025-03-10", "2025-03-01")},
+    {"date_range": ("2025-01-15", "2025-02-20"), "houses": ["衆議院"], "committees": ["予算委員会", "本会議"]},
+    {"houses": ["存在しない院"]},
+])
+def test_cube_query_matches_filtered_rows(speeches, engine, cube, conditions):
+    selected = cube.frame(cube.select(**conditions))
+    rows = speeches.iloc[engine.select(**conditions)]
+    assert selected["row_count"].sum() == len(rows)
+    for by in ["party", "speaker", "date"]:
+        pd.testing.assert_frame_equal(totals(selected, by), speech_totals(rows, by), check_dtype=False)
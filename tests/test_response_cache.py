@@ -0,0 +1,105 @@
+"""
+response_cache.ResponseCache のテスト（有効期限・サイズ上限での削除・オフライン再生）
+
+    python -m pytest tests
+"""
+import hashlib
+
+import pytest
+
+import response_cache
+from response_cache import CacheMiss, ResponseCache
+
+URL = "https://example.invalid/api/speech"
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(response_cache.time, "time", clock)
+    return clock
+
+
+def page(i: int) -> dict:
+    # 圧縮してもほぼ同じ大きさになる本文
+    speech = "".join(hashlib.sha256(f"{i}-{j}".encode()).hexdigest() for j in range(40))
+    return {"startRecord": i, "speechRecord": [{"speech": speech}]}
+
+
+def params(i: int) -> dict:
+    return {"recordPacking": "json", "startRecord": i}
+
+
+def test_ttl_expiry(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=10)
+    try:
+        cache.put(URL, params(1), f"{URL}?startRecord=1", page(1))
+        clock.now += 10
+        assert cache.get(URL, params(1)) == (f"{URL}?startRecord=1", page(1))
+        clock.now += 0.5
+        assert cache.get(URL, params(1)) is None
+        assert cache.stats()["hits"] == 1
+        assert cache.stats()["misses"] == 1
+        # 取り直して保存すれば期限は保存した時から数える
+        cache.put(URL, params(1), f"{URL}?startRecord=1", page(1))
+        clock.now += 5
+        assert cache.get(URL, params(1)) is not None
+    finally:
+        cache.close()
+
+
+def test_offline_replays_expired_entries(tmp_path, clock):
+    path = tmp_path / "cache.sqlite"
+    cache = ResponseCache(path, ttl=10)
+    cache.put(URL, params(1), f"{URL}?startRecord=1", page(1))
+    cache.close()
+
+    clock.now += 3600
+    offline = ResponseCache(path, ttl=10, offline=True)
+    try:
+        # 期限切れでも再生する。パラメータの順序・型・空白の違いは同じキー
+        assert offline.get(URL, {"startRecord": "1", "recordPacking": " json "})[1] == page(1)
+        with pytest.raises(CacheMiss):
+            offline.get(URL, params(2))
+        assert offline.stats()["misses"] == 1
+    finally:
+        offline.close()
+
+
+def test_lru_eviction_under_max_bytes(tmp_path, clock):
+    cache = ResponseCache(tmp_path / "cache.sqlite", ttl=None)
+    try:
+        cache.put(URL, params(1), URL, page(1))
+        size = cache.stats()["bytes"]
+        # 2 件半まで入る
+        cache.max_bytes = int(size * 2.5)
+        clock.now += 1
+        cache.put(URL, params(2), URL, page(2))
+        clock.now += 1
+        # 1 を使うと、最後に使われたのが最も古いのは 2 になる
+        assert cache.get(URL, params(1)) is not None
+        clock.now += 1
+        cache.put(URL, params(3), URL, page(3))
+
+        stats = cache.stats()
+        assert stats["entries"] == 2
+        assert stats["bytes"] <= cache.max_bytes
+        assert cache.get(URL, params(2)) is None
+        assert cache.get(URL, params(1))[1] == page(1)
+        assert cache.get(URL, params(3))[1] == page(3)
+
+        # 1 件でも上限を超える本文は残らない
+        cache.max_bytes = size // 2
+        clock.now += 1
+        cache.put(URL, params(4), URL, page(4))
+        assert cache.stats()["entries"] == 0
+    finally:
+        cache.close()
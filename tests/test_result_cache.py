@@ -0,0 +1,115 @@
+"""
+result_cache のテスト（キーの正規化・件数とサイズの上限・データの版）
+
+    python -m pytest tests
+"""
+import datetime
+import threading
+
+import pandas as pd
+
+from result_cache import ResultCache, filter_key, result_size
+
+
+def frame(n_rows: int) -> pd.DataFrame:
+    return pd.DataFrame({"count": range(n_rows)})
+
+
+def test_filter_key_normalization():
+    key = filter_key((datetime.date(2025, 1, 1), "2025-03-31"), ["衆議院", "参議院"], ["予算委員会"], ["税制", "消費税"])
+    # 順序・重複・前後の空白・日付の型は無視する
+    assert filter_key(("2025-01-01", pd.Timestamp("2025-03-31")), [" 参議院", "衆議院", "衆議院 "],
+                      ["予算委員会", "予算委員会"], ["消費税 ", "税制", "税制"]) == key
+    # キーワードなしと空のリストは同じ
+    assert filter_key(None, None, None, None) == filter_key(None, None, None, [])
+    # 条件が違えば別のキー
+    assert filter_key(("2025-01-01", "2025-03-30"), ["衆議院", "参議院"], ["予算委員会"], ["税制", "消費税"]) != key
+    assert filter_key((datetime.date(2025, 1, 1), "2025-03-31"), ["衆議院"], ["予算委員会"], ["税制", "消費税"]) != key
+    assert filter_key(None, [], None) != filter_key(None, None, None)
+
+
+def test_hit_and_miss():
+    cache = ResultCache()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return frame(3)
+
+    first = cache.get("keywords", filter_key(None, ["衆議院"]), compute)
+    second = cache.get("keywords", filter_key(None, [" 衆議院 "]), compute)
+    assert second is first
+    assert len(calls) == 1
+    # 集計の種類が違えば別の結果
+    cache.get("heatmap", filter_key(None, ["衆議院"]), compute)
+    assert len(calls) == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_entry_bound_evicts_least_recently_used():
+    cache = ResultCache(max_entries=2)
+    cache.get("s", ("a",), lambda: frame(1))
+    cache.get("s", ("b",), lambda: frame(1))
+    # a を使うと、最後に使ったのが最も古いのは b
+    cache.get("s", ("a",), lambda: frame(1))
+    cache.get("s", ("c",), lambda: frame(1))
+    assert [key for _, key in cache.entries] == [("a",), ("c",)]
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_bound():
+    size = result_size(frame(1000))
+    cache = ResultCache(max_bytes=int(size * 2.5))
+    for i in range(4):
+        cache.get("s", (i,), lambda: frame(1000))
+    stats = cache.stats()
+    assert stats["entries"] == 2
+    assert stats["bytes"] == 2 * size <= cache.max_bytes
+    assert stats["evictions"] == 2
+    assert [key for _, key in cache.entries] == [(2,), (3,)]
+
+    # 上限より大きい結果は返すが保存しない
+    big = cache.get("s", ("big",), lambda: frame(10_000))
+    assert len(big) == 10_000
+    assert ("s", ("big",)) not in cache.entries
+    assert cache.stats()["entries"] == 2
+
+
+def test_version_change_clears():
+    cache = ResultCache()
+    cache.use_version(("v1",))
+    cache.get("s", ("a",), lambda: frame(1))
+    cache.use_version(("v1",))
+    assert cache.stats()["entries"] == 1
+    cache.use_version(("v2",))
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"]) == (0, 0)
+
+
+def test_stale_version_result_is_not_stored():
+    cache = ResultCache()
+    cache.use_version(("v1",))
+    started, release = threading.Event(), threading.Event()
+
+    def slow_compute():
+        # 計算している間にほかのセッションが新しいデータを読み込む
+        started.set()
+        release.wait(5)
+        return frame(1)
+
+    results = []
+    worker = threading.Thread(target=lambda: results.append(cache.get("s", ("a",), slow_compute)))
+    worker.start()
+    started.wait(5)
+    cache.use_version(("v2",))
+    release.set()
+    worker.join(5)
+
+    # 古い版の結果は呼び出し元には返すが、保存しない
+    assert len(results[0]) == 1
+    assert cache.stats()["entries"] == 0
+    calls = []
+    cache.get("s", ("a",), lambda: calls.append(1) or frame(1))
+    assert calls == [1]
@@ -0,0 +1,106 @@
+"""
+SpeechStore と kokkai_api.harvest（中断からの再開）のテスト
+
+    python -m pytest tests
+"""
+import sqlite3
+
+import pytest
+
+from kokkai_api import PAGE_SIZE, ApiClient, harvest
+from speech_store import SPEECH_COLUMNS, SpeechStore
+from tests.support.fake_api import FakeApi
+
+OLD_COLUMNS = [col for col in SPEECH_COLUMNS if col != "session"]
+
+
+def test_old_store_gets_session_column(tmp_path):
+    # session 列が無かった版の保存先
+    path = tmp_path / "old.sqlite"
+    conn = sqlite3.connect(path)
+    columns = ", ".join(f"{col} TEXT" for col in OLD_COLUMNS[1:])
+    conn.execute(f"CREATE TABLE speeches (speech_id TEXT PRIMARY KEY, {columns})")
+    conn.execute("INSERT INTO speeches (speech_id, date) VALUES ('old', '2024-01-01')")
+    conn.commit()
+    conn.close()
+
+    store = SpeechStore(path)
+    try:
+        store.register_query("q", {})
+        added = store.save_page("q", 1, [{"speech_id": "new", "date": "2024-01-02", "session": "213",
+                                          "nameOfHouse": "衆議院"}])
+        assert added == 1
+        df = store.head()
+        assert df.columns.tolist() == SPEECH_COLUMNS
+        assert df["speech_id"].tolist() == ["old", "new"]
+        assert df["session"].isna().tolist() == [True, False]
+        assert df.loc[1, "session"] == "213"
+        assert df.loc[1, "nameOfHouse"] == "衆議院"
+    finally:
+        store.close()
+
+
+@pytest.fixture(scope="module")
+def server():
+    server = FakeApi(n_speeches=1050).start()
+    yield server
+    server.stop()
+
+
+def run_harvest(server, store, workers=1, fail_at=None):
+    """harvest を実行し、リクエストした startRecord の一覧を返す。fail_at のページで失敗させる"""
+    client = ApiClient(server.base_url, rate=1000.0, pool_size=workers, adaptive=False)
+    requested = []
+    get = client.get
+
+    def failing_get(name, params):
+        requested.append(params["startRecord"])
+        if params["startRecord"] == fail_at:
+            raise ConnectionError(f"startRecord={fail_at} で中断")
+        return get(name, params)
+
+    client.get = failing_get
+    try:
+        harvest(store, "2025-01-01", "2025-12-31", ["両院"], [], "", "なし（全文対象）", True, workers=workers,
+                client=client)
+    finally:
+        client.close()
+    return requested
+
+
+def stored_ids(store: SpeechStore) -> set:
+    return {sid for df in store.iter_frames() for sid in df["speech_id"]}
+
+
+@pytest.mark.parametrize("workers, fail_at", [(1, 1 + 4 * PAGE_SIZE), (3, 1 + 6 * PAGE_SIZE), (1, 1)])
+def test_resume_fetches_only_missing_pages(server, tmp_path, workers, fail_at):
+    all_pages = set(range(1, len(server.records) + 1, PAGE_SIZE))
+    assert len(all_pages) == 11
+
+    full = SpeechStore(tmp_path / "full.sqlite")
+    try:
+        assert sorted(run_harvest(server, full, workers)) == sorted(all_pages)
+        expected = stored_ids(full)
+    finally:
+        full.close()
+    assert len(expected) == len(server.records)
+
+    store = SpeechStore(tmp_path / "resumed.sqlite")
+    try:
+        with pytest.raises(ConnectionError):
+            run_harvest(server, store, workers, fail_at=fail_at)
+        (key,) = [row[0] for row in store.conn.execute("SELECT query_key FROM queries")]
+        done = set(store.completed_pages(key))
+        assert fail_at not in done
+        assert done < all_pages
+
+        # 再実行では保存していないページだけを取得する
+        requested = run_harvest(server, store, workers)
+        assert sorted(requested) == sorted(all_pages - done)
+        assert set(store.completed_pages(key)) == all_pages
+        assert stored_ids(store) == expected
+
+        # すべて取得済みなら何も取得しない
+        assert run_harvest(server, store, workers) == []
+    finally:
+        store.close()
@@ -0,0 +1,88 @@
+"""
+発言テキストの保存先（メモリマップしたファイル + オフセット表）
+- 発言本文は月別ファイルごとに UTF-8 で連結して *.speech.bin に書き、行ごとの開始・終了バイト位置を
+  メタデータ側の列（text_file / text_start / text_end）に持つ
+- ファイルは mmap で開くので、同じプロセスの複数セッションから読んでも本文はメモリに複製されない
+- テキストは表示する行・検索の候補行の分だけ取り出す
+"""
+import mmap
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+TEXT_SUFFIX = ".speech.bin"
+# メタデータ側に持つオフセット表の列（欠損テキストは start = end = -1）
+TEXT_COLUMNS = ["text_file", "text_start", "text_end"]
+
+
+def write_texts(texts: pd.Series, path: Path) -> tuple[np.ndarray, np.ndarray]:
+    """テキスト列を連結して書き出し、行ごとの (開始, 終了) バイト位置を返す"""
+    starts = np.full(len(texts), -1, dtype=np.int64)
+    ends = np.full(len(texts), -1, dtype=np.int64)
+    pos = 0
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with open(fd, "wb") as f:
+            for i, text in enumerate(texts):
+                if not isinstance(text, str):
+                    continue
+                data = text.encode("utf-8")
+                f.write(data)
+                starts[i] = pos
+                pos += len(data)
+                ends[i] = pos
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+    return starts, ends
+
+
+class TextStore:
+    """行位置 → 発言テキスト
+
+    frame は TEXT_COLUMNS を持つメタデータ（行位置は frame の並び）。pd.Series と同じく
+    take(rows) で指定行のテキスト（index は行位置、欠損は None）を返す。
+    """
+
+    def __init__(self, base_dir: Path, frame: pd.DataFrame):
+        self.base_dir = Path(base_dir)
+        files = pd.Categorical(frame["text_file"])
+        self.files = list(files.categories)
+        self.file_codes = files.codes
+        self.starts = frame["text_start"].to_numpy(dtype=np.int64)
+        self.ends = frame["text_end"].to_numpy(dtype=np.int64)
+        self.maps: dict[int, mmap.mmap | bytes] = {}
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _map(self, code: int):
+        """ファイルを初めて使うときに開く"""
+        data = self.maps.get(code)
+        if data is None:
+            with self.lock:
+                data = self.maps.get(code)
+                if data is None:
+                    with open(self.base_dir / self.files[code], "rb") as f:
+                        # 空ファイルは mmap できない
+                        size = os.fstat(f.fileno()).st_size
+                        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if size else b""
+                    self.maps[code] = data
+        return data
+
+    def get(self, row: int) -> str | None:
+        code, start = self.file_codes[row], self.starts[row]
+        if code < 0 or start < 0:
+            return None
+        return self._map(code)[start:self.ends[row]].decode("utf-8")
+
+    def take(self, rows) -> pd.Series:
+        """指定行のテキスト"""
+        rows = np.asarray(rows, dtype=np.int64)
+        return pd.Series([self.get(row) for row in rows], index=rows, dtype=object)